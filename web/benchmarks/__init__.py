@@ -0,0 +1 @@
+"""Performance comparisons for project code. Run each from the 'web' directory: python -m benchmarks.<module> """
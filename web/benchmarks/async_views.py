@@ -0,0 +1,78 @@
+"""Requests per second through the ASGI application, for the sync and the async project views, with concurrent
+requests, with and without the page cache. Also a urlconf, with both versions of each view.
+Usage (from the 'web' directory): python -m benchmarks.async_views [requests] [concurrency]
+"""
+import os
+import sys
+import asyncio
+from time import perf_counter
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('ALLOWED_HOSTS', 'testserver')
+django.setup()
+from django.contrib import admin  # noqa: E402
+from django.core.handlers.asgi import ASGIHandler  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from django.urls import path  # noqa: E402
+from project import views  # noqa: E402
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('sync/', views.home_view, name='home'),
+    path('sync/named', views.NamedView.as_view(), name='named_path'),
+    path('sync/user/', views.ProfileView.as_view(), name='profile_page'),
+    path('async/', views.async_home_view, name='async_home'),
+    path('async/named', views.AsyncNamedView.as_view(), name='async_named'),
+    path('async/user/', views.AsyncProfileView.as_view(), name='async_profile'),
+]
+PATHS = ['/', '/named', '/user/']
+
+
+async def request(app, url):
+    """Sends a GET to the ASGI app, and returns the status. """
+    scope = {'type': 'http', 'method': 'GET', 'path': url, 'query_string': b'', 'headers': [(b'host', b'testserver')],
+             'server': ('testserver', 80), 'scheme': 'http', 'asgi': {'version': '3.0'}}
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    status = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+    await app(scope, receive, send)
+    return status[0]
+
+
+async def run(app, url, count, concurrency):
+    """Seconds for count requests, with up to concurrency of them at a time. """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            assert await request(app, url) == 200
+    start = perf_counter()
+    await asyncio.gather(*(one() for _ in range(count)))
+    return perf_counter() - start
+
+
+def main(count=500, concurrency=20):
+    app = ASGIHandler()
+    print(f"requests per second, {count} requests, {concurrency} concurrent")
+    print(f"{'path':8} {'cache':>6} {'sync':>8} {'async':>8}")
+    with override_settings(ROOT_URLCONF='benchmarks.async_views'):
+        for url in PATHS:
+            for seconds in (0, 300):
+                with override_settings(PAGE_CACHE_SECONDS=seconds):
+                    rates = []
+                    for version in ('sync', 'async'):
+                        asyncio.run(run(app, '/' + version + url, 20, concurrency))  # Warm up.
+                        rates.append(count / asyncio.run(run(app, '/' + version + url, count, concurrency)))
+                print(f"{url:8} {str(bool(seconds)):>6} {rates[0]:8.0f} {rates[1]:8.0f}")
+
+
+if __name__ == '__main__':
+    main(*(int(ea) for ea in sys.argv[1:]))
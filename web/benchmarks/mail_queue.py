@@ -0,0 +1,47 @@
+"""Seconds a request waits to send an email, with the Django SMTP backend and with project.mail_queue, to a local
+stand-in SMTP server replying after a delay (as a distant one). Also the seconds until the queue is all sent.
+Usage (from the 'web' directory): python -m benchmarks.mail_queue [messages] [delay_ms]
+"""
+import os
+import sys
+from time import perf_counter
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('ALLOWED_HOSTS', 'testserver')
+django.setup()
+from django.core import mail  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from project.mail_queue import mail_queue  # noqa: E402
+from project.tests.helper_smtp import SMTPServer  # noqa: E402
+
+BACKENDS = ['django.core.mail.backends.smtp.EmailBackend', 'project.mail_queue.EmailBackend']
+
+
+def main(count=50, delay_ms=10):
+    server = SMTPServer()
+    server.delay = delay_ms / 1000
+    server.start()
+    print(f"{count} messages, each sent with send_mail, to a server replying after {delay_ms} ms")
+    print(f"{'backend':46} {'ms/send':>8} {'all sent s':>10} {'connections':>12}")
+    try:
+        for backend in BACKENDS:
+            server.connections = 0
+            with override_settings(EMAIL_BACKEND=backend, EMAIL_HOST='localhost', EMAIL_PORT=server.port,
+                                   EMAIL_USE_TLS=False, EMAIL_USE_SSL=False, EMAIL_HOST_USER='',
+                                   EMAIL_HOST_PASSWORD=''):
+                start = perf_counter()
+                for num in range(count):
+                    mail.send_mail('Subject %d' % num, 'Body', 'from@example.com', ['to%d@example.com' % num])
+                sending = perf_counter() - start
+                mail_queue.flush()
+                total = perf_counter() - start
+                mail_queue.stop()
+            print(f"{backend:46} {sending / count * 1000:8.2f} {total:10.2f} {server.connections:12}")
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main(*(int(ea) for ea in sys.argv[1:]))
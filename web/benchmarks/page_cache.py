@@ -0,0 +1,45 @@
+"""Requests per second for the project pages, through the full middleware stack, with and without the page cache.
+Also for conditional requests (If-None-Match of the current ETag) that get a 304 Not Modified.
+Usage (from the 'web' directory): python -m benchmarks.page_cache [requests]
+"""
+import os
+import sys
+from time import perf_counter
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('ALLOWED_HOSTS', 'testserver')
+django.setup()
+from django.test import Client, override_settings  # noqa: E402
+
+PATHS = ['/', '/named', '/user/']
+
+
+def requests_per_second(client, url, count, **extra):
+    """Best of 3 runs of count GET requests. """
+    runs = []
+    for _ in range(3):
+        start = perf_counter()
+        for _ in range(count):
+            client.get(url, **extra)
+        runs.append(perf_counter() - start)
+    return count / min(runs)
+
+
+def main(count=500):
+    client = Client()
+    print(f"requests/sec, best of 3 runs of {count} requests")
+    print(f"{'path':10} {'no cache':>10} {'cached':>10} {'304':>10}")
+    for url in PATHS:
+        with override_settings(PAGE_CACHE_SECONDS=0):
+            plain = requests_per_second(client, url, count)
+        with override_settings(PAGE_CACHE_SECONDS=300):
+            etag = client.get(url)['ETag']
+            cached = requests_per_second(client, url, count)
+            not_modified = requests_per_second(client, url, count, HTTP_IF_NONE_MATCH=etag)
+        print(f"{url:10} {plain:10.0f} {cached:10.0f} {not_modified:10.0f}")
+
+
+if __name__ == '__main__':
+    main(*(int(ea) for ea in sys.argv[1:]))
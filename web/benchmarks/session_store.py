@@ -0,0 +1,66 @@
+"""Database queries per request of a logged in user, with the Django database session engine and with
+project.session_store, each with and without SESSION_SAVE_EVERY_REQUEST. Also the requests per second.
+Usage (from the 'web' directory): python -m benchmarks.session_store [requests]
+"""
+import os
+import sys
+import shutil
+import tempfile
+from time import perf_counter
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('ALLOWED_HOSTS', 'testserver')
+django.setup()
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.cache import caches  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+ENGINES = ['django.contrib.sessions.backends.db', 'project.session_store']
+URL = '/named'  # Its page cache varies on the user, so loads the session and user on each request.
+
+
+def run(user, count):
+    """(session queries, all queries, requests per second) of count GET requests, with a new login. """
+    caches['default'].clear()
+    caches['sessions'].clear()
+    client = Client()
+    client.force_login(user)
+    client.get(URL)
+    with CaptureQueriesContext(connection) as queries:
+        start = perf_counter()
+        for _ in range(count):
+            client.get(URL)
+        seconds = perf_counter() - start
+    session = [ea for ea in queries.captured_queries if 'django_session' in ea['sql']]
+    return len(session) / count, len(queries) / count, count / seconds
+
+
+def main(count=200):
+    old_name = connection.creation.create_test_db(verbosity=0)
+    temp_dir = tempfile.mkdtemp()
+    sessions_cache = override_settings(PAGE_CACHE_SECONDS=300, SESSION_CACHE_ALIAS='sessions', CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'sessions': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': temp_dir},
+    })  # Shared by processes, as project.session_store needs.
+    sessions_cache.enable()
+    try:
+        user = get_user_model().objects.create_user('benchmark', password='benchmark')
+        print(f"per request, for {count} requests of {URL} by a logged in user, sessions in a file cache")
+        print(f"{'engine':38} {'save every':>10} {'session q':>10} {'all q':>8} {'req/s':>8}")
+        for engine in ENGINES:
+            for save_every in (False, True):
+                with override_settings(SESSION_ENGINE=engine, SESSION_SAVE_EVERY_REQUEST=save_every):
+                    session, total, per_second = run(user, count)
+                print(f"{engine:38} {str(save_every):>10} {session:10.2f} {total:8.2f} {per_second:8.0f}")
+    finally:
+        sessions_cache.disable()
+        shutil.rmtree(temp_dir)
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main(*(int(ea) for ea in sys.argv[1:]))
@@ -0,0 +1,67 @@
+"""Mixed read and write queries per second from a thread pool, on a SQLite file with each SQLITE_PROFILES profile.
+Each task is a read of a random row, or (one in write_every) an insert. Also counts 'database is locked' errors.
+Usage (from the 'web' directory): python -m benchmarks.sqlite_profile [tasks] [threads] [write_every]
+"""
+import os
+import sys
+import random
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('ALLOWED_HOSTS', 'testserver')
+django.setup()
+from django.conf import settings  # noqa: E402
+from django.db import connections, OperationalError  # noqa: E402
+
+ROWS = 1000
+
+
+def task(alias, write):
+    """One query on this thread's connection. Returns 1 if it failed with a locked database. """
+    try:
+        with connections[alias].cursor() as cursor:
+            if write:
+                cursor.execute('INSERT INTO bench (value) VALUES (%s)', ['x' * 100])
+            else:
+                cursor.execute('SELECT value FROM bench WHERE id = %s', [random.randint(1, ROWS)])
+                cursor.fetchone()
+    except OperationalError:
+        return 1
+    return 0
+
+
+def run(alias, tasks, threads, write_every):
+    with connections[alias].cursor() as cursor:
+        cursor.execute('CREATE TABLE bench (id INTEGER PRIMARY KEY, value TEXT)')
+        cursor.executemany('INSERT INTO bench (value) VALUES (%s)', [['x' * 100]] * ROWS)
+    connections[alias].close()
+    with ThreadPoolExecutor(threads) as executor:
+        start = perf_counter()
+        errors = sum(executor.map(task, [alias] * tasks, (i % write_every == 0 for i in range(tasks))))
+        seconds = perf_counter() - start
+        list(executor.map(lambda _: connections.close_all(), range(threads * 4)))
+    return tasks / seconds, errors
+
+
+def main(tasks=5000, threads=8, write_every=5):
+    temp_dir = tempfile.mkdtemp()
+    print(f"{tasks} queries from {threads} threads, one in {write_every} a write")
+    print(f"{'profile':10} {'queries/s':>10} {'locked':>8}")
+    try:
+        for profile, pragmas in settings.SQLITE_PROFILES.items():
+            alias = 'bench_' + profile
+            connections.databases[alias] = {'ENGINE': 'project.sqlite3', 'PRAGMAS': pragmas,
+                                            'NAME': os.path.join(temp_dir, profile + '.sqlite3')}
+            rate, errors = run(alias, tasks, threads, write_every)
+            print(f"{profile:10} {rate:10.0f} {errors:8}")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main(*(int(ea) for ea in sys.argv[1:]))
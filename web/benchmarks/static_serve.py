@@ -0,0 +1,52 @@
+"""Static file requests per second: Django's StaticFilesHandler (as runserver uses) against the StaticFilesWSGI index.
+Called as WSGI applications directly, with a file wrapper that is only counted, as a sendfile server would.
+Usage (from the 'web' directory): python -m benchmarks.static_serve [requests]
+"""
+import os
+import sys
+from time import perf_counter
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('ALLOWED_HOSTS', 'testserver')
+django.setup()
+from django.contrib.staticfiles.handlers import StaticFilesHandler  # noqa: E402
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+from project.static_serve import StaticFilesWSGI  # noqa: E402
+
+PATHS = ['/static/css/style.css', '/static/assets/logo.svg', '/static/admin/css/base.css']
+
+
+def file_wrapper(f, block_size=None):
+    f.close()
+    return []
+
+
+def requests_per_second(application, path, count):
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'SERVER_NAME': 'testserver', 'SERVER_PORT': '80',
+               'wsgi.url_scheme': 'http', 'wsgi.input': None, 'wsgi.file_wrapper': file_wrapper}
+    start = perf_counter()
+    for _ in range(count):
+        body = application(dict(environ), lambda status, headers: None)
+        for _ in body:
+            pass
+        if hasattr(body, 'close'):
+            body.close()
+    return count / (perf_counter() - start)
+
+
+def main(count=2000):
+    django_static = StaticFilesHandler(get_wsgi_application())
+    start = perf_counter()
+    indexed = StaticFilesWSGI(get_wsgi_application())
+    print(f"index of {len(indexed.index.files)} files built in {(perf_counter() - start) * 1000:.1f}ms")
+    print(f"requests/sec of {count} requests")
+    print(f"{'path':28} {'django':>8} {'index':>8}")
+    for path in PATHS:
+        print(f"{path:28} {requests_per_second(django_static, path, count):8.0f} "
+              f"{requests_per_second(indexed, path, count):8.0f}")
+
+
+if __name__ == '__main__':
+    main(*(int(ea) for ea in sys.argv[1:]))
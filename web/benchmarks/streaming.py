@@ -0,0 +1,45 @@
+"""Time to the first chunk (the <head>) and to the full page, for the template views with and without streaming.
+Through the full middleware stack, without the page cache.
+Usage (from the 'web' directory): python -m benchmarks.streaming [requests]
+"""
+import os
+import sys
+from time import perf_counter
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('ALLOWED_HOSTS', 'testserver')
+django.setup()
+from django.test import Client, override_settings  # noqa: E402
+
+PATHS = ['/named', '/user/']
+
+
+def first_and_total(client, url):
+    """Seconds until the first chunk of content is ready, and until all of it is. """
+    start = perf_counter()
+    response = client.get(url)
+    chunks = iter(response.streaming_content) if response.streaming else iter([response.content])
+    next(chunks)
+    first = perf_counter() - start
+    for _ in chunks:
+        pass
+    return first, perf_counter() - start
+
+
+def main(count=300):
+    client = Client()
+    print(f"milliseconds, median of {count} requests")
+    print(f"{'path':8} {'streaming':>10} {'first':>8} {'total':>8}")
+    for url in PATHS:
+        for streaming in (False, True):
+            with override_settings(STREAMING_TEMPLATES=streaming, PAGE_CACHE_SECONDS=0):
+                times = [first_and_total(client, url) for _ in range(count)]
+            first = sorted(ea[0] for ea in times)[count // 2] * 1000
+            total = sorted(ea[1] for ea in times)[count // 2] * 1000
+            print(f"{url:8} {str(streaming):>10} {first:8.2f} {total:8.2f}")
+
+
+if __name__ == '__main__':
+    main(*(int(ea) for ea in sys.argv[1:]))
@@ -0,0 +1,53 @@
+"""Compares the compiled urllist substitution rules against applying each rule with re.sub in turn.
+Usage (from the 'web' directory): python -m benchmarks.sub_rules [rows] [added_rules]
+"""
+import re
+import sys
+from timeit import timeit
+from project.management.commands.urllist import Command, compile_sub_rules
+
+MODULES = ['django.contrib.admin.sites', 'django.contrib.auth.views', 'django_registration.backends', 'django.views',
+           'project.views', 'django_improve_form.views', 'some_app.views']
+
+
+def make_rows(count):
+    return [{'source': MODULES[i % len(MODULES)].split('.')[0], 'name': 'route_%d' % i,
+             'lookup_str': MODULES[i % len(MODULES)] + '.view_%d' % i} for i in range(count)]
+
+
+def sequential(rows, sub_rules):
+    """The previous per row, per rule, per column loop. """
+    for u in rows:
+        for regex, new_str, sub_cols in sub_rules:
+            for col in sub_cols:
+                u[col] = re.sub(regex, new_str, u[col])
+
+
+def compiled(rows, sub_rules):
+    subs = compile_sub_rules(sub_rules).items()
+    for u in rows:
+        for col, apply_rules in subs:
+            u[col] = apply_rules(u[col])
+
+
+def main(count=20000, added=20):
+    sub_cols = Command.initial_sub_cols
+    rule_sets = {
+        'default rules': [(*rule, sub_cols) for rule in Command.initial_sub_rules],
+        'default + %d anchored --add' % added: [(*rule, sub_cols) for rule in Command.initial_sub_rules] +
+        [('^app%d_' % i, 'a%d ' % i, sub_cols) for i in range(added)],
+        'default + %d unanchored --add' % added: [(*rule, sub_cols) for rule in Command.initial_sub_rules] +
+        [('view_%d$' % i, 'v%d' % i, sub_cols) for i in range(added)],
+        }
+    print(f"{count} rows, best of 3 runs (seconds)")
+    for label, sub_rules in rule_sets.items():
+        results = {}
+        for func in (sequential, compiled):
+            times = [timeit(lambda: func(make_rows(count), sub_rules), number=1) for _ in range(3)]
+            results[func.__name__] = min(times) - min(timeit(lambda: make_rows(count), number=1) for _ in range(3))
+        a, b = results['sequential'], results['compiled']
+        print(f"{label:32} sequential: {a:.4f}  compiled: {b:.4f}  speedup: {a / b:.1f}x")
+
+
+if __name__ == '__main__':
+    main(*(int(ea) for ea in sys.argv[1:]))
@@ -0,0 +1,51 @@
+"""Cold start time to compile every project and app template: no disk cache, filling it, and loading from it.
+Usage (from the 'web' directory): python -m benchmarks.template_cache
+"""
+import os
+import shutil
+import tempfile
+from time import perf_counter
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+django.setup()
+from django.template import engines, Engine  # noqa: E402
+from project.template_cache import iter_template_names  # noqa: E402
+
+LOADERS = ['django.template.loaders.filesystem.Loader', 'django.template.loaders.app_directories.Loader']
+
+
+def new_engine(cache_dir=None):
+    """A fresh engine (empty in-memory cache) like the project one, optionally with the on-disk cache. """
+    config = engines['django'].engine
+    if cache_dir:
+        loader = ('project.template_cache.Loader', LOADERS, cache_dir)
+    else:
+        loader = ('django.template.loaders.cached.Loader', LOADERS)
+    return Engine(dirs=config.dirs, loaders=[loader], libraries=dict(config.libraries),
+                  builtins=config.builtins[len(Engine.default_builtins):])
+
+
+def load_all(engine, names):
+    start = perf_counter()
+    for name in names:
+        engine.get_template(name)
+    return perf_counter() - start
+
+
+def main():
+    names = list(iter_template_names(new_engine()))
+    cache_dir = tempfile.mkdtemp()
+    try:
+        print(f"{len(names)} templates, best of 5 fresh engines")
+        print(f"no disk cache   {min(load_all(new_engine(), names) for _ in range(5)) * 1000:.1f} ms")
+        shutil.rmtree(cache_dir)
+        print(f"filling cache   {load_all(new_engine(cache_dir), names) * 1000:.1f} ms")
+        print(f"from disk cache {min(load_all(new_engine(cache_dir), names) for _ in range(5)) * 1000:.1f} ms")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Compares urllist get_url_data (tuple rows, filtered while walking) against the previous dict based version.
+Uses a synthetic urlconf of many apps, each included with many routes, plus an ignored 'admin' app.
+Usage (from the 'web' directory): python -m benchmarks.url_rows [apps] [routes_per_app]
+"""
+import re
+import sys
+import tracemalloc
+from time import perf_counter
+from django.conf import settings
+
+if not settings.configured:
+    settings.configure(USE_I18N=False)
+from django.urls import path, include, resolvers  # noqa: E402
+from project.management.commands.urllist import Command  # noqa: E402
+
+
+def view(request):
+    pass
+
+
+def make_urlconf(apps=500, routes=100):
+    """A root resolver of apps * routes patterns, with one extra 'admin' app of routes to be ignored. """
+    urlpatterns = []
+    for a in ['admin'] + ['app%d' % i for i in range(apps)]:
+        app_urls = [path('page%d/<int:pk>/' % r, view, name='%s_page%d' % (a, r)) for r in range(routes)]
+        urlpatterns.append(path(a + '/', include((app_urls, a), namespace=a)))
+    return resolvers.URLResolver(resolvers.RegexPattern(r'^/'), urlpatterns)
+
+
+class PreviousCommand(Command):
+    """The recursive, dict per row, filter after sorting version of collect_urls & get_url_data. """
+
+    def collect_urls(self, urls=None, source=None, prefix=None):
+        prefix = prefix or []
+        if isinstance(urls, resolvers.URLResolver):
+            name = urls.urlconf_name
+            if isinstance(name, (list, tuple)):
+                name = ''
+            elif not isinstance(name, str):
+                name = name.__name__
+            source = urls.namespace or name.split('.')[0] or source
+            res = []
+            for x in urls.url_patterns:
+                res += self.collect_urls(x, source=source, prefix=prefix + [str(urls.pattern)])
+            return res
+        pattern = prefix + [str(urls.pattern)]
+        pattern = ''.join([ea for ea in pattern if ea])[1:]
+        data = [source, urls.name, pattern, urls.lookup_str, dict(urls.default_args)]
+        return [dict(zip(self.all_columns, data))]
+
+    def get_url_data(self, sources=None, ignore=None, cols=None, sort=None, sub_rules=None, urls=None):
+        all_urls = self.collect_urls(urls)
+        if sort:
+            all_urls = sorted(all_urls, key=lambda x: [str(x[key] or '') for key in sort])
+        title = {key: key for key in all_urls[0].keys()}
+        all_urls.append(title)
+        if sources:
+            sources.append('source')
+        remove_idx, col_widths = [], {}
+        for i, u in enumerate(all_urls):
+            for col in ['name', 'args']:
+                val = u[col]
+                u[col] = '' if val is None else str(val)
+            is_rejected = any(all(u[k] == v for k, v in condition.items()) for condition in self.rejected_data)
+            if u['source'] in ignore or is_rejected or (sources and u['source'] not in sources):
+                remove_idx.append(i)
+                continue
+            if sub_rules:
+                for regex, new_str, sub_cols in sub_rules:
+                    for col in sub_cols:
+                        u[col] = re.sub(regex, new_str, u[col])
+            for k, v in list(u.items()):
+                u[k] = v = v or ''
+                col_widths[k] = max(len(v), col_widths.get(k, 0))
+        for idx in reversed(remove_idx):
+            all_urls.pop(idx)
+        if len(all_urls) == 1:
+            return []
+        result = [[v for k, v in u.items() if k in cols] for u in all_urls]
+        self.title = result.pop()
+        self.col_widths = col_widths
+        return result
+
+
+def measure(com, root, sub_rules):
+    """Returns (seconds, peak traced MiB, result) for get_url_data ignoring 'admin' and sorting by name & source.
+    The time is from a run without tracemalloc, since tracing slows down allocation heavy code.
+    """
+    args = (Command.all_columns, Command.initial_sort, sub_rules)
+    start = perf_counter()
+    result = com.get_url_data([], ['admin'], *args, urls=root)
+    seconds = perf_counter() - start
+    tracemalloc.start()
+    com.get_url_data([], ['admin'], *args, urls=root)
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+def main(apps=500, routes=100):
+    root = make_urlconf(apps, routes)
+    list(Command().collect_urls(root))  # Compile the route regex and url_patterns before measuring either.
+    sub_rules = [(*rule, Command.initial_sub_cols) for rule in Command.initial_sub_rules]
+    print(f"{apps * routes} patterns (+{routes} ignored admin), best of 3 runs")
+    results = {}
+    for com in (PreviousCommand(), Command()):
+        runs = [measure(com, root, sub_rules) for _ in range(3)]
+        results[com.__class__.__name__] = runs[0][2]
+        seconds, peak = min(ea[0] for ea in runs), min(ea[1] for ea in runs)
+        print(f"{com.__class__.__name__:16} time: {seconds:.3f}s  peak memory: {peak:.1f} MiB")
+    assert results['PreviousCommand'] == results['Command'], "Results differ. "
+
+
+if __name__ == '__main__':
+    main(*(int(ea) for ea in sys.argv[1:]))
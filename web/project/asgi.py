@@ -9,8 +9,17 @@ https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
 
 application = get_asgi_application()
+if settings.RESOURCE_HINTS:
+    from .resource_hints import EarlyHintsASGI
+    application = EarlyHintsASGI(application)
+if settings.STATIC_SERVE_INDEX:
+    from .static_serve import StaticFilesASGI
+    application = StaticFilesASGI(application)
+from .lifespan import LifespanASGI  # noqa: E402 Needs the apps ready. Warms the caches at lifespan startup.
+application = LifespanASGI(application)
@@ -0,0 +1,67 @@
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.decorators import classonlymethod
+
+
+def load_request_state_sync(request):
+    """Loads the session, and the user from it, so later use of them does not query the database. """
+    session = getattr(request, 'session', None)
+    if session is not None:
+        session.keys()
+    user = getattr(request, 'user', None)
+    if user is not None:
+        user.is_authenticated
+
+
+async def load_request_state(request):
+    """For async views: the session and user may need the database, so they are loaded in a thread first.
+    Without a session cookie they are empty (anonymous), and there is nothing to load. Once per request.
+    """
+    if getattr(request, 'state_loaded', False):
+        return
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        await sync_to_async(load_request_state_sync)(request)
+    request.state_loaded = True
+
+
+def rendered_response(response):
+    """A rendered TemplateResponse as a plain HttpResponse, so the async handler does not render it in a thread. """
+    if not callable(getattr(response, 'render', None)):
+        return response
+    response.render()
+    result = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        result[header] = value
+    result.cookies = response.cookies
+    return result
+
+
+async def awaitable(value):
+    return value
+
+
+class AsyncViewMixin:
+    """For class views with async handlers. Under ASGI they run on the event loop, without the thread of sync views.
+    Django 3.1 View does not mark as_view as a coroutine function for async handlers, so this does.
+    """
+    view_is_async = True
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        return markcoroutinefunction(super().as_view(**initkwargs))
+
+    def http_method_not_allowed(self, request, *args, **kwargs):
+        return awaitable(super().http_method_not_allowed(request, *args, **kwargs))
+
+    def options(self, request, *args, **kwargs):
+        return awaitable(super().options(request, *args, **kwargs))
+
+
+class AsyncTemplateMixin(AsyncViewMixin):
+    """For TemplateView classes: an async get, returning the page already rendered. """
+
+    async def get(self, request, *args, **kwargs):
+        await load_request_state(request)
+        context = self.get_context_data(**kwargs)
+        return rendered_response(self.render_to_response(context))
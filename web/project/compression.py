@@ -0,0 +1,213 @@
+import re
+import zlib
+import codecs
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from .static_serve import accepts_gzip
+
+COMPRESSIBLE_TYPES = re.compile(r'^(text/|application/(json|javascript|xml|ld\+json|manifest\+json)|image/svg\+xml)')
+PROTECTED_TAGS = re.compile(r'<(/?)(pre|textarea|script|style)\b', re.I)
+HTML_TOKENS = re.compile(PROTECTED_TAGS.pattern + r'|<(?=[a-z])|>|["\']', re.I)  # Also tag starts, ends & quotes.
+WHITESPACE = re.compile(r'\s{2,}')
+PARTIAL_TAG = re.compile(r'</?([a-z]{0,8})$', re.I)  # At the end of a part of a stream, may be a protected tag.
+PROTECTED_NAMES = ('pre', 'textarea', 'script', 'style')
+GZIP_LEVEL = 6
+CACHE_SIZE = 256  # Compressed bodies kept in memory, by ETag.
+
+
+def gzip_compressor():
+    """A zlib compressor writing the gzip format, with no file time, so the output only depends on the input. """
+    return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+
+def compress(content):
+    compressor = gzip_compressor()
+    return compressor.compress(content) + compressor.flush()
+
+
+def collapse_whitespace(text):
+    """Each run of whitespace as one newline (if it had one) or space, which renders the same outside of <pre>. """
+    return WHITESPACE.sub(lambda match: '\n' if '\n' in match.group() else ' ', text)
+
+
+class WhitespaceStripper:
+    """Collapses whitespace in HTML text, except within <pre>, <textarea>, <script>, and <style>, and within quoted
+    attribute values. For a stream, the text is given in parts to strip, and an element or quoted value started in
+    one part is still protected in the next ones.
+    """
+
+    def __init__(self):
+        self.inside, self.pending, self.in_tag, self.quote = None, '', False, None
+
+    def is_protected(self):
+        return bool(self.inside or self.quote)
+
+    def strip(self, text):
+        result, start = [], 0
+        for match in HTML_TOKENS.finditer(text):
+            part = text[start:match.start()]
+            result.append(part if self.is_protected() else collapse_whitespace(part))
+            self.update(match)
+            result.append(match.group())
+            start = match.end()
+        part = text[start:]
+        result.append(part if self.is_protected() else collapse_whitespace(part))
+        return ''.join(result)
+
+    def update(self, match):
+        """Moves the state past a protected tag start, another tag start, a tag end, or a quote. """
+        token, closing, tag = match.group(), match.group(1), (match.group(2) or '').lower()
+        if self.inside:
+            if closing and tag == self.inside:
+                self.inside, self.in_tag = None, True
+        elif self.quote:
+            if token == self.quote:
+                self.quote = None
+        elif tag:
+            self.inside, self.in_tag = (None, True) if closing else (tag, False)
+        elif token == '<':
+            self.in_tag = True
+        elif token == '>':
+            self.in_tag = False
+        elif self.in_tag:
+            self.quote = token
+
+    def feed(self, text):
+        """As strip, for a part of a stream: a tag start or whitespace at the end, that may continue in the next
+        part, is held back to be stripped with it (or with flush, after the last part).
+        """
+        text, self.pending = self.pending + text, ''
+        cut = len(text)
+        match = PARTIAL_TAG.search(text)
+        if match and any(name.startswith(match.group(1).lower()) for name in PROTECTED_NAMES):
+            cut = match.start()
+        cut = len(text[:cut].rstrip())
+        text, self.pending = text[:cut], text[cut:]
+        return self.strip(text)
+
+    def flush(self):
+        text, self.pending = self.pending, ''
+        return self.strip(text)
+
+
+class CompressedCache:
+    """Least recently used compressed bodies, by (ETag, variant), for responses with a strong ETag. """
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size, self.lock, self.entries = size, threading.Lock(), OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            content = self.entries.get(key)
+            if content is not None:
+                self.entries.move_to_end(key)
+            return content
+
+    def set(self, key, content):
+        with self.lock:
+            self.entries[key] = content
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+compressed_cache = CompressedCache()
+
+
+def is_compressible(request, response):
+    """If the client accepts gzip, and the response is a text type that is not already encoded or a partial body. """
+    if response.has_header('Content-Encoding') or response.has_header('Content-Range'):
+        return False
+    if 'no-transform' in response.get('Cache-Control', '').lower():
+        return False
+    if not COMPRESSIBLE_TYPES.match(response.get('Content-Type', '').lower()):
+        return False
+    return accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+
+def is_html(response):
+    return response.get('Content-Type', '').lower().startswith('text/html')
+
+
+def iter_stripped(chunks, stripper, charset='utf-8'):
+    """The chunks with whitespace stripped. Characters and tags split between chunks are decoded and matched whole.
+    If the content cannot be decoded, the rest of it is given as it is.
+    """
+    decoder = codecs.getincrementaldecoder(charset)()
+    chunks = iter(chunks)
+    for chunk in chunks:
+        try:
+            text = decoder.decode(chunk)
+        except UnicodeDecodeError:
+            yield stripper.flush().encode(charset) + decoder.getstate()[0] + chunk
+            yield from chunks
+            return
+        yield stripper.feed(text).encode(charset)
+    try:
+        text = decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        yield stripper.flush().encode(charset) + decoder.getstate()[0]
+        return
+    yield (stripper.feed(text) + stripper.flush()).encode(charset)
+
+
+def iter_compressed(chunks, stripper=None, charset='utf-8'):
+    """Yields the gzip compressed chunks, each flushed as it comes, so a streamed page still arrives in parts. """
+    if stripper is not None:
+        chunks = iter_stripped(chunks, stripper, charset)
+    compressor = gzip_compressor()
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compresses responses with gzip, for clients that accept it. Streaming responses are compressed a chunk at a
+    time. Bodies smaller than COMPRESS_MIN_SIZE, types that are not text, and responses already encoded (such as
+    precompressed static files) are not. With COMPRESS_STRIP_HTML, whitespace in HTML is collapsed first.
+    Compressed bodies of responses with a strong ETag (as from project.page_cache) are kept, so are only compressed
+    once. As with the Django GZipMiddleware, the ETag is then weak, and this should be first in the MIDDLEWARE.
+    """
+
+    def process_response(self, request, response):
+        patch_vary_headers(response, ('Accept-Encoding', ))
+        if not is_compressible(request, response):
+            return response
+        strip = settings.COMPRESS_STRIP_HTML and is_html(response)
+        if response.streaming:
+            stripper = WhitespaceStripper() if strip else None
+            response.streaming_content = iter_compressed(response.streaming_content, stripper, response.charset)
+            del response['Content-Length']
+        else:
+            if len(response.content) < settings.COMPRESS_MIN_SIZE:
+                return response
+            etag = response.get('ETag', '')
+            key = (etag, strip) if etag and not etag.startswith('W/') else None
+            compressed = compressed_cache.get(key) if key else None
+            if compressed is None:
+                content = response.content
+                if strip:
+                    try:
+                        content = WhitespaceStripper().strip(content.decode(response.charset)).encode(response.charset)
+                    except UnicodeDecodeError:
+                        pass
+                compressed = compress(content)
+                if key:
+                    compressed_cache.set(key, compressed)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        if response.has_header('ETag') and not response['ETag'].startswith('W/'):
+            response['ETag'] = 'W/' + response['ETag']
+        response['Content-Encoding'] = 'gzip'
+        return response
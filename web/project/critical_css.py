@@ -0,0 +1,179 @@
+import os
+import re
+from html.parser import HTMLParser
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.signals import setting_changed
+from django.template.base import Template as CompiledTemplate
+from django.template.loader import get_template
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from .static_build import get_static_manifest, minify_css
+
+TEMPLATE_SYNTAX = re.compile(r'{%.*?%}|{{.*?}}|{#.*?#}', re.S)
+PSEUDO = re.compile(r'::?[\w-]+(\([^)]*\))?')
+COMBINATORS = re.compile(r'\s*[\s>+~]\s*')
+KEEP_AT_RULES = ('@charset', '@import', '@font-face', '@namespace')
+_critical = {}
+
+
+class MarkupNames(HTMLParser):
+    """Collects the tag names, classes, ids, and attribute names used in the markup. """
+
+    def __init__(self):
+        super().__init__()
+        self.tags, self.classes, self.ids, self.attrs = set(), set(), set(), set()
+
+    def handle_starttag(self, tag, attrs):
+        self.tags.add(tag)
+        for name, value in attrs:
+            self.attrs.add(name)
+            if name == 'class' and value:
+                self.classes.update(value.split())
+            elif name == 'id' and value:
+                self.ids.add(value)
+
+
+def template_sources(template_name):
+    """The source text of the template, and of the templates it extends or includes by a literal name. """
+    names, sources = [template_name], {}
+    while names:
+        name = names.pop()
+        if name in sources:
+            continue
+        template = get_template(name).template
+        sources[name] = (template.source, template.origin.name)
+        for node in template.nodelist.get_nodes_by_type((ExtendsNode, IncludeNode)):
+            found = node.parent_name if isinstance(node, ExtendsNode) else node.template
+            if isinstance(found.var, str):
+                names.append(found.var)
+            elif isinstance(found.var, CompiledTemplate):
+                names.append(found.var.name)
+    return sources
+
+
+def markup_names(text):
+    """The names used in the markup of template source text, with the template syntax removed. """
+    parser = MarkupNames()
+    parser.feed(TEMPLATE_SYNTAX.sub(' ', text))
+    parser.close()
+    return parser
+
+
+def split_selectors(prelude):
+    """The comma separated selectors of a rule, except commas within parentheses. """
+    selectors, depth, start = [], 0, 0
+    for i, char in enumerate(prelude):
+        depth += {'(': 1, ')': -1}.get(char, 0)
+        if char == ',' and not depth:
+            selectors.append(prelude[start:i])
+            start = i + 1
+    selectors.append(prelude[start:])
+    return [ea.strip() for ea in selectors if ea.strip()]
+
+
+def selector_may_match(selector, names):
+    """False only if the selector needs a tag, class, id, or attribute that the markup never has. """
+    for compound in COMBINATORS.split(PSEUDO.sub('', selector).strip()):
+        tag = re.match(r'[\w-]+', compound)
+        if tag and tag.group().lower() not in names.tags:
+            return False
+        if not set(re.findall(r'\.([\w-]+)', compound)) <= names.classes:
+            return False
+        if not set(re.findall(r'#([\w-]+)', compound)) <= names.ids:
+            return False
+        if not {ea.lower() for ea in re.findall(r'\[\s*([\w-]+)', compound)} <= names.attrs:
+            return False
+    return True
+
+
+def split_rules(css):
+    """(prelude, block) of each top level rule of the minified css. The block is None for statements (@import). """
+    rules, depth, start, quote, i = [], 0, 0, None, 0
+    while i < len(css):
+        char = css[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == ';' and not depth:
+            rules.append((css[start:i].strip(), None))
+            start = i + 1
+        elif char == '{':
+            if not depth:
+                brace = i
+            depth += 1
+        elif char == '}' and depth:
+            depth -= 1
+            if not depth:
+                rules.append((css[start:brace].strip(), css[brace + 1:i]))
+                start = i + 1
+        i += 1
+    return rules
+
+
+def critical_rules(css, names):
+    """The minified css of only the rules with a selector that may match the markup names. """
+    result = []
+    for prelude, block in split_rules(css):
+        if block is None:
+            result.append(prelude + ';')
+        elif prelude.startswith(('@media', '@supports')):
+            inner = critical_rules(block, names)
+            if inner:
+                result.append('%s{%s}' % (prelude, inner))
+        elif prelude.startswith(KEEP_AT_RULES):
+            result.append('%s{%s}' % (prelude, block))
+        elif not prelude.startswith('@'):  # Such as @keyframes, which are not needed for the first paint.
+            selectors = [ea for ea in split_selectors(prelude) if selector_may_match(ea, names)]
+            if selectors:
+                result.append('%s{%s}' % (','.join(selectors), block))
+    return ''.join(result)
+
+
+def static_source(name):
+    """The file for a static name: the built file if in the build manifest, otherwise from the finders. """
+    hashed = get_static_manifest()['paths'].get(name)
+    if hashed:
+        return os.path.join(settings.STATIC_BUILD_DIR, *hashed.split('/'))
+    return finders.find(name)
+
+
+def get_critical_css(template_name, sheets):
+    """The rules of the sheets that may match the markup of the template (and those it extends or includes).
+    Memoized per template and sheets, and only extracted again when a sheet or template file has changed.
+    """
+    key = (template_name, tuple(sheets))
+    sources = template_sources(template_name)
+    files = [static_source(ea) for ea in sheets] + [origin for text, origin in sources.values()]
+    stats = []
+    for path in files:
+        try:
+            stat = os.stat(path)
+        except (TypeError, OSError):
+            stats.append(None)
+        else:
+            stats.append((path, stat.st_mtime_ns, stat.st_size))
+    cached = _critical.get(key)
+    if cached and cached[0] == stats:
+        return cached[1]
+    names = markup_names(''.join(text for text, origin in sources.values()))
+    css = []
+    for path in files[:len(sheets)]:
+        if path:
+            with open(path, encoding='utf-8') as f:
+                css.append(critical_rules(minify_css(f.read()), names))
+    result = ''.join(css).replace('</', '<\\/')
+    _critical[key] = (stats, result)
+    return result
+
+
+def clear_critical_css(**kwargs):
+    """Empties the memoized critical css. Also connected to the setting_changed signal. """
+    if kwargs.get('setting', 'TEMPLATES') in ('TEMPLATES', 'STATIC_BUILD_DIR', 'STATICFILES_DIRS'):
+        _critical.clear()
+
+
+setting_changed.connect(clear_critical_css)
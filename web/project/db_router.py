@@ -0,0 +1,119 @@
+import random
+import threading
+from contextvars import ContextVar
+from time import monotonic, perf_counter
+from django.conf import settings
+from django.db import connections, DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'replica_pin'
+LATENCY_WEIGHT = 0.3  # Of each new health check, in the moving average of latency.
+_pinned = ContextVar('replica_pinned', default=None)
+
+
+def pin_to_primary():
+    """Reads in this request (or thread or task, outside a request) go to the primary from now on. """
+    state = _pinned.get()
+    if state is None:
+        _pinned.set({'pinned': True, 'wrote': True})
+    else:
+        state.update(pinned=True, wrote=True)
+
+
+def is_pinned():
+    state = _pinned.get()
+    return state is not None and state['pinned']
+
+
+class ReplicaHealth:
+    """The last health check of a replica: if it passed, when it is due again, and the average latency. """
+
+    def __init__(self):
+        self.healthy, self.checked, self.latency = False, None, None
+
+
+class ReplicaRouter:
+    """Sends reads to the DATABASE_REPLICAS (alias: weight), and writes and migrations to the primary (default).
+    Replicas are chosen at random by weight, or with REPLICA_SELECTION 'latency', the fastest in health checks.
+    Each replica is checked (connect and 'SELECT 1') when chosen, at most every REPLICA_CHECK_SECONDS, and one
+    that fails is not used until its next check passes. Once a write is routed, reads in the same request (and,
+    with ReplicaPinMiddleware, requests in the next REPLICA_PIN_SECONDS) go to the primary: read your writes.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.health = {}
+
+    def check(self, alias):
+        """Connects to the replica and runs a query. Returns the seconds it took, or None if it failed. """
+        start = perf_counter()
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+        except Exception:
+            connections[alias].close()
+            return None
+        return perf_counter() - start
+
+    def get_health(self, alias):
+        """The health of the replica, checked again first if that is due. """
+        with self.lock:
+            health = self.health.setdefault(alias, ReplicaHealth())
+            due = health.checked is None or monotonic() - health.checked >= settings.REPLICA_CHECK_SECONDS
+            if due:
+                health.checked = monotonic()  # Other threads use the last result while this one checks.
+        if due:
+            latency = self.check(alias)
+            health.healthy = latency is not None
+            if latency is not None:
+                previous = latency if health.latency is None else health.latency
+                health.latency = previous + LATENCY_WEIGHT * (latency - previous)
+        return health
+
+    def healthy_replicas(self):
+        """(alias, weight, health) of each replica that passed its last health check. """
+        replicas = [(alias, weight, self.get_health(alias)) for alias, weight in settings.DATABASE_REPLICAS.items()]
+        return [ea for ea in replicas if ea[2].healthy and ea[1] > 0]
+
+    def db_for_read(self, model, **hints):
+        if is_pinned():
+            return DEFAULT_DB_ALIAS
+        replicas = self.healthy_replicas()
+        if not replicas:
+            return DEFAULT_DB_ALIAS
+        if settings.REPLICA_SELECTION == 'latency':
+            return min(replicas, key=lambda ea: ea[2].latency)[0]
+        return random.choices([ea[0] for ea in replicas], weights=[ea[1] for ea in replicas])[0]
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # The replicas have the same data as the primary.
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaPinMiddleware:
+    """Each request starts pinned to the primary if it has the pin cookie, set on the response of a request that
+    wrote. So the reads just after a write (such as after a redirect) do not miss it while the replicas catch up.
+    """
+    sync_capable = True
+    async_capable = False
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = {'pinned': PIN_COOKIE in request.COOKIES, 'wrote': False}
+        token = _pinned.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _pinned.reset(token)
+        if state['wrote']:
+            response.set_cookie(PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True,
+                                samesite='Lax')
+        return response
@@ -0,0 +1,11 @@
+import os
+
+
+def write_file(path, content):
+    """Writes the bytes by way of a temporary file, so readers never see partial files. """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = '%s.%d.tmp' % (path, os.getpid())
+    with open(temp_path, 'wb') as f:
+        f.write(content)
+    os.replace(temp_path, path)
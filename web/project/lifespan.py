@@ -0,0 +1,67 @@
+import asyncio
+import logging
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from .page_cache import inventory_version
+from .resolvers import get_reverse_map
+from .template_cache import warm_templates
+from .views import home_context
+
+logger = logging.getLogger(__name__)
+
+
+def warm_caches():
+    """Fills the memoized url inventory (as the home page and page cache use it), the reverse map, the compiled
+    templates, and (with RESOURCE_HINTS) the view preload hints. Returns the template (alias, name, error) results.
+    """
+    home_context()
+    inventory_version()
+    get_reverse_map()
+    results = warm_templates()
+    if settings.RESOURCE_HINTS:
+        from .resource_hints import warm_view_hints
+        warm_view_hints()
+    return results
+
+
+class LifespanASGI:
+    """ASGI middleware handling the lifespan protocol (which Django 3.1 does not), to run the startup function
+    (warm_caches) before the server accepts requests. For servers without lifespan events, it is run before the
+    first request is handled instead, and if it fails that is logged, the request still handled, and the next
+    request tries it again. In asgi.py: application = LifespanASGI(application)
+    """
+
+    def __init__(self, application, startup=warm_caches):
+        self.application, self.startup, self.started = application, startup, None
+
+    async def start(self):
+        """Runs the startup function in a thread, once it succeeds. Concurrent callers all wait for the same run. """
+        if self.started is None:
+            self.started = asyncio.ensure_future(sync_to_async(self.startup)())
+        started = self.started
+        try:
+            await started
+        except Exception:
+            if self.started is started:
+                self.started = None
+            raise
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    try:
+                        await self.start()
+                    except Exception as e:
+                        await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                        return
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        try:
+            await self.start()
+        except Exception:
+            logger.exception("Startup (%s) failed, to be tried again on the next request.", self.startup.__name__)
+        return await self.application(scope, receive, send)
@@ -0,0 +1,140 @@
+import queue
+import atexit
+import logging
+import smtplib
+import threading
+import time
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+logger = logging.getLogger(__name__)
+SHUTDOWN_SECONDS = 10  # At exit, to send what is still queued.
+
+
+def is_temporary(error):
+    """If sending may work when tried again: a lost connection, or a 4xx (not 5xx) reply from the server. """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code < 500
+    return isinstance(error, (smtplib.SMTPException, OSError))
+
+
+def close_quietly(connection):
+    if connection is not None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+class MailQueue:
+    """Email messages to send, and a pool of EMAIL_POOL_SIZE worker threads sending them. Each worker keeps its own
+    connection (of EMAIL_QUEUE_BACKEND) open, and sends up to EMAIL_BATCH_SIZE messages at a time over it, until
+    it is idle for EMAIL_IDLE_SECONDS. After a temporary failure the connection is opened again, and the rest of
+    the batch is sent after EMAIL_RETRY_DELAY seconds, doubled on each of EMAIL_RETRIES retries.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.workers = []
+        self.sent, self.failed = 0, 0
+
+    def start(self):
+        with self.lock:
+            self.workers = [ea for ea in self.workers if ea.is_alive()]
+            while len(self.workers) < settings.EMAIL_POOL_SIZE:
+                worker = threading.Thread(target=self.work, name='mail_queue_%d' % len(self.workers), daemon=True)
+                worker.start()
+                self.workers.append(worker)
+
+    def put(self, messages):
+        for message in messages:
+            self.queue.put(message)
+        self.start()
+
+    def flush(self, timeout=None):
+        """Waits until the queued messages are sent (or failed). Returns False if still waiting after timeout. """
+        with self.queue.all_tasks_done:
+            return self.queue.all_tasks_done.wait_for(lambda: not self.queue.unfinished_tasks, timeout)
+
+    def stop(self, timeout=None):
+        """Sends the queued messages, then closes the connections and ends the workers, which start again if needed. """
+        with self.lock:
+            workers, self.workers = self.workers, []
+            for _ in workers:
+                self.queue.put(None)
+        for worker in workers:
+            worker.join(timeout)
+
+    def count(self, name):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def work(self):
+        connection, stopping = None, False
+        while not stopping:
+            try:
+                message = self.queue.get(timeout=settings.EMAIL_IDLE_SECONDS if connection else None)
+            except queue.Empty:
+                close_quietly(connection)
+                connection = None
+                continue
+            batch = []
+            while message is not None:
+                batch.append(message)
+                if len(batch) >= settings.EMAIL_BATCH_SIZE:
+                    break
+                try:
+                    message = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            stopping = message is None
+            if batch:
+                connection = self.send_batch(connection, batch)
+            for _ in range(len(batch) + stopping):
+                self.queue.task_done()
+        close_quietly(connection)
+
+    def send_batch(self, connection, batch):
+        """Sends the messages over the connection, or a new one if None. Returns the connection, open, or None. """
+        batch, attempt = list(batch), 0
+        while batch:
+            try:
+                if connection is None:
+                    connection = get_connection(settings.EMAIL_QUEUE_BACKEND, fail_silently=False)
+                    connection.open()
+                while batch:
+                    connection.send_messages(batch[:1])
+                    batch.pop(0)
+                    self.count('sent')
+                    attempt = 0
+            except Exception as e:
+                close_quietly(connection)
+                connection = None
+                attempt += 1
+                if attempt > settings.EMAIL_RETRIES or not is_temporary(e):
+                    logger.error("Email to %s not sent: %r", ', '.join(batch[0].recipients()), e)
+                    batch.pop(0)
+                    self.count('failed')
+                    attempt = 0
+                else:
+                    time.sleep(settings.EMAIL_RETRY_DELAY * 2 ** (attempt - 1))
+        return connection
+
+
+mail_queue = MailQueue()
+atexit.register(mail_queue.stop, SHUTDOWN_SECONDS)
+
+
+class EmailBackend(BaseEmailBackend):
+    """Puts the messages in the mail_queue, to be sent by its workers, so the request does not wait on the mail
+    server. The count returned is of messages queued. Errors in sending are logged, not raised.
+    """
+
+    def send_messages(self, email_messages):
+        messages = [ea for ea in email_messages if ea.recipients()]
+        mail_queue.put(messages)
+        return len(messages)
@@ -0,0 +1,27 @@
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from project.static_build import build_static
+
+
+class Command(BaseCommand):
+    """Writes minified, bundled, content-hashed static files, with .gz siblings and a manifest, to STATIC_BUILD_DIR.
+    With the BuiltStaticStorage (used when STATIC_BUILD_DIR is set), {% static %} then gives the hashed names.
+    Example: manage.py build_static && manage.py collectstatic
+    """
+    help = 'Build the minified, bundled, and content-hashed static files, and their manifest. '
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', default=None, metavar='dir',
+                            help='The directory to write to. Default: STATIC_BUILD_DIR. ', )
+
+    def handle(self, *args, **kwargs):
+        output_dir = kwargs['output'] or settings.STATIC_BUILD_DIR
+        if not output_dir:
+            raise CommandError("Set STATIC_BUILD_DIR, or give the --output directory. ")
+        manifest = build_static(output_dir)
+        for name, hashed in sorted(manifest['paths'].items()):
+            path = os.path.join(output_dir, *hashed.split('/'))
+            gz = ' (+ .gz %d bytes)' % os.path.getsize(path + '.gz') if os.path.exists(path + '.gz') else ''
+            self.stdout.write(f"{name} -> {hashed} {os.path.getsize(path)} bytes{gz} ")
+        self.stdout.write(f"Built {len(manifest['paths'])} static files in {output_dir} ")
@@ -1,7 +1,141 @@
 import re
+import sys
+import csv
 import json
+import django
+import hashlib
+from collections import namedtuple
+from functools import partial
+from django.apps import apps
+from django.conf import settings
+from django.core.signals import setting_changed
 from django.core.management import BaseCommand
-from django.urls import resolvers
+from django.urls import resolvers, get_urlconf, reverse
+from time import perf_counter
+from ...files import write_file
+
+REGEX_SPECIAL = set('.^$*+?{}[]\\|()')
+
+
+def anchored_prefix(regex):
+    """Returns the literal start required by a simple (no groups or alternation) anchored regex, otherwise None. """
+    if not regex.startswith('^') or '|' in regex or '(' in regex:
+        return None
+    prefix = ''
+    for char in regex[1:]:
+        if char in REGEX_SPECIAL:
+            if char in '*?{':  # The previous literal character is optional.
+                prefix = prefix[:-1]
+            break
+        prefix += char
+    return prefix
+
+
+def single_pass_safe(rules):
+    """True if one scan that applies only the first matching rule gives the same result as applying each rule in turn.
+    Only proven for '^' anchored rules where no replacement can create the start needed by any later rule.
+    """
+    prefixes = [anchored_prefix(regex) for regex, new_str in rules]
+    if not all(prefixes) or any('\\' in new_str for regex, new_str in rules):
+        return False
+    for i, (regex, new_str) in enumerate(rules):
+        for later in prefixes[i + 1:]:
+            if later.startswith(new_str) or new_str.startswith(later):
+                return False
+    return True
+
+
+def compile_sub_rules(sub_rules):
+    """Compiles (regex, new_str, sub_cols) rules into one substitution function per column.
+    Columns sharing the same ordered rules share one compiled function. Consecutive rules are combined into a single
+    alternation, scanned once with the first matching rule winning, whenever that is the same as applying them in turn.
+    """
+    col_rules = {}
+    for regex, new_str, sub_cols in sub_rules or []:
+        for col in sub_cols:
+            col_rules.setdefault(col, []).append((regex, new_str))
+    compiled = {}
+    for col, rules in col_rules.items():
+        rules = tuple(rules)
+        if rules not in compiled:
+            compiled[rules] = compile_rule_set(rules)
+    return {col: compiled[tuple(rules)] for col, rules in col_rules.items()}
+
+
+def compile_rule_set(rules):
+    """Returns a function applying the ordered (regex, new_str) rules to a string. """
+    runs, run = [], []
+    for rule in rules:
+        if run and not single_pass_safe(run + [rule]):
+            runs.append(run)
+            run = []
+        run.append(rule)
+    runs.append(run)
+    steps = []
+    for run in runs:
+        if len(run) == 1:
+            regex, new_str = run[0]
+            steps.append(partial(re.compile(regex).sub, new_str))
+        else:
+            combined = re.compile('|'.join('(?P<r%d>%s)' % (i, regex) for i, (regex, new_str) in enumerate(run)))
+            replacements = {'r%d' % i: new_str for i, (regex, new_str) in enumerate(run)}
+            steps.append(partial(combined.sub, lambda match, replacements=replacements: replacements[match.lastgroup]))
+    if len(steps) == 1:
+        return steps[0]
+
+    def apply_rules(value):
+        for step in steps:
+            value = step(value)
+        return value
+    return apply_rules
+
+
+UrlRow = namedtuple('UrlRow', ['source', 'name', 'pattern', 'lookup_str', 'args'])  # Same as Command.all_columns
+ROUTE_SAMPLES = {'int': '1', 'str': 'sample', 'slug': 'sample', 'path': 'sample/path',
+                 'uuid': '00000000-0000-0000-0000-000000000000', }
+
+
+def sample_group(match):
+    """Returns a value for a regex named group: the first literal alternative, a number, or some text. """
+    body = match.group('body')
+    if re.fullmatch(r'[\w-]+(\|[\w-]+)*', body):
+        return body.split('|')[0]
+    return '1' if body in (r'\d+', '[0-9]+') else 'sample'
+
+
+def sample_path(pattern):
+    """Makes a url path that is expected to match the given urllist pattern, for route converters and simple regex. """
+    path = re.sub(r'\(\?P<\w+>(?P<body>[^()]*)\)', sample_group, pattern)
+    path = re.sub(r'<(?:(?P<conv>[^>:]+):)?(?P<name>[^>]+)>', lambda m: ROUTE_SAMPLES.get(m.group('conv'), 'sample'),
+                  path)
+    path = re.sub(r'(?<!\\)[\^$]', '', path)
+    return re.sub(r'\\(.)', r'\1', path)
+
+
+def count_tried(resolver, path):
+    """Counts the patterns checked, in the same order as resolve(), until the path matches. None if it never does. """
+    tried, stack = 0, [(iter(resolver.url_patterns), resolver.pattern.match(path)[0])]
+    while stack:
+        patterns, remaining = stack[-1]
+        pattern = next(patterns, None)
+        if pattern is None:
+            stack.pop()
+            continue
+        tried += 1
+        match = pattern.pattern.match(remaining)
+        if not match:
+            continue
+        if isinstance(pattern, resolvers.URLResolver):
+            stack.append((iter(pattern.url_patterns), match[0]))
+        elif pattern.resolve(remaining):
+            return tried
+    return None
+
+
+def percentile(values, pct):
+    """The value at the given percentage through the sorted values. """
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
 
 
 class Command(BaseCommand):
@@ -15,6 +149,8 @@ class Command(BaseCommand):
     initial_sub_rules = [('^django.contrib', 'cb '), ('^django_registration', 'd_reg '), ('^django', '')]
     EMPTY_VALUE = "************* NO URLS FOUND *************"
     MIN_WIDTH = 4
+    DELIMITERS = {'csv': ',', 'tsv': '\t'}
+    bench_columns = ['name', 'path', 'tried', 'resolve_p50', 'resolve_p99', 'reverse_p50', 'reverse_p99']
     title = None
     col_widths = None
 
@@ -40,6 +176,16 @@ class Command(BaseCommand):
                             help='Columns to apply added substitutions. If none given, defaults to sub-cols. ', )
         # Optional Named Argument: Flag for returning results when called within code instead of command line.
         parser.add_argument('--data', '-d', action='store_true', help='Return results usable in application code.', )
+        # Optional Named Arguments: Time resolve() and reverse() for each url, in url order, instead of listing them.
+        parser.add_argument('--bench', '-b', action='store_true',
+                            help='Time resolve & reverse for a sample path of each url (microseconds: p50, p99). '
+                                 'Names get the substitutions of the listing; --only, --not & --sort are not used. ', )
+        parser.add_argument('--repeat', '-r', type=int, default=1000, help='Times to call each for --bench. ', )
+        # Optional Named Argument: Save all urls (unfiltered) for faster loading later, see the URL_SNAPSHOT setting.
+        parser.add_argument('--snapshot', metavar='path', help='Write the url snapshot file for the current urlconf. ')
+        # Optional Named Argument: Output format. Only the table needs all rows before writing, to get column widths.
+        parser.add_argument('--format', '-f', default='table', choices=['table', *self.DELIMITERS, 'ndjson'],
+                            help='Output format. Non-table formats stream rows (use an empty --sort to not buffer). ', )
 
     def get_col_names(self, kwargs):
         """Determines the output columns based on defaults, 'not', and 'only' (as an integer or list of names). """
@@ -60,29 +206,75 @@ class Command(BaseCommand):
         sub_rules.extend(add_rules)
         return sub_rules
 
-    def collect_urls(self, urls=None, source=None, prefix=None):
-        """Called recursively for URLResolver until base case URLPattern. Ultimately returning a list of data dicts. """
+    def collect_urls(self, urls=None, source=None, prefix=None, sources=None, ignore=None):
+        """Validates the starting point, then returns a generator of UrlRow tuples for every URLPattern beneath it.
+        For the root resolver of ROOT_URLCONF, or the same for set_urlconf, a current URL_SNAPSHOT skips the walk.
+        """
         if urls is None:
             urls = resolvers.get_resolver()
-        prefix = prefix or []
-        if isinstance(urls, resolvers.URLResolver):
-            name = urls.urlconf_name
-            if isinstance(name, (list, tuple)):
-                name = ''
-            elif not isinstance(name, str):
-                name = name.__name__
-            source = urls.namespace or name.split('.')[0] or source
-            res = []
-            for x in urls.url_patterns:
-                res += self.collect_urls(x, source=source, prefix=prefix + [str(urls.pattern)])
-            return res
-        elif isinstance(urls, resolvers.URLPattern):
-            pattern = prefix + [str(urls.pattern)]
-            pattern = ''.join([ea for ea in pattern if ea])[1:]
-            data = [source, urls.name, pattern, urls.lookup_str, dict(urls.default_args)]
-            return [dict(zip(self.all_columns, data))]
-        else:
+        if not isinstance(urls, (resolvers.URLResolver, resolvers.URLPattern)):
             raise ValueError(repr(urls))
+        snapshot = get_snapshot_rows(urls) if source is None and not prefix else None
+        if snapshot is not None:
+            return self.filter_snapshot(snapshot, sources or [], ignore or [])
+        return self.walk_urls(urls, source, ''.join(prefix or []), sources or [], ignore or [])
+
+    def resolver_source(self, urls, source):
+        """The source for a URLResolver: its namespace, or top module name, otherwise the source it is included in. """
+        name = urls.urlconf_name
+        if isinstance(name, (list, tuple)):
+            name = ''
+        elif not isinstance(name, str):
+            name = name.__name__
+        return urls.namespace or name.split('.')[0] or source
+
+    def is_rejected(self, data):
+        """True if the UrlRow matches any of the known rejected_data combos. """
+        return any(all(getattr(data, k) == v for k, v in condition.items()) for condition in self.rejected_data)
+
+    def walk_urls(self, urls, source, prefix, sources, ignore, chains=None):
+        """Depth first walk with an explicit stack. Rows for ignored, rejected, or non-requested sources are skipped.
+        An included URLResolver with an ignored source is pruned: neither it nor anything it includes is expanded.
+        If a chains list is given, the sources of the included resolvers above each row are appended to it.
+        """
+        stack = [(iter([urls]), source, prefix, None)]
+        while stack:
+            patterns, source, prefix, chain = stack[-1]
+            urls = next(patterns, None)
+            if urls is None:
+                stack.pop()
+            elif isinstance(urls, resolvers.URLResolver):
+                sub_source = self.resolver_source(urls, source)
+                if getattr(urls, 'passthrough', False):  # Its patterns are listed as those of its parent.
+                    sub_source, sub_chain = source, chain
+                elif chain is None:  # The root still lists urls from its non-ignored includes.
+                    sub_chain = ()
+                elif sub_source in ignore:
+                    continue
+                else:
+                    sub_chain = chain + (sub_source, )
+                stack.append((iter(urls.url_patterns), sub_source, prefix + str(urls.pattern), sub_chain))
+            elif isinstance(urls, resolvers.URLPattern):
+                if source in ignore or (sources and source not in sources):
+                    continue
+                pattern = (prefix + str(urls.pattern))[1:]
+                data = UrlRow(source, urls.name, pattern, urls.lookup_str, dict(urls.default_args))
+                if self.is_rejected(data):
+                    continue
+                if chains is not None:
+                    chains.append(chain or ())
+                yield data
+            else:
+                raise ValueError(repr(urls))
+
+    def filter_snapshot(self, snapshot, sources, ignore):
+        """Generator of the snapshot UrlRow tuples, skipping those the same as walk_urls would. """
+        for data, chain in snapshot:
+            if data.source in ignore or (sources and data.source not in sources):
+                continue
+            if any(ea in ignore for ea in chain) or self.is_rejected(data):
+                continue
+            yield data
 
     def data_to_string(self, data):
         """Takes a 2d list of url data and returns a string formatted as a table, with title if multiple columns. """
@@ -97,49 +289,263 @@ class Command(BaseCommand):
             result = [' | '.join(('{:%d}' % widths[i]).format(v) for i, v in enumerate(ea)) for ea in data]
         return '\n'.join(result)
 
-    def get_url_data(self, sources=None, ignore=None, cols=None, sort=None, sub_rules=None):
+    def get_subs(self, sub_rules):
+        """Compiles the sub_rules, as a list of (column index, function) pairs. """
+        return [(self.all_columns.index(col), func) for col, func in compile_sub_rules(sub_rules).items()]
+
+    def get_sorted(self, rows, sort):
+        """Sorts the UrlRow tuples by the given column names, on their values before any substitutions. """
+        idx = [self.all_columns.index(key) for key in sort]
+        return sorted(rows, key=lambda u: [str(u[i] or '') for i in idx])
+
+    def clean_row(self, u, subs):
+        """Stringifies name & args values, applies the compiled substitutions, and replaces empty values with ''. """
+        source, name, pattern, lookup_str, args = u
+        row = [source, '' if name is None else str(name), pattern, lookup_str, '' if args is None else str(args)]
+        for i, apply_rules in subs:
+            row[i] = apply_rules(row[i])
+        return tuple(v or '' for v in row)
+
+    def get_url_data(self, sources=None, ignore=None, cols=None, sort=None, sub_rules=None, urls=None):
         """Collects all urls, then filters down to the desired data. Sets title & col_widths, Returns a 2d data list."""
-        all_urls = self.collect_urls()  # always returns a list, even if empty, or raises ValueError.
+        rows = list(self.iter_url_data(sources, ignore, cols, sort, sub_rules, urls))
+        if not rows:
+            return []
+        title = [key for key in self.all_columns if key in cols]
+        self.col_widths = {key: max(len(key), *(len(row[i]) for row in rows)) for i, key in enumerate(title)}
+        self.title = title
+        return rows
+
+    def iter_url_data(self, sources=None, ignore=None, cols=None, sort=None, sub_rules=None, urls=None):
+        """Generator of the rows for get_url_data. Filtered while walking, and only all held in memory for sorting. """
+        all_urls = self.collect_urls(urls, sources=sources, ignore=ignore)  # filtered while walking, or ValueError.
         if sort:
-            all_urls = sorted(all_urls, key=lambda x: [str(x[key] or '') for key in sort])
-        title = {key: key for key in all_urls[0].keys()}
-        all_urls.append(title)
-        if sources:  # make sure the title row does not get filtered out.
-            sources.append('source')
-        remove_idx, col_widths = [], {}
-        for i, u in enumerate(all_urls):
-            for col in ['name', 'args']:
-                val = u[col]
-                u[col] = '' if val is None else str(val)
-            # Prep removal, and don't compute length, for ignored sources or known rejected_data combo(s)
-            is_rejected = any(all(u[k] == v for k, v in condition.items()) for condition in self.rejected_data)
-            if u['source'] in ignore or is_rejected or (sources and u['source'] not in sources):
-                remove_idx.append(i)
+            all_urls = self.get_sorted(all_urls, sort)
+        subs = self.get_subs(sub_rules)
+        col_idx = [i for i, key in enumerate(self.all_columns) if key in cols]
+        for u in all_urls:
+            row = self.clean_row(u, subs)
+            yield [row[i] for i in col_idx]
+
+    def stream_rows(self, rows, cols, output_format):
+        """Writes each row to stdout as it is produced, as newline delimited json or as csv/tsv with a title row. """
+        if output_format == 'ndjson':
+            for row in rows:
+                self.stdout.write(json.dumps(dict(zip(cols, row))))
+            return
+        writer = csv.writer(self.stdout, delimiter=self.DELIMITERS[output_format], lineterminator='\n')
+        writer.writerow(cols)
+        for row in rows:
+            writer.writerow(row)
+
+    def bench_urls(self, sources=None, ignore=None, repeat=1000, sub_rules=None, urls=None):
+        """For each url, in the order resolve() checks them, times resolve() & reverse() on a sample path for it.
+        Rows have the name, path, count of patterns tried before a match, and p50 & p99 times in microseconds.
+        Urls where a sample path could not be made to resolve to the same view are left out.
+        The name gets the same substitutions as in the listing.
+        """
+        resolver = urls or resolvers.get_resolver()
+        name_idx = self.all_columns.index('name')
+        subs = [(i, func) for i, func in self.get_subs(sub_rules) if i == name_idx]
+        result = []
+        for u in self.collect_urls(resolver, sources=sources, ignore=ignore):
+            path = sample_path(u.pattern)
+            try:
+                match = resolver.resolve(path)
+            except resolvers.Resolver404:
                 continue
-            if sub_rules:
-                for regex, new_str, sub_cols in sub_rules:
-                    for col in sub_cols:
-                        u[col] = re.sub(regex, new_str, u[col])
-            for k, v in list(u.items()):  # could skip last column length since there is no ending border.
-                u[k] = v = v or ''
-                col_widths[k] = max(len(v), col_widths.get(k, 0))
-        for idx in reversed(remove_idx):
-            all_urls.pop(idx)
-        if len(all_urls) == 1:
-            return []
-        result = [[v for k, v in u.items() if k in cols] for u in all_urls]
-        self.title = result.pop()
-        self.col_widths = col_widths
+            if (match.url_name if u.name else match._func_path) != (u.name or u.lookup_str):
+                continue  # The sample path resolved to some other view.
+            resolve_times, reverse_times = [], []
+            for _ in range(repeat):
+                start = perf_counter()
+                resolver.resolve(path)
+                resolve_times.append(perf_counter() - start)
+            view_name = match.view_name if u.name else None
+            for _ in range(repeat if view_name else 0):
+                start = perf_counter()
+                reverse(view_name, args=match.args, kwargs=match.kwargs, urlconf=resolver.urlconf_name)
+                reverse_times.append(perf_counter() - start)
+            times = [round(percentile(ea, pct) * 1e6, 1) if ea else None
+                     for ea in (resolve_times, reverse_times) for pct in (50, 99)]
+            name = self.clean_row(u, subs)[name_idx]
+            result.append([name, path, count_tried(resolver, path), *times])
         return result
 
+    def handle_bench(self, kwargs, output_format):
+        """Runs bench_urls and gives the results in the requested format. """
+        result = self.bench_urls(kwargs['sources'], kwargs['ignore'], kwargs['repeat'], self.get_sub_rules(kwargs))
+        if kwargs['data']:
+            return json.dumps(result)
+        if output_format != 'table':
+            self.stream_rows(result, self.bench_columns, output_format)
+            return 0
+        self.write_table([['' if v is None else str(v) for v in row] for row in result], self.bench_columns)
+        return 0
+
+    def write_table(self, result, title):
+        """Sets the title and column widths for these rows of strings, then writes them to stdout as a table. """
+        self.title = title
+        self.col_widths = {k: max([len(k)] + [len(row[i]) for row in result]) for i, k in enumerate(title)}
+        self.stdout.write(self.data_to_string(result))
+
     def handle(self, *args, **kwargs):
         """Main interface, called to determine response. """
         col_names = self.get_col_names(kwargs)
         sub_rules = self.get_sub_rules(kwargs)
-        result = self.get_url_data(kwargs['sources'], kwargs['ignore'], col_names, kwargs['sort'], sub_rules)
+        url_args = (kwargs['sources'], kwargs['ignore'], col_names, kwargs['sort'], sub_rules)
+        output_format = kwargs.get('format', 'table')
+        if kwargs.get('snapshot'):
+            count = write_url_snapshot(kwargs['snapshot'])
+            self.stdout.write(f"Saved {count} urls to {kwargs['snapshot']}")
+            return 0
+        if kwargs.get('bench'):
+            return self.handle_bench(kwargs, output_format)
+        if output_format != 'table' and not kwargs['data']:
+            self.stream_rows(self.iter_url_data(*url_args), col_names, output_format)
+            return 0
+        result = self.get_url_data(*url_args)
         if kwargs['data']:
             return json.dumps(result)
         else:
             result = self.data_to_string(result)
             self.stdout.write(result)
             return 0
+
+
+def current_urlconf(urlconf=None):
+    return urlconf or get_urlconf() or settings.ROOT_URLCONF
+
+
+def memo_per_resolver(store, key, resolver, build):
+    """The result of build(), kept in the store by key for as long as the resolver is current: a cleared url cache
+    (as when ROOT_URLCONF changes) gives a new resolver, and so a new result.
+    """
+    cached = store.get(key)
+    if not cached or cached[0] is not resolver:
+        cached = store[key] = (resolver, build())
+    return cached[1]
+
+
+DEFAULT_OPTIONS = {'ignore': [], 'only': ['5'], 'not': [], 'sort': Command.initial_sort, 'long': False,
+                   'sub_cols': Command.initial_sub_cols, 'add': [], 'cols': None, }
+_inventory_cache = {}
+
+
+def get_url_inventory(*sources, urlconf=None, **kwargs):
+    """Same rows as 'urllist --data', as tuples, without the command overhead. Memoized per resolved urlconf. """
+    urlconf = current_urlconf(urlconf)
+    resolver = resolvers.get_resolver(urlconf)
+    opts = {**DEFAULT_OPTIONS, **kwargs, 'sources': list(sources)}
+
+    def build():
+        com = Command()
+        result = com.get_url_data(opts['sources'], opts['ignore'], com.get_col_names(opts), opts['sort'],
+                                  com.get_sub_rules(opts), urls=resolver)
+        return tuple(tuple(row) for row in result)
+    return memo_per_resolver(_inventory_cache, (urlconf, repr(sorted(opts.items()))), resolver, build)
+
+
+def clear_url_inventory(**kwargs):
+    """Empties the memoized get_url_inventory results and snapshots. Also connected to the setting_changed signal. """
+    if kwargs.get('setting', 'ROOT_URLCONF') in ('ROOT_URLCONF', 'URL_SNAPSHOT'):
+        _inventory_cache.clear()
+        _snapshots.clear()
+
+
+SNAPSHOT_VERSION = 1
+_snapshots = {}
+
+
+def snapshot_files():
+    """Source files that can change the urls: loaded modules with urlpatterns, and those of registered ModelAdmins. """
+    names = {name for name, module in list(sys.modules.items()) if hasattr(module, 'urlpatterns')}
+    if apps.is_installed('django.contrib.admin'):
+        from django.contrib.admin import site
+        names.update(type(model_admin).__module__ for model_admin in site._registry.values())
+    files = (getattr(sys.modules.get(name), '__file__', None) for name in names)
+    return sorted(ea for ea in files if ea)
+
+
+def url_structure(resolver):
+    """(type, pattern, view or urlconf) of each pattern of the resolver, and of included lists of patterns. These
+    change when settings (such as ASYNC_VIEWS or TRIE_URL_RESOLVER) give the same urlconf files other patterns.
+    """
+    parts, stack = [], [iter(resolver.url_patterns)]
+    while stack:
+        urls = next(stack[-1], None)
+        if urls is None:
+            stack.pop()
+            continue
+        if isinstance(urls, resolvers.URLResolver):
+            target = urls.urlconf_name
+            if isinstance(target, (list, tuple)):
+                stack.append(iter(urls.url_patterns))
+            target = getattr(target, '__name__', target) if not isinstance(target, (list, tuple)) else ''
+        else:
+            target = urls.lookup_str
+        parts.append(f'{type(urls).__module__}.{type(urls).__qualname__}|{urls.pattern}|{target}')
+    return parts
+
+
+def snapshot_key(urlconf, files):
+    """Hash of what the url inventory depends on: the current content of the given files, and the patterns of the
+    urlconf, its included lists of patterns, and their views.
+    """
+    digest = hashlib.sha256()
+    parts = [str(SNAPSHOT_VERSION), django.get_version(), urlconf, *settings.INSTALLED_APPS]
+    parts += url_structure(resolvers.get_resolver(urlconf))
+    if apps.is_installed('django.contrib.admin'):
+        from django.contrib.admin import site
+        parts += sorted(f'{model._meta.label}:{type(ma).__module__}.{type(ma).__name__}'
+                        for model, ma in site._registry.items())
+    for part in parts + files:
+        digest.update(part.encode() + b'\0')
+    for path in files:
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(b'\0missing\0')
+    return digest.hexdigest()
+
+
+def write_url_snapshot(path, urlconf=None):
+    """Walks all urls of the urlconf and saves them, with a key for checking they are current, in a json file. """
+    urlconf = current_urlconf(urlconf)
+    chains = []
+    rows = list(Command().walk_urls(resolvers.get_resolver(urlconf), None, '', [], [], chains=chains))
+    files = snapshot_files()
+    rows = [[*u[:4], str(u.args) if u.args else {}, list(chain)] for u, chain in zip(rows, chains)]
+    content = {'version': SNAPSHOT_VERSION, 'urlconf': urlconf, 'files': files, 'key': snapshot_key(urlconf, files),
+               'columns': [*UrlRow._fields, 'chain'], 'rows': rows}
+    write_file(path, json.dumps(content, separators=(',', ':')).encode())
+    return len(rows)
+
+
+def load_url_snapshot(path, urlconf):
+    """Returns a list of (UrlRow, chain) from the snapshot file, or None if it is missing, for another urlconf,
+    or no longer current. Non-empty args were saved as their string, which is all urllist uses them for.
+    """
+    try:
+        with open(path) as f:
+            content = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if content.get('version') != SNAPSHOT_VERSION or content.get('urlconf') != urlconf:
+        return None
+    if content.get('key') != snapshot_key(urlconf, content.get('files', [])):
+        return None
+    return [(UrlRow(*row[:5]), tuple(row[5])) for row in content['rows']]
+
+
+def get_snapshot_rows(resolver):
+    """The loaded URL_SNAPSHOT rows if the resolver is a root resolver and the snapshot is current, otherwise None. """
+    path = getattr(settings, 'URL_SNAPSHOT', None)
+    urlconf = getattr(resolver, 'urlconf_name', None)
+    if not path or not isinstance(urlconf, str) or resolver is not resolvers.get_resolver(urlconf):
+        return None
+    return memo_per_resolver(_snapshots, urlconf, resolver, lambda: load_url_snapshot(path, urlconf))
+
+
+setting_changed.connect(clear_url_inventory)
@@ -0,0 +1,61 @@
+import os
+import json
+import django
+from functools import partial
+from multiprocessing import get_context
+from django.core.management.base import CommandError
+from .urllist import Command as UrlList
+
+
+def collect_inventory(settings_module, options):
+    """Run in a new process: boots Django with the given settings module and returns its url data. """
+    os.environ['DJANGO_SETTINGS_MODULE'] = settings_module
+    django.setup()
+    com = UrlList()
+    cols = com.get_col_names(options)
+    rows = com.get_url_data(options['sources'], options['ignore'], cols, options['sort'], com.get_sub_rules(options))
+    return settings_module, rows
+
+
+class Command(UrlList):
+    """Same as urllist, but for each of many settings modules, each booted in its own process, with a settings column.
+    Example: manage.py urllist_settings --modules project.settings other.settings --ignore admin
+    """
+    inventory_options = ['sources', 'ignore', 'only', 'not', 'sort', 'long', 'sub_cols', 'add', 'cols']
+    unsupported_options = ['bench', 'repeat', 'snapshot']
+
+    def add_arguments(self, parser):
+        """Adds the settings modules, and number of processes, to all of the urllist arguments. """
+        super().add_arguments(parser)
+        self.unsupported_defaults = {key: parser.get_default(key) for key in self.unsupported_options}
+        parser.add_argument('--modules', nargs='+', required=True, metavar='settings',
+                            help='The settings modules (python path) to collect url data for. ', )
+        parser.add_argument('--processes', '-p', type=int, default=None,
+                            help='Max processes at once. Default: one per settings module, up to the cpu count. ', )
+
+    def iter_inventories(self, modules, options, processes=None):
+        """Generator of (settings_module, rows), in the order each finishes. Each booted process is used only once. """
+        processes = processes or min(len(modules), os.cpu_count() or 1)
+        options = {key: options[key] for key in self.inventory_options}
+        with get_context('spawn').Pool(processes, maxtasksperchild=1) as pool:
+            yield from pool.imap_unordered(partial(collect_inventory, options=options), modules)
+
+    def handle(self, *args, **kwargs):
+        """Collects url data for each settings module in parallel, then merges with a settings column. """
+        given = [key for key, default in self.unsupported_defaults.items() if kwargs.get(key, default) != default]
+        if given:
+            raise CommandError("Not supported by urllist_settings: %s. " % ', '.join('--' + ea for ea in given))
+        modules = list(dict.fromkeys(kwargs['modules']))
+        inventories = self.iter_inventories(modules, kwargs, kwargs['processes'])
+        title = ['settings', *self.get_col_names(kwargs)]
+        output_format = kwargs.get('format', 'table')
+        if output_format != 'table' and not kwargs['data']:
+            self.stream_rows((row for module, rows in inventories for row in ([module, *ea] for ea in rows)),
+                             title, output_format)
+            return 0
+        by_module = {module: rows for module, rows in inventories}
+        result = [[module, *row] for module in modules for row in by_module[module]]
+        if kwargs['data']:
+            return json.dumps(result)
+        self.write_table(result, title)
+        return 0
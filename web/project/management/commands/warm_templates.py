@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from time import perf_counter
+from project.template_cache import warm_templates
+
+
+class Command(BaseCommand):
+    """Compiles every template found through TEMPLATES 'DIRS' and 'APP_DIRS' (or other loader directories).
+    With the cached loader this fills its cache, and with project.template_cache.Loader its on-disk cache as well.
+    Example: manage.py warm_templates -v 2
+    """
+    help = 'Compile all templates, to check them and to fill the template caches. Lists each with verbosity 2. '
+
+    def add_arguments(self, parser):
+        parser.add_argument('--using', default=None, metavar='alias',
+                            help='Only for this TEMPLATES engine alias. Default: every Django template engine. ', )
+
+    def handle(self, *args, **kwargs):
+        start = perf_counter()
+        results = warm_templates(kwargs['using'])
+        seconds = perf_counter() - start
+        errors = 0
+        for alias, name, error in results:
+            if error is not None:
+                errors += 1
+                self.stderr.write(f"{alias}: {name} - {error.__class__.__name__}: {error} ")
+            elif kwargs['verbosity'] > 1:
+                self.stdout.write(f"{alias}: {name} ")
+        self.stdout.write(f"Compiled {len(results) - errors} of {len(results)} templates in {seconds:.2f}s ")
@@ -0,0 +1,202 @@
+import os
+import asyncio
+import hashlib
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.signals import setting_changed
+from django.http import HttpResponse
+from django.template.loader import get_template
+from django.urls import get_urlconf
+from django.utils.cache import get_conditional_response, patch_vary_headers, quote_etag, set_response_etag
+from django.utils.translation import get_language
+from .async_views import load_request_state
+from .management.commands.urllist import get_url_inventory
+
+MESSAGES_COOKIE = 'messages'  # Pending messages (cookie storage) are shown once, so the page is not from the cache.
+IN_PROCESS_CACHES = (LocMemCache, DummyCache)  # Used directly by async views, without blocking the event loop.
+_template_files = {}
+_inventory_versions = {}
+
+
+def template_files(names):
+    """The source file of each template name, as found by the template loaders. Memoized per names. """
+    key = tuple(names)
+    files = _template_files.get(key)
+    if files is None:
+        files = _template_files[key] = [get_template(name).origin.name for name in names]
+    return files
+
+
+def inventory_version():
+    """Hash of the full url inventory. Only computed again when get_url_inventory has new rows. """
+    urlconf = get_urlconf() or settings.ROOT_URLCONF
+    rows = get_url_inventory(long=True)
+    cached = _inventory_versions.get(urlconf)
+    if cached and cached[0] is rows:
+        return cached[1]
+    version = hashlib.md5(repr(rows).encode()).hexdigest()
+    _inventory_versions[urlconf] = (rows, version)
+    return version
+
+
+def page_version(template_names):
+    """Changes when the url inventory, or the modified time or size of any of these templates, changes. """
+    stats = [os.stat(name) for name in template_files(template_names)]
+    text = repr([inventory_version(), *((st.st_mtime_ns, st.st_size) for st in stats)])
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+def request_varies(request):
+    """Hash of what a page may vary on for the request: the path, language, and the user or session. """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        who = 'user.%s' % user.pk
+    elif getattr(request, 'session', None) is not None and request.session.session_key:
+        who = 'session.%s' % request.session.session_key
+    else:
+        who = 'anon'
+    return hashlib.md5(' '.join((request.get_full_path(), get_language() or '', who)).encode()).hexdigest()
+
+
+def page_cache_key(request, prefix, version):
+    """Cache key for this view prefix and page version, varied on path, language, and the user or session. """
+    return 'page:%s:%s:%s' % (prefix, version, request_varies(request))
+
+
+def is_cacheable(request, response):
+    """Only successful responses that set no cookies and do not use the CSRF token can be shared. """
+    return (response.status_code == 200 and not response.cookies and
+            not request.META.get('CSRF_COOKIE_USED') and not response.has_header('ETag'))
+
+
+def record_stream(request, chunks, cache, key, content_type, seconds):
+    """Yields the streamed chunks, then caches the whole content, with its ETag, once the stream has completed. """
+    content = []
+    for chunk in chunks:
+        content.append(chunk)
+        yield chunk
+    if not request.META.get('CSRF_COOKIE_USED'):
+        body = b''.join(content)
+        cache.set(key, (body, content_type, quote_etag(hashlib.md5(body).hexdigest())), seconds)
+
+
+def page_cache_lookup(request, prefix, template_names, timeout=None, cache_alias='default'):
+    """(cache, key, seconds, entry) for the request, with entry None if not cached yet, or None if not cacheable. """
+    seconds = settings.PAGE_CACHE_SECONDS if timeout is None else timeout
+    if not seconds or request.method not in ('GET', 'HEAD') or MESSAGES_COOKIE in request.COOKIES:
+        return None
+    cache = caches[cache_alias]
+    key = page_cache_key(request, prefix, page_version(template_names))
+    return cache, key, seconds, cache.get(key)
+
+
+def page_cache_response(request, found, response=None, record=True):
+    """The response from the found cache entry, or else the given response, which is cached if it can be.
+    A streaming response is recorded to the cache as it is sent, unless record is False.
+    """
+    cache, key, seconds, entry = found
+    if entry is None:
+        if callable(getattr(response, 'render', None)):
+            response = response.render()
+        if not is_cacheable(request, response):
+            return response
+        if response.streaming:  # No ETag for this one, but it is cached once it has all been sent.
+            if record:
+                response.streaming_content = record_stream(request, response.streaming_content, cache, key,
+                                                           response['Content-Type'], seconds)
+            patch_vary_headers(response, ('Cookie', ))
+            return response
+        set_response_etag(response)
+        entry = (response.content, response['Content-Type'], response['ETag'])
+        cache.set(key, entry, seconds)
+    else:
+        response = HttpResponse(entry[0], content_type=entry[1])
+        response['ETag'] = entry[2]
+    patch_vary_headers(response, ('Cookie', ))
+    return get_conditional_response(request, etag=entry[2], response=response)
+
+
+def cached_response(request, prefix, template_names, get_response, timeout=None, cache_alias='default'):
+    """Response from get_response(request), or a copy of it from the cache. Either has an ETag of the body hash,
+    and is a 304 Not Modified if the request If-None-Match has that ETag. A streaming response is cached once it
+    has all been sent. The page version is in the cache key, so changed templates or url inventory are not served
+    from old entries. A timeout of 0 turns off the page cache.
+    """
+    found = page_cache_lookup(request, prefix, template_names, timeout, cache_alias)
+    if found is None:
+        return get_response(request)
+    return page_cache_response(request, found, get_response(request) if found[3] is None else None)
+
+
+async def async_cached_response(request, prefix, template_names, get_response, timeout=None, cache_alias='default'):
+    """As cached_response, for an async get_response. With a cache that is not in-process (which could block, or
+    need the database), the cache is used in a thread, and streaming responses are not cached.
+    """
+    await load_request_state(request)
+    in_process = isinstance(caches[cache_alias], IN_PROCESS_CACHES)
+    args = (request, prefix, template_names, timeout, cache_alias)
+    found = page_cache_lookup(*args) if in_process else await sync_to_async(page_cache_lookup)(*args)
+    if found is None:
+        return await get_response(request)
+    response = await get_response(request) if found[3] is None else None
+    if in_process:
+        return page_cache_response(request, found, response)
+    return await sync_to_async(page_cache_response)(request, found, response, record=False)
+
+
+def cache_page_view(*template_names, timeout=None, cache_alias='default'):
+    """Decorator for a function view (or async view) rendering the given templates (include any it extends).
+    See cached_response.
+    """
+    def decorator(view_func):
+        prefix = '%s.%s' % (view_func.__module__, view_func.__qualname__)
+
+        if asyncio.iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                def get_response(request):
+                    return view_func(request, *args, **kwargs)
+                return await async_cached_response(request, prefix, template_names, get_response, timeout,
+                                                   cache_alias)
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            def get_response(request):
+                return view_func(request, *args, **kwargs)
+            return cached_response(request, prefix, template_names, get_response, timeout, cache_alias)
+        return wrapper
+    return decorator
+
+
+class CachedPageMixin:
+    """For TemplateView classes: dispatch through the page cache, versioned by the view templates.
+    Views with async handlers (view_is_async, as with AsyncViewMixin) use async_cached_response.
+    """
+    page_cache_templates = ()  # Other templates the output depends on, such as those template_name extends.
+    page_cache_timeout = None
+    page_cache_alias = 'default'
+
+    def dispatch(self, request, *args, **kwargs):
+        cls = self.__class__
+        prefix = '%s.%s' % (cls.__module__, cls.__qualname__)
+        templates = [*self.get_template_names(), *self.page_cache_templates]
+
+        def get_response(request):
+            return super(CachedPageMixin, self).dispatch(request, *args, **kwargs)
+        respond = async_cached_response if getattr(self, 'view_is_async', False) else cached_response
+        return respond(request, prefix, templates, get_response, self.page_cache_timeout, self.page_cache_alias)
+
+
+def clear_page_versions(**kwargs):
+    """Empties the memoized template files and inventory versions. Also connected to the setting_changed signal. """
+    if kwargs.get('setting', 'TEMPLATES') in ('TEMPLATES', 'ROOT_URLCONF', 'URL_SNAPSHOT'):
+        _template_files.clear()
+        _inventory_versions.clear()
+
+
+setting_changed.connect(clear_page_versions)
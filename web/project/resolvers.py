@@ -0,0 +1,144 @@
+from django.core.signals import setting_changed
+from django.urls import resolvers, get_script_prefix, reverse, NoReverseMatch
+from django.utils.functional import cached_property
+from .management.commands.urllist import Command as UrlList, anchored_prefix, sample_path
+from .management.commands.urllist import current_urlconf, memo_per_resolver
+
+_reverse_maps = {}
+
+
+def literal_prefix(pattern):
+    """Returns the literal text any path matched by this pattern must start with. Empty string if unknown. """
+    if isinstance(pattern, resolvers.RoutePattern) and isinstance(pattern._route, str):
+        return pattern._route.split('<', 1)[0]
+    if isinstance(pattern, resolvers.RegexPattern) and isinstance(pattern._regex, str) and '|' not in pattern._regex:
+        return anchored_prefix(pattern._regex.split('(', 1)[0]) or ''
+    return ''  # LocalePrefixPattern, translated (lazy) routes, or some other pattern class.
+
+
+class PrefixTrie:
+    """Character trie of literal prefixes. Gives the indexes of all prefixes that the given text starts with. """
+
+    def __init__(self, prefixes):
+        self.root, self.always = {}, []
+        for index, prefix in enumerate(prefixes):
+            if not prefix:
+                self.always.append(index)
+                continue
+            node = self.root
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node.setdefault(None, []).append(index)
+
+    def candidates(self, text):
+        """Indexes, in their original order, of the prefixes the text starts with (including all empty prefixes). """
+        found, node = list(self.always), self.root
+        for char in text:
+            node = node.get(char)
+            if node is None:
+                break
+            found.extend(node.get(None, ()))
+        return sorted(found)
+
+
+class TrieURLResolver(resolvers.URLResolver):
+    """Resolves the same as URLResolver, but only checks the patterns whose literal prefix starts the path.
+    Patterns that start with a dynamic segment are always checked. Included resolvers are also TrieURLResolver.
+    Usable as the root resolver: TrieURLResolver(RegexPattern(r'^/'), settings.ROOT_URLCONF), or see trie_urlpatterns.
+    """
+    passthrough = False  # Only wraps the patterns of its parent, so is not a source of its own (as for urllist).
+
+    @cached_property
+    def url_patterns(self):
+        patterns = super().url_patterns
+        return [self.from_resolver(p) if type(p) is resolvers.URLResolver else p for p in patterns]
+
+    @cached_property
+    def trie(self):
+        return PrefixTrie([literal_prefix(p.pattern) for p in self.url_patterns])
+
+    @classmethod
+    def from_resolver(cls, resolver):
+        return cls(resolver.pattern, resolver.urlconf_name, resolver.default_kwargs, resolver.app_name,
+                   resolver.namespace)
+
+    def resolve(self, path):
+        path = str(path)  # path may be a reverse_lazy object
+        match = self.pattern.match(path)
+        if match:
+            new_path, args, kwargs = match
+            url_patterns = self.url_patterns
+            for index in self.trie.candidates(new_path):
+                pattern = url_patterns[index]
+                try:
+                    sub_match = pattern.resolve(new_path)
+                except resolvers.Resolver404:
+                    continue
+                if sub_match:
+                    return self.merge_match(pattern, sub_match, args, kwargs)
+        return super().resolve(path)  # Not found: raise the same Resolver404, with every pattern tried.
+
+    def merge_match(self, pattern, sub_match, args, kwargs):
+        """Same as URLResolver.resolve: merge the captured arguments in this match with those of the sub_match. """
+        sub_match_dict = {**kwargs, **self.default_kwargs}
+        sub_match_dict.update(sub_match.kwargs)
+        # If there are *any* named groups, ignore all non-named groups.
+        sub_match_args = sub_match.args
+        if not sub_match_dict:
+            sub_match_args = args + sub_match.args
+        current_route = '' if isinstance(pattern, resolvers.URLPattern) else str(pattern.pattern)
+        return resolvers.ResolverMatch(
+            sub_match.func,
+            sub_match_args,
+            sub_match_dict,
+            sub_match.url_name,
+            [self.app_name] + sub_match.app_names,
+            [self.namespace] + sub_match.namespaces,
+            self._join_route(current_route, sub_match.route),
+        )
+
+
+def trie_urlpatterns(urlpatterns):
+    """For a ROOT_URLCONF: the stock root resolver only checks this one pattern, which resolves with the trie. """
+    resolver = TrieURLResolver(resolvers.RoutePattern(''), urlpatterns)
+    resolver.passthrough = True
+    return [resolver]
+
+
+def get_reverse_map(urlconf=None):
+    """Maps each view name that reverses without arguments to its path (without script prefix). Memoized per urlconf.
+    Built from the urllist data: each named url whose sample path resolves gives the view name to reverse once.
+    """
+    urlconf = current_urlconf(urlconf)
+    resolver = resolvers.get_resolver(urlconf)
+
+    def build():
+        prefix, reverse_map = get_script_prefix(), {}
+        for u in UrlList().collect_urls(resolver):
+            if not u.name:
+                continue
+            try:
+                view_name = resolver.resolve(sample_path(u.pattern)).view_name
+                reverse_map[view_name] = reverse(view_name, urlconf=urlconf)[len(prefix):]
+            except (resolvers.Resolver404, NoReverseMatch):
+                continue
+        return reverse_map
+    return memo_per_resolver(_reverse_maps, urlconf, resolver, build)
+
+
+def cached_reverse(viewname, urlconf=None, args=None, kwargs=None, current_app=None):
+    """Same result as reverse(). Uses the reverse map for view names without arguments or an app namespace choice. """
+    if not args and not kwargs and isinstance(viewname, str) and not (current_app and ':' in viewname):
+        path = get_reverse_map(urlconf).get(viewname)
+        if path is not None:
+            return get_script_prefix() + path
+    return reverse(viewname, urlconf=urlconf, args=args, kwargs=kwargs, current_app=current_app)
+
+
+def clear_reverse_maps(**kwargs):
+    """Empties the memoized results of get_reverse_map. Also connected to the setting_changed signal. """
+    if kwargs.get('setting', 'ROOT_URLCONF') == 'ROOT_URLCONF':
+        _reverse_maps.clear()
+
+
+setting_changed.connect(clear_reverse_maps)
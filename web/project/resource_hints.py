@@ -0,0 +1,150 @@
+from html.parser import HTMLParser
+from django.core.signals import setting_changed
+from django.template.loader import get_template
+from django.urls import URLResolver, Resolver404, get_resolver, resolve
+
+_view_hints = {}
+
+
+class CriticalResourceParser(HTMLParser):
+    """Collects (url, as) of the stylesheets and scripts in the <head>, and the images in the first <header>. """
+
+    def __init__(self):
+        super().__init__()
+        self.resources, self.section, self.done = [], 'start', False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag in ('head', 'header'):
+            self.section = tag
+        attrs = dict(attrs)
+        if tag == 'link' and self.section == 'head':
+            rel = (attrs.get('rel') or '').lower().split()
+            if 'stylesheet' in rel and attrs.get('href'):
+                self.resources.append((attrs['href'], 'style'))
+            elif 'preload' in rel and attrs.get('href') and attrs.get('as'):
+                self.resources.append((attrs['href'], attrs['as']))
+        elif tag == 'script' and self.section == 'head' and attrs.get('src'):
+            self.resources.append((attrs['src'], 'script'))
+        elif tag == 'img' and self.section == 'header' and attrs.get('src'):
+            self.resources.append((attrs['src'], 'image'))
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self.section = 'body'
+        elif tag == 'header':
+            self.done = True
+
+
+def critical_resources(html):
+    """The (url, as) of each stylesheet & script in the <head>, and image in the <header>, once each, in order. """
+    parser = CriticalResourceParser()
+    parser.feed(html)
+    parser.close()
+    return list(dict.fromkeys(parser.resources))
+
+
+def template_hints(template_name, context=None):
+    """The Link header values to preload the critical resources of this template, rendered with the given context.
+    Rendered without a request, so only templates whose <head> and <header> do not need one give hints.
+    """
+    try:
+        html = get_template(template_name).render(dict(context or {}))
+    except Exception:
+        return ()
+    return tuple('<%s>; rel=preload; as=%s' % resource for resource in critical_resources(html))
+
+
+def preload_template(template_name, **context):
+    """Decorator for a function view, giving the template (and context) its preload hints come from. """
+    def decorator(view_func):
+        view_func.preload_template, view_func.preload_context = template_name, context
+        return view_func
+    return decorator
+
+
+def get_view_hints(view_func):
+    """The Link header values for this view, from its template and extra context. Memoized per view function, as
+    each as_view of a class view (such as TemplateView) may give it another template_name and extra_context.
+    Function views use the template and context given by the preload_template decorator.
+    """
+    hints = _view_hints.get(view_func)
+    if hints is None:
+        if hasattr(view_func, 'view_class'):
+            cls, initkwargs = view_func.view_class, getattr(view_func, 'view_initkwargs', {})
+            template_name = initkwargs.get('template_name', getattr(cls, 'template_name', None))
+            context = initkwargs.get('extra_context', getattr(cls, 'extra_context', None))
+        else:
+            template_name = getattr(view_func, 'preload_template', None)
+            context = getattr(view_func, 'preload_context', None)
+        hints = _view_hints[view_func] = template_hints(template_name, context) if template_name else ()
+    return hints
+
+
+def get_path_hints(path, urlconf=None):
+    """The Link header values for the view that the path resolves to, or empty if it does not resolve. """
+    try:
+        match = resolve(path, urlconf)
+    except Resolver404:
+        return ()
+    return get_view_hints(match.func)
+
+
+def warm_view_hints(urlconf=None):
+    """Gets the hints for every view in the urlconf, so none are extracted during a request. Returns the count. """
+    resolvers, count = [get_resolver(urlconf)], 0
+    while resolvers:
+        for pattern in resolvers.pop().url_patterns:
+            if isinstance(pattern, URLResolver):
+                resolvers.append(pattern)
+            else:
+                count += bool(get_view_hints(pattern.callback))
+    return count
+
+
+class ResourceHintsMiddleware:
+    """Adds 'Link: <url>; rel=preload' headers for the critical resources of the view template to HTML responses.
+    The hints for every view are extracted when the middleware is loaded, at start up.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        warm_view_hints()
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        hints = getattr(request, 'resource_hints', ())
+        if hints and response.status_code == 200 and not response.has_header('Link') and \
+                response.get('Content-Type', '').startswith('text/html'):
+            response['Link'] = ', '.join(hints)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.resource_hints = get_view_hints(view_func)
+
+
+class EarlyHintsASGI:
+    """ASGI middleware sending a 103 Early Hints of the view preload links before the view runs, for servers with
+    the 'http.response.early_hint' extension (such as hypercorn). In asgi.py: application = EarlyHintsASGI(application)
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and 'http.response.early_hint' in scope.get('extensions', {}):
+            path, root_path = scope['path'], scope.get('root_path', '')
+            hints = get_path_hints(path[len(root_path):] if root_path and path.startswith(root_path) else path)
+            if hints:
+                await send({'type': 'http.response.early_hint', 'links': [ea.encode('latin1') for ea in hints]})
+        return await self.application(scope, receive, send)
+
+
+def clear_view_hints(**kwargs):
+    """Empties the memoized view hints. Also connected to the setting_changed signal. """
+    if kwargs.get('setting', 'TEMPLATES') in ('TEMPLATES', 'STATIC_URL', 'STATIC_BUILD_DIR', 'STATICFILES_STORAGE'):
+        _view_hints.clear()
+
+
+setting_changed.connect(clear_view_hints)
@@ -0,0 +1,78 @@
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.sessions.backends.base import UpdateError, VALID_KEY_CHARS
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import router
+from django.utils.crypto import get_random_string
+from .tiered_cache import TieredCache
+
+KEY_PREFIX = 'project.session_store'
+LOCAL_CACHES = (LocMemCache, TieredCache)  # Another process would still have a session after it is deleted here.
+
+
+class SessionStore(CachedDBStore):
+    """Session engine (SESSION_ENGINE = 'project.session_store') reading from the cache, and writing through to the
+    database so sessions outlive the cache. The cache has the data with the expiry date in the database, so a
+    request only queries the database when its session is not in the cache. A session is only written when its
+    data changed. Otherwise a save (as with SESSION_SAVE_EVERY_REQUEST) only moves the expiry date forward, and
+    only once it has moved at least SESSION_REFRESH_SECONDS, as one update of that date. The SESSION_CACHE_ALIAS
+    must be shared by all processes (not LocMemCache), so a session deleted in one is gone for all of them.
+    """
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        if isinstance(self._cache, LOCAL_CACHES):
+            raise ImproperlyConfigured("SESSION_CACHE_ALIAS '%s' is not shared by all processes, as %s needs."
+                                       % (settings.SESSION_CACHE_ALIAS, __name__))
+        self._stored, self._expire_date = None, None
+
+    def dumps(self, data):
+        return self.serializer().dumps(data)
+
+    def loaded(self, data, expire_date):
+        """Notes the data and expiry date as in the database, to compare when saving. """
+        self._stored, self._expire_date = self.dumps(data), expire_date
+        return data
+
+    def load(self):
+        try:
+            cached = self._cache.get(self.cache_key)
+        except Exception:
+            cached = None  # Some backends raise an exception on an invalid key, then the session is reset.
+        if cached is not None:
+            data, expire_date = cached
+            return self.loaded(data, expire_date)
+        s = self._get_session_from_db()
+        if not s:
+            return {}
+        data = self.decode(s.session_data)
+        self._cache.set(self.cache_key, (data, s.expire_date), self.get_expiry_age(expiry=s.expire_date))
+        return self.loaded(data, s.expire_date)
+
+    def _get_new_session_key(self):
+        """A random key, not checked in the database: a save with must_create fails for a key in use. """
+        return get_random_string(32, VALID_KEY_CHARS)
+
+    def is_unmodified(self):
+        return self._stored is not None and self.dumps(self._get_session()) == self._stored
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        expire_date = self.get_expiry_date()
+        if not must_create and self.is_unmodified():
+            if expire_date - self._expire_date < timedelta(seconds=settings.SESSION_REFRESH_SECONDS):
+                return
+            using = router.db_for_write(self.model)
+            if not self.model.objects.using(using).filter(session_key=self.session_key).update(
+                    expire_date=expire_date):
+                raise UpdateError
+        else:
+            DBStore.save(self, must_create)
+        data = self._get_session(no_load=must_create)
+        self._cache.set(self.cache_key, (data, expire_date), self.get_expiry_age(expiry=expire_date))
+        self.loaded(data, expire_date)
@@ -55,8 +55,22 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+RESOURCE_HINTS = strtobool(os.environ.get('RESOURCE_HINTS', 'False'))  # Preload headers, see project.resource_hints
+if RESOURCE_HINTS:
+    MIDDLEWARE.insert(0, 'project.resource_hints.ResourceHintsMiddleware')
+SINGLE_FLIGHT = strtobool(os.environ.get('SINGLE_FLIGHT', 'False'))  # Coalesce GETs, see project.single_flight
+SINGLE_FLIGHT_TIMEOUT = float(os.environ.get('SINGLE_FLIGHT_TIMEOUT', 30))  # Seconds to wait on a shared response.
+if SINGLE_FLIGHT:
+    MIDDLEWARE.append('project.single_flight.SingleFlightMiddleware')
+COMPRESS_RESPONSES = strtobool(os.environ.get('COMPRESS_RESPONSES', 'False'))  # gzip, see project.compression
+COMPRESS_STRIP_HTML = strtobool(os.environ.get('COMPRESS_STRIP_HTML', 'False'))  # Collapse whitespace in HTML.
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 200))  # Smaller bodies are sent as they are.
+if COMPRESS_RESPONSES:
+    MIDDLEWARE.insert(0, 'project.compression.CompressionMiddleware')
 
 ROOT_URLCONF = 'project.urls'
+TRIE_URL_RESOLVER = strtobool(os.environ.get('TRIE_URL_RESOLVER', 'False'))  # See project.resolvers
+URL_SNAPSHOT = os.environ.get('URL_SNAPSHOT', None)  # Made with: manage.py urllist --snapshot PATH
 
 TEMPLATES = [
     {
@@ -75,6 +89,17 @@ TEMPLATES = [
     },
 ]
 
+TEMPLATE_CACHE_DIR = os.environ.get('TEMPLATE_CACHE_DIR', None)  # Filled with: manage.py warm_templates
+if TEMPLATE_CACHE_DIR and not DEBUG:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [('project.template_cache.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+        ], TEMPLATE_CACHE_DIR)]
+STREAMING_TEMPLATES = strtobool(os.environ.get('STREAMING_TEMPLATES', 'False'))  # See project.streaming
+CRITICAL_CSS = strtobool(os.environ.get('CRITICAL_CSS', 'False'))  # See project.critical_css
+ASYNC_VIEWS = strtobool(os.environ.get('ASYNC_VIEWS', 'False'))  # For ASGI, see project.async_views
+
 WSGI_APPLICATION = 'project.wsgi.application' if LOCAL else os.environ.get('LIVE_WSGI_FILE', 'project.wsgi.application')
 
 # Database
@@ -105,6 +130,75 @@ DATABASES = {
 if os.environ.get('DB_TYPE') == 'mysql':  # pragma: no cover
     DATABASES['default']['OPTIONS'] = {'charset': 'utf8mb4'}
     MAX_INDEX_CHARACTER_SIZE = 191
+SQLITE_PROFILES = {  # PRAGMAS for each new connection, by the project.sqlite3 backend.
+    'default': {},
+    'fast': {
+        'journal_mode': 'WAL',  # Readers do not block the writer, and the writer does not block readers.
+        'synchronous': 'NORMAL',  # With WAL: no fsync on each commit, and still safe from corruption.
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64000,  # In KiB when negative, so 64 MB.
+        'busy_timeout': 5000,  # Milliseconds to wait on a lock before 'database is locked'.
+        'temp_store': 'MEMORY',
+    },
+}
+SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'default')
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3' and SQLITE_PROFILES.get(SQLITE_PROFILE):
+    DATABASES['default'].update(ENGINE='project.sqlite3', PRAGMAS=SQLITE_PROFILES[SQLITE_PROFILE])
+# Replicas, as 'HOST[:PORT][=WEIGHT]' (or 'NAME[=WEIGHT]' for SQLite), comma separated. See project.db_router
+DB_REPLICAS = os.environ.get('LOCAL_DB_REPLICAS' if LOCAL else 'LIVE_DB_REPLICAS', os.environ.get('DB_REPLICAS', ''))
+DATABASE_REPLICAS = {}  # Alias: weight
+for num, replica in enumerate((ea.strip() for ea in DB_REPLICAS.split(',') if ea.strip()), start=1):
+    location, _, weight = replica.rpartition('=') if '=' in replica else (replica, '', '1')
+    alias = 'replica_%d' % num
+    DATABASES[alias] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+    if 'sqlite3' in DATABASES['default']['ENGINE']:
+        DATABASES[alias]['NAME'] = location
+    else:  # pragma: no cover
+        host, _, port = location.partition(':')
+        DATABASES[alias].update(HOST=host, PORT=port or DATABASES['default'].get('PORT', ''))
+    DATABASE_REPLICAS[alias] = float(weight)
+REPLICA_SELECTION = os.environ.get('REPLICA_SELECTION', 'weight')  # Or 'latency', for the fastest health checks.
+REPLICA_CHECK_SECONDS = int(os.environ.get('REPLICA_CHECK_SECONDS', 10))
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))  # Reads after a write go to the primary.
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['project.db_router.ReplicaRouter']
+    MIDDLEWARE.insert(0, 'project.db_router.ReplicaPinMiddleware')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'default',
+    },
+}
+TIERED_CACHE = os.environ.get('TIERED_CACHE', '')  # 'file' or 'db': a shared tier behind the local one.
+TIERED_CACHE_LOCATION = os.environ.get('TIERED_CACHE_LOCATION', '')  # Directory, or table made by: createcachetable
+if TIERED_CACHE in ('file', 'db'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'project.tiered_cache.TieredCache',
+            'LOCATION': 'default',
+            'OPTIONS': {
+                'SHARED': 'shared',
+                'MAX_ENTRIES': int(os.environ.get('TIERED_CACHE_MAX_ENTRIES', 300)),
+                'STAMP_SECONDS': int(os.environ.get('TIERED_CACHE_STAMP_SECONDS', 1)),
+            },
+        },
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': TIERED_CACHE_LOCATION or os.path.join(BASE_DIR, '.django_cache'),
+            'OPTIONS': {'MAX_ENTRIES': 3000},
+        },
+    }
+    if TIERED_CACHE == 'db':
+        CACHES['shared'].update(BACKEND='django.core.cache.backends.db.DatabaseCache',
+                                LOCATION=TIERED_CACHE_LOCATION or 'django_cache')
+PAGE_CACHE_SECONDS = int(os.environ.get('PAGE_CACHE_SECONDS', 0))  # project.page_cache timeout, off (0) by default.
+if strtobool(os.environ.get('CACHED_SESSIONS', 'False')):  # See project.session_store
+    SESSION_ENGINE = 'project.session_store'
+    # Shared by all processes, so a logout is seen by all of them: the shared tier of TIERED_CACHE, or set one.
+    SESSION_CACHE_ALIAS = os.environ.get('SESSION_CACHE_ALIAS', 'shared' if 'shared' in CACHES else 'default')
+SESSION_SAVE_EVERY_REQUEST = strtobool(os.environ.get('SESSION_SAVE_EVERY_REQUEST', 'False'))  # Sliding expiry.
+SESSION_REFRESH_SECONDS = int(os.environ.get('SESSION_REFRESH_SECONDS', 300))  # Between expiry date writes.
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
@@ -127,6 +221,10 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/3.0/howto/static-files/
 USE_S3 = strtobool(os.environ.get('USE_S3', 'False'))
+STATIC_BUILD_DIR = os.environ.get('STATIC_BUILD_DIR', None)  # Filled with: manage.py build_static
+STATIC_BUNDLES = {'css/site.css': ['css/normalize.css', 'css/style.css']}  # Used with {% bundle %} in templates.
+STATIC_SERVE_INDEX = strtobool(os.environ.get('STATIC_SERVE_INDEX', 'False'))  # See project.static_serve
+STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 3600))  # Content-hashed names are always cached a year.
 if USE_S3:  # pragma: no cover
     AWS_ACCESS_KEY_ID = os.environ.get('AWS_ACCESS_KEY_ID')
     AWS_SECRET_ACCESS_KEY = os.environ.get('AWS_SECRET_ACCESS_KEY')
@@ -144,6 +242,9 @@ if USE_S3:  # pragma: no cover
 else:
     STATIC_URL = '/static/'
     STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static'), ]
+    if STATIC_BUILD_DIR:
+        STATICFILES_DIRS.append(STATIC_BUILD_DIR)
+        STATICFILES_STORAGE = 'project.static_build.BuiltStaticStorage'
     # STATIC_ROOT = os.path.join(BASE_DIR, '..', 'www', 'static')
     # MEDIA_URL = '/media/'
     # MEDIA_ROOT = os.path.join(BASE_DIR, '..', 'www', 'media')
@@ -158,5 +259,19 @@ elif USE_S3:  # pragma: no cover
 else:  # pragma: no cover
     # TODO: Choose appropriate Email backend
     EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    if strtobool(os.environ.get('EMAIL_QUEUE', 'False')):  # See project.mail_queue
+        EMAIL_BACKEND = 'project.mail_queue.EmailBackend'
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = strtobool(os.environ.get('EMAIL_USE_TLS', 'False'))
+EMAIL_USE_SSL = strtobool(os.environ.get('EMAIL_USE_SSL', 'False'))
+EMAIL_QUEUE_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'  # Used by each project.mail_queue worker.
+EMAIL_POOL_SIZE = int(os.environ.get('EMAIL_POOL_SIZE', 2))  # Workers, each with a persistent connection.
+EMAIL_BATCH_SIZE = int(os.environ.get('EMAIL_BATCH_SIZE', 20))  # Messages a worker takes to send at once.
+EMAIL_RETRIES = int(os.environ.get('EMAIL_RETRIES', 3))  # After a failure that may be temporary.
+EMAIL_RETRY_DELAY = float(os.environ.get('EMAIL_RETRY_DELAY', 2))  # Seconds, doubled for each retry.
+EMAIL_IDLE_SECONDS = int(os.environ.get('EMAIL_IDLE_SECONDS', 30))  # Connections unused this long are closed.
 
 # CUSTOM Additional Settings for this Project
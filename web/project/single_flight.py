@@ -0,0 +1,180 @@
+import asyncio
+import threading
+from collections import namedtuple
+from functools import wraps
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from .async_views import load_request_state
+from .page_cache import MESSAGES_COOKIE, request_varies
+
+ResponseCopy = namedtuple('ResponseCopy', ['content', 'status', 'headers'])
+
+
+class Call:
+    """One computation, and its result or error once done is set. """
+
+    def __init__(self, done):
+        self.done, self.result, self.error = done, None, None
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key onto one call, whose result (or exception) they all share.
+    For threads (as under WSGI) with do, and for coroutines on an event loop (as under ASGI) with do_async.
+    A caller that has waited timeout seconds (SINGLE_FLIGHT_TIMEOUT) for the shared call makes its own call.
+    """
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def get_timeout(self):
+        return settings.SINGLE_FLIGHT_TIMEOUT if self.timeout is None else self.timeout
+
+    def do(self, key, func):
+        """(result, shared) of func(), or of the call of another thread already running for the key. """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = Call(threading.Event())
+        if not leader:
+            if not call.done.wait(self.get_timeout()):
+                return func(), False
+            if isinstance(call.error, Exception):
+                raise call.error
+            if call.error is None:
+                return call.result, True
+            return func(), False  # The shared call was interrupted.
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result, False
+
+    async def do_async(self, key, func):
+        """(result, shared) of await func(), or of the call of another task already running for the key. """
+        key = (id(asyncio.get_running_loop()), key)
+        call = self.calls.get(key)
+        if call is not None:
+            try:
+                await asyncio.wait_for(call.done.wait(), self.get_timeout())
+            except asyncio.TimeoutError:
+                return await func(), False
+            if isinstance(call.error, Exception):
+                raise call.error
+            if call.error is None:
+                return call.result, True
+            return await func(), False  # The shared call was cancelled.
+        call = self.calls[key] = Call(asyncio.Event())
+        try:
+            call.result = await func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            del self.calls[key]
+            call.done.set()
+        return call.result, False
+
+
+flights = SingleFlight()
+
+
+def response_copy(request, response):
+    """The content, status, and headers of a response that other requests can share, or None if it is not shareable:
+    streaming, setting cookies, or using the CSRF token. A TemplateResponse is rendered first.
+    """
+    if callable(getattr(response, 'render', None)):
+        response = response.render()
+    if response.streaming or response.cookies or request.META.get('CSRF_COOKIE_USED'):
+        return None
+    return ResponseCopy(response.content, response.status_code, list(response.items()))
+
+
+def copied_response(copy):
+    response = HttpResponse(copy.content, status=copy.status)
+    for header, value in copy.headers:
+        response[header] = value
+    return response
+
+
+def can_share(request):
+    return request.method in ('GET', 'HEAD') and MESSAGES_COOKIE not in request.COOKIES
+
+
+def single_flight_response(request, prefix, get_response, flight=flights):
+    """Response from get_response(request), or a copy of the one for an identical request already being computed.
+    Requests are identical for the same prefix, method, path, language, and user or session. Only GET and HEAD.
+    """
+    if not can_share(request):
+        return get_response(request)
+
+    def leader():
+        response = get_response(request)
+        return response, response_copy(request, response)
+    (response, copy), shared = flight.do((prefix, request.method, request_varies(request)), leader)
+    if not shared:
+        return response
+    return copied_response(copy) if copy else get_response(request)
+
+
+async def async_single_flight_response(request, prefix, get_response, flight=flights):
+    """As single_flight_response, for an async get_response. """
+    if not can_share(request):
+        return await get_response(request)
+    await load_request_state(request)
+
+    async def leader():
+        response = await get_response(request)
+        return response, response_copy(request, response)
+    (response, copy), shared = await flight.do_async((prefix, request.method, request_varies(request)), leader)
+    if not shared:
+        return response
+    return copied_response(copy) if copy else await get_response(request)
+
+
+def single_flight(view_func):
+    """Decorator for a function view (or async view): identical concurrent GET requests share one response.
+    See single_flight_response.
+    """
+    prefix = '%s.%s' % (view_func.__module__, view_func.__qualname__)
+
+    if asyncio.iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            def get_response(request):
+                return view_func(request, *args, **kwargs)
+            return await async_single_flight_response(request, prefix, get_response)
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        def get_response(request):
+            return view_func(request, *args, **kwargs)
+        return single_flight_response(request, prefix, get_response)
+    return wrapper
+
+
+class SingleFlightMiddleware:
+    """Identical concurrent GET requests (see single_flight_response) share one response, from the rest of the
+    middleware and the view. After the authentication middleware, as requests vary on the user.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            markcoroutinefunction(self)  # As AsyncViewMixin marks its views, for checks of the middleware above.
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return async_single_flight_response(request, 'middleware', self.get_response)
+        return single_flight_response(request, 'middleware', self.get_response)
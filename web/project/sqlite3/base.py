@@ -0,0 +1,18 @@
+from django.db.backends.sqlite3 import base
+
+
+def apply_pragmas(conn, pragmas):
+    """Sets each PRAGMA name to its value on the sqlite3 connection. """
+    for name, value in pragmas.items():
+        conn.execute('PRAGMA %s = %s' % (name, value))
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """The Django SQLite backend, also setting the 'PRAGMAS' of the DATABASES entry on each new connection.
+    Used as ENGINE 'project.sqlite3' when SQLITE_PROFILE names one of the SQLITE_PROFILES.
+    """
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        apply_pragmas(conn, self.settings_dict.get('PRAGMAS', {}))
+        return conn
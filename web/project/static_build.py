@@ -0,0 +1,148 @@
+import os
+import re
+import gzip
+import json
+import hashlib
+from django.conf import settings
+from django.contrib.staticfiles.storage import StaticFilesStorage
+from django.core.signals import setting_changed
+from .files import write_file
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+STRING_OR_COMMENT = re.compile(r'''("(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|/\*.*?\*/)''', re.S)
+_manifests = {}
+
+
+def minify_code(text):
+    """Collapses whitespace, and removes it where not needed, in css text without strings or comments. """
+    text = re.sub(r'\s+', ' ', text)
+    return re.sub(r' ?([{};,>]) ?', r'\1', text).replace(': ', ':').replace(';}', '}')
+
+
+def minify_css(text):
+    """Removes comments, and whitespace that is not needed, outside of any quoted strings. """
+    result, code = [], []
+    for i, part in enumerate(STRING_OR_COMMENT.split(text)):
+        if i % 2 and not part.startswith('/*'):  # A quoted string.
+            result.extend((minify_code(''.join(code)), part))
+            code = []
+        else:
+            code.append(' ' if i % 2 else part)
+    result.append(minify_code(''.join(code)))
+    return ''.join(result).strip()
+
+
+def minify_svg(text):
+    """Removes comments, and whitespace between tags (unless there is <text>) or repeated within a tag. """
+    text = re.sub(r'<!--.*?-->', '', text, flags=re.S)
+    if '<text' not in text:
+        text = re.sub(r'>\s+<', '><', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+MINIFIERS = {'.css': minify_css, '.svg': minify_svg}  # Extension: function of text to minified text.
+
+
+def hashed_name(name, content):
+    """The name with a hash of the content before the extension, as in 'css/site.0123456789ab.css'. """
+    root, ext = os.path.splitext(name)
+    return '%s.%s%s' % (root, hashlib.md5(content).hexdigest()[:12], ext)
+
+
+def iter_static_files(source_dirs):
+    """Yields (name, path) for each file in the source directories. When a name is in more than one, the first. """
+    seen = set()
+    for source_dir in source_dirs:
+        for root, dirs, files in os.walk(source_dir):
+            dirs[:] = sorted(ea for ea in dirs if not ea.startswith('.'))
+            for file_name in sorted(files):
+                path = os.path.join(root, file_name)
+                name = os.path.relpath(path, source_dir).replace(os.sep, '/')
+                if not file_name.startswith('.') and name not in seen:
+                    seen.add(name)
+                    yield name, path
+
+
+def build_static(output_dir, source_dirs=None, bundles=None):
+    """Writes each static file minified (css & svg), and each bundle (concatenated files), with content-hashed names.
+    Also a '.gz' sibling of each that is smaller compressed, and the manifest of names to hashed names.
+    The source_dirs default to STATICFILES_DIRS (except the output_dir), and bundles to STATIC_BUNDLES.
+    Returns the manifest.
+    """
+    output_dir = os.path.abspath(output_dir)
+    if source_dirs is None:
+        source_dirs = [ea for ea in settings.STATICFILES_DIRS if os.path.abspath(ea) != output_dir]
+    bundles = settings.STATIC_BUNDLES if bundles is None else bundles
+    contents = {}
+    for name, path in iter_static_files(source_dirs):
+        with open(path, 'rb') as f:
+            content = f.read()
+        minify = MINIFIERS.get(os.path.splitext(name)[1].lower())
+        contents[name] = minify(content.decode('utf-8')).encode('utf-8') if minify else content
+    for name, members in bundles.items():
+        contents[name] = b'\n'.join(contents[ea] for ea in members)
+    paths = {}
+    for name, content in contents.items():
+        paths[name] = hashed_name(name, content)
+        path = os.path.join(output_dir, *paths[name].split('/'))
+        write_file(path, content)
+        compressed = gzip.compress(content, 9, mtime=0)
+        if len(compressed) < len(content):
+            write_file(path + '.gz', compressed)
+    manifest = {'version': MANIFEST_VERSION, 'paths': paths, 'bundles': {k: list(v) for k, v in bundles.items()}}
+    write_file(os.path.join(output_dir, MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True).encode())
+    _manifests.clear()
+    return manifest
+
+
+def get_static_manifest(build_dir=None):
+    """The manifest from the STATIC_BUILD_DIR (or given build_dir), or an empty one if not built. Memoized. """
+    build_dir = build_dir or settings.STATIC_BUILD_DIR
+    manifest = _manifests.get(build_dir)
+    if manifest is None:
+        manifest = {'version': MANIFEST_VERSION, 'paths': {}, 'bundles': {}}
+        try:
+            with open(os.path.join(build_dir, MANIFEST_NAME)) as f:
+                found = json.load(f)
+        except (TypeError, OSError, ValueError):
+            found = None
+        if found and found.get('version') == MANIFEST_VERSION:
+            manifest = found
+        _manifests[build_dir] = manifest
+    return manifest
+
+
+def bundle_names(name):
+    """The static names to link for this bundle: the bundle itself if built, otherwise each of its files. """
+    if name in get_static_manifest()['paths']:
+        return [name]
+    return list(settings.STATIC_BUNDLES.get(name, [name]))
+
+
+class BuiltStaticStorage(StaticFilesStorage):
+    """Static files storage where the url is for the content-hashed name from the build manifest, if it has one.
+    The url for each name is kept in memory, so {% static %} is a dict lookup after the first time.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.manifest, self.urls = None, {}
+
+    def url(self, name):
+        manifest = get_static_manifest()
+        if manifest is not self.manifest:  # A new manifest after a build or settings change.
+            self.manifest, self.urls = manifest, {}
+        url = self.urls.get(name)
+        if url is None:
+            url = self.urls[name] = super().url(manifest['paths'].get(name, name))
+        return url
+
+
+def clear_static_manifests(**kwargs):
+    """Empties the memoized manifests. Also connected to the setting_changed signal. """
+    if kwargs.get('setting', 'STATIC_BUILD_DIR') in ('STATIC_BUILD_DIR', 'STATIC_BUNDLES', 'STATIC_URL'):
+        _manifests.clear()
+
+
+setting_changed.connect(clear_static_manifests)
@@ -0,0 +1,218 @@
+import os
+import mmap
+import mimetypes
+from collections import namedtuple
+from urllib.parse import urlparse
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.utils.http import http_date, parse_etags
+from .static_build import get_static_manifest
+
+BLOCK_SIZE = 256 * 1024
+IGNORE_PATTERNS = ['CVS', '.*', '*~']  # Same defaults as collectstatic.
+IMMUTABLE = 'public, max-age=31536000, immutable'  # For the content-hashed names, which never change content.
+StaticFile = namedtuple('StaticFile', ['path', 'size', 'mtime', 'etag', 'content_type', 'cache_control', 'gz',
+                                       'encoding'])
+StaticPlan = namedtuple('StaticPlan', ['status', 'headers', 'path', 'start', 'length'])
+
+
+def accepts_gzip(accept_encoding):
+    """If the Accept-Encoding header value allows gzip (or any encoding), without a q=0. """
+    for ea in accept_encoding.split(','):
+        coding, _, params = ea.strip().partition(';')
+        if coding.strip().lower() in ('gzip', '*'):
+            return params.replace(' ', '').lower() not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+def parse_range(value, size):
+    """(start, length) for a single 'bytes=' range of a file this size. None to ignore it, False if unsatisfiable. """
+    unit, _, spec = value.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec or '-' not in spec:
+        return None  # Multiple ranges, or other units, get the full file.
+    first, last = (ea.strip() for ea in spec.split('-', 1))
+    try:
+        if not first:  # The last bytes of the file.
+            suffix = min(int(last), size)
+            return (size - suffix, suffix) if suffix > 0 else False
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return False
+    return start, end - start + 1
+
+
+def etag_matches(etag, if_none_match):
+    """If the If-None-Match header value has this ETag (by weak comparison) or is '*'. """
+    etags = parse_etags(if_none_match)
+    return etags == ['*'] or etag.strip('W/') in (ea.strip('W/') for ea in etags)
+
+
+class StaticIndex:
+    """In-memory index of the static files, by url path, with the file stats and headers ready to serve them.
+    Built once from STATIC_ROOT (if it has been collected) or the staticfiles finders. A '.gz' sibling of a file is
+    served in its place to clients accepting gzip. Content-hashed names (from build_static) are cached as immutable.
+    """
+
+    def __init__(self, files, prefix=None, max_age=None):
+        self.prefix = urlparse(settings.STATIC_URL).path if prefix is None else prefix
+        max_age = settings.STATIC_MAX_AGE if max_age is None else max_age
+        hashed = set(get_static_manifest()['paths'].values())
+        entries = {}
+        for name, path in files:
+            stat = os.stat(path)
+            base_name = name[:-3] if name.endswith('.gz') else name
+            content_type, encoding = mimetypes.guess_type(name)  # As django.views.static.serve: a.css.gz is gzip css.
+            content_type = content_type or 'application/octet-stream'
+            cache_control = IMMUTABLE if base_name in hashed else 'public, max-age=%d' % max_age
+            etag = '"%x-%x"' % (int(stat.st_mtime), stat.st_size)
+            entries[name] = StaticFile(path, stat.st_size, stat.st_mtime, etag, content_type, cache_control, None,
+                                       encoding)
+        for name, entry in entries.items():
+            gz = entries.get(name + '.gz')
+            if gz:
+                entries[name] = entry._replace(gz=gz._replace(content_type=entry.content_type))
+        self.files = {self.prefix + name: entry for name, entry in entries.items()}
+        self.buffers = {}
+
+    @classmethod
+    def from_settings(cls):
+        return cls(list(iter_collected_files()))
+
+    def get(self, url_path):
+        return self.files.get(url_path)
+
+    def buffer(self, path):
+        """A read only memory map of the file, kept open for later requests. """
+        buffer = self.buffers.get(path)
+        if buffer is None:
+            with open(path, 'rb') as f:
+                buffer = self.buffers[path] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return buffer
+
+    def plan(self, entry, method, get_header):
+        """The status, headers, and (path, start, length) of the body to send, given a request header getter. """
+        range_header = get_header('range')
+        negotiated = bool(entry.gz)
+        if entry.gz and not range_header and accepts_gzip(get_header('accept-encoding')):
+            entry = entry.gz
+        headers = [('Content-Type', entry.content_type), ('ETag', entry.etag),
+                   ('Last-Modified', http_date(entry.mtime)), ('Cache-Control', entry.cache_control),
+                   ('Accept-Ranges', 'bytes')]
+        if entry.encoding:
+            headers.append(('Content-Encoding', entry.encoding))
+        if negotiated:
+            headers.append(('Vary', 'Accept-Encoding'))
+        if etag_matches(entry.etag, get_header('if-none-match')):
+            return StaticPlan('304 Not Modified', [ea for ea in headers if ea[0] != 'Content-Type'], None, 0, 0)
+        start, length, status = 0, entry.size, '200 OK'
+        if range_header and get_header('if-range') in ('', entry.etag):
+            found = parse_range(range_header, entry.size)
+            if found is False:
+                headers = [('Content-Range', 'bytes */%d' % entry.size), ('Content-Length', '0')]
+                return StaticPlan('416 Requested Range Not Satisfiable', headers, None, 0, 0)
+            if found:
+                start, length = found
+                status = '206 Partial Content'
+                headers.append(('Content-Range', 'bytes %d-%d/%d' % (start, start + length - 1, entry.size)))
+        headers.append(('Content-Length', str(length)))
+        path = entry.path if method != 'HEAD' and length else None
+        return StaticPlan(status, headers, path, start, length)
+
+
+def iter_collected_files():
+    """Yields (name, path) of each collected static file in STATIC_ROOT, or else each found by the finders. """
+    if settings.STATIC_ROOT and os.path.isdir(settings.STATIC_ROOT):
+        for root, dirs, files in os.walk(settings.STATIC_ROOT):
+            for file_name in files:
+                path = os.path.join(root, file_name)
+                yield os.path.relpath(path, settings.STATIC_ROOT).replace(os.sep, '/'), path
+        return
+    seen = set()
+    for finder in finders.get_finders():
+        for path, storage in finder.list(IGNORE_PATTERNS):
+            prefix = getattr(storage, 'prefix', None)
+            name = (os.path.join(prefix, path) if prefix else path).replace(os.sep, '/')
+            if name not in seen:
+                seen.add(name)
+                yield name, storage.path(path)
+
+
+def iter_file(f, start, length, block_size=BLOCK_SIZE):
+    """Yields the length bytes of the file from start, then closes it. """
+    try:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(block_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+class StaticFilesWSGI:
+    """WSGI middleware serving the indexed static files before the request gets to Django.
+    Whole files are given to the server wsgi.file_wrapper (os.sendfile with servers such as gunicorn).
+    In wsgi.py: application = StaticFilesWSGI(get_wsgi_application())
+    """
+
+    def __init__(self, application, index=None):
+        self.application = application
+        self.index = index or StaticIndex.from_settings()
+
+    def __call__(self, environ, start_response):
+        method = environ.get('REQUEST_METHOD')
+        entry = self.index.get(environ.get('PATH_INFO', '')) if method in ('GET', 'HEAD') else None
+        if entry is None:
+            return self.application(environ, start_response)
+        plan = self.index.plan(entry, method, lambda name: environ.get('HTTP_' + name.upper().replace('-', '_'), ''))
+        try:
+            f = open(plan.path, 'rb') if plan.path else None
+        except OSError:  # Removed since the index was built.
+            return self.application(environ, start_response)
+        start_response(plan.status, plan.headers)
+        if f is None:
+            return []
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper and plan.status.startswith('200'):
+            return file_wrapper(f, BLOCK_SIZE)
+        return iter_file(f, plan.start, plan.length)
+
+
+class StaticFilesASGI:
+    """ASGI middleware serving the indexed static files, from memory mapped files, before the request gets to Django.
+    In asgi.py: application = StaticFilesASGI(get_asgi_application())
+    """
+
+    def __init__(self, application, index=None):
+        self.application = application
+        self.index = index or StaticIndex.from_settings()
+
+    async def __call__(self, scope, receive, send):
+        entry = None
+        if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+            entry = self.index.get(scope['path'])
+        if entry is None:
+            return await self.application(scope, receive, send)
+        headers = {}
+        for name, value in scope.get('headers', ()):
+            headers.setdefault(name.decode('latin1').lower(), value.decode('latin1'))
+        plan = self.index.plan(entry, scope['method'], lambda name: headers.get(name, ''))
+        try:
+            buffer = self.index.buffer(plan.path) if plan.path else None
+        except OSError:  # Removed since the index was built.
+            return await self.application(scope, receive, send)
+        response_headers = [(k.lower().encode('latin1'), v.encode('latin1')) for k, v in plan.headers]
+        await send({'type': 'http.response.start', 'status': int(plan.status[:3]), 'headers': response_headers})
+        if buffer is None:
+            return await send({'type': 'http.response.body', 'body': b''})
+        end = plan.start + plan.length
+        for start in range(plan.start, end, BLOCK_SIZE):
+            stop = min(start + BLOCK_SIZE, end)
+            await send({'type': 'http.response.body', 'body': buffer[start:stop], 'more_body': stop < end})
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.http import StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import reraise
+from django.template.base import TextNode
+from django.template.context import make_context
+from django.template.loader import select_template
+from django.template.loader_tags import BLOCK_CONTEXT_KEY, BlockContext, BlockNode, ExtendsNode
+
+
+def iter_nodes(template, context):
+    """Yields the rendered text of the template, one chunk before each top level block and one after the last.
+    For a template that extends another, the chunks are those of the root parent template.
+    """
+    chunk = []
+    for node in template.nodelist:
+        if isinstance(node, ExtendsNode):
+            yield ''.join(chunk)
+            yield from iter_extends(node, context)
+            return
+        if isinstance(node, BlockNode) and chunk:
+            yield ''.join(chunk)
+            chunk = []
+        chunk.append(node.render_annotated(context))
+    yield ''.join(chunk)
+
+
+def iter_extends(node, context):
+    """Same as ExtendsNode.render, except yielding the chunks of the parent template from iter_nodes. """
+    compiled_parent = node.get_parent(context)
+    if BLOCK_CONTEXT_KEY not in context.render_context:
+        context.render_context[BLOCK_CONTEXT_KEY] = BlockContext()
+    block_context = context.render_context[BLOCK_CONTEXT_KEY]
+    block_context.add_blocks(node.blocks)
+    for parent_node in compiled_parent.nodelist:
+        if not isinstance(parent_node, TextNode):
+            if not isinstance(parent_node, ExtendsNode):
+                blocks = {n.name: n for n in compiled_parent.nodelist.get_nodes_by_type(BlockNode)}
+                block_context.add_blocks(blocks)
+            break
+    with context.render_context.push_state(compiled_parent, isolated_context=False):
+        yield from iter_nodes(compiled_parent, context)
+
+
+def stream_template(template, context=None, request=None):
+    """Same text as template.render(context, request), for a django backend template, as a generator of chunks.
+    The start of the page (such as the <head>, and a header before the first body block) is sent while later
+    blocks are still rendering. Rendering errors can then only stop the response, not change its status code.
+    """
+    context = make_context(context, request, autoescape=template.backend.engine.autoescape)
+    compiled = template.template
+    try:
+        with context.render_context.push_state(compiled):
+            with context.bind_template(compiled):
+                context.template_name = compiled.name
+                for chunk in iter_nodes(compiled, context):
+                    if chunk:
+                        yield chunk
+    except TemplateDoesNotExist as exc:
+        reraise(exc, template.backend)
+
+
+class StreamingTemplateMixin:
+    """For TemplateView classes: when settings.STREAMING_TEMPLATES, respond with the template streamed in chunks.
+    The template renders after the middleware has processed the response, so the page falls back to a normal
+    TemplateResponse with DEBUG (for the error pages), or if there are messages to show (so they are marked as used).
+    Set stream_uses_csrf for templates with {% csrf_token %}, so the CSRF cookie is still set by the middleware.
+    """
+    stream_uses_csrf = False
+
+    def can_stream(self):
+        return settings.STREAMING_TEMPLATES and not settings.DEBUG and not len(get_messages(self.request))
+
+    def render_to_response(self, context, **response_kwargs):
+        if not self.can_stream():
+            return super().render_to_response(context, **response_kwargs)
+        if self.stream_uses_csrf:
+            get_token(self.request)
+        template = select_template(self.get_template_names(), using=self.template_engine)
+        response_kwargs.setdefault('content_type', self.content_type)
+        return StreamingHttpResponse(stream_template(template, context, self.request), **response_kwargs)
@@ -0,0 +1,142 @@
+import os
+import io
+import pickle
+import hashlib
+import django
+from django.template import engines, Origin
+from django.template.backends.django import DjangoTemplates
+from django.template.engine import Engine
+from django.template.loaders import cached
+from django.template.loaders.base import Loader as BaseLoader
+from django.template.smartif import OPERATORS
+from .files import write_file
+
+IF_OPERATORS = {op: key for key, op in OPERATORS.items()}  # The {% if %} operator classes are local to a function.
+
+
+def iter_template_names(engine):
+    """Each template name found in the directories of the engine loaders (such as DIRS and APP_DIRS), once each. """
+    loaders, seen = list(engine.template_loaders), set()
+    while loaders:
+        loader = loaders.pop(0)
+        if hasattr(loader, 'loaders'):  # The cached loader, or similar, wrapping other loaders.
+            loaders[:0] = loader.loaders
+            continue
+        for template_dir in loader.get_dirs() if hasattr(loader, 'get_dirs') else ():
+            for root, dirs, files in os.walk(template_dir):
+                dirs[:] = sorted(ea for ea in dirs if not ea.startswith('.'))
+                for file_name in sorted(files):
+                    if file_name.startswith('.'):
+                        continue
+                    name = os.path.relpath(os.path.join(root, file_name), template_dir).replace(os.sep, '/')
+                    if name not in seen:
+                        seen.add(name)
+                        yield name
+
+
+def warm_templates(using=None):
+    """Compiles every template found for each Django template engine (or only the engine of the 'using' alias).
+    With a cached loader, each is then kept in memory (and on disk, when the Loader below has a cache_dir).
+    Returns a list of (engine alias, template name, error or None).
+    """
+    results = []
+    for backend in ([engines[using]] if using else engines.all()):
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in iter_template_names(backend.engine):
+            try:
+                backend.engine.get_template(name)
+            except Exception as e:
+                results.append((backend.name, name, e))
+            else:
+                results.append((backend.name, name, None))
+    return results
+
+
+class CompiledPickler(pickle.Pickler):
+    """Pickles a compiled template, without the engine, loaders, or origin it is loaded with again. """
+
+    def persistent_id(self, obj):
+        if isinstance(obj, type) and obj in IF_OPERATORS:
+            return 'if ' + IF_OPERATORS[obj]
+        if isinstance(obj, Engine):
+            return 'engine'
+        if isinstance(obj, BaseLoader):
+            return 'loader'
+        if isinstance(obj, Origin):
+            return 'origin'
+        return None
+
+
+class CompiledUnpickler(pickle.Unpickler):
+    """Loads a pickled compiled template, for the given origin (and the engine of its loader). """
+
+    def __init__(self, file, origin):
+        super().__init__(file)
+        self.origin = origin
+
+    def persistent_load(self, pid):
+        if pid.startswith('if '):
+            return OPERATORS[pid[3:]]
+        return {'engine': self.origin.loader.engine, 'loader': self.origin.loader, 'origin': self.origin}[pid]
+
+
+class Loader(cached.Loader):
+    """The cached loader, plus an optional on-disk cache of compiled templates, so that new processes start warm.
+    Files are keyed by the Django version, engine debug, and the template file path, modified time, and size.
+    Only use a cache_dir that is private to the project: the files are loaded with pickle. Empty it on deploys that
+    change template tag libraries, since compiled templates keep the node classes from when they were compiled.
+    Use in TEMPLATES OPTIONS (with APP_DIRS False):
+        'loaders': [('project.template_cache.Loader', ['django.template.loaders.filesystem.Loader',
+                     'django.template.loaders.app_directories.Loader'], '/path/to/cache_dir')]
+    """
+
+    def __init__(self, engine, loaders, cache_dir=None):
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        super().__init__(engine, loaders)
+
+    def get_template(self, template_name, skip=None):
+        key = self.cache_key(template_name, skip)
+        if self.cache_dir and key not in self.get_template_cache:
+            origin, path = self.find_source(template_name, skip)
+            if path:
+                template = self.read_compiled(origin, path)
+                if template is None:
+                    template = super().get_template(template_name, skip)
+                    if template.origin == origin:
+                        self.write_compiled(template, path)
+                    return template
+                self.get_template_cache[key] = template
+        return super().get_template(template_name, skip)
+
+    def find_source(self, template_name, skip=None):
+        """The first origin with a source file, and the path of its compiled file. Otherwise (None, None). """
+        for origin in self.get_template_sources(template_name):
+            if skip is not None and origin in skip:
+                continue
+            try:
+                stat = os.stat(origin.name)
+            except OSError:
+                continue
+            text = repr((django.get_version(), self.engine.debug, origin.name, stat.st_mtime_ns, stat.st_size))
+            return origin, os.path.join(self.cache_dir, hashlib.sha1(text.encode()).hexdigest() + '.pickle')
+        return None, None
+
+    def read_compiled(self, origin, path):
+        """The compiled template from path, or None if there is not a usable one. """
+        try:
+            with open(path, 'rb') as f:
+                return CompiledUnpickler(f, origin).load()
+        except Exception:
+            return None
+
+    def write_compiled(self, template, path):
+        """Saves the compiled template to path, by way of a temporary file so readers never see partial files. """
+        buffer = io.BytesIO()
+        try:
+            CompiledPickler(buffer, pickle.HIGHEST_PROTOCOL).dump(template)
+        except Exception:  # Some custom template tag nodes may not be picklable.
+            return
+        write_file(path, buffer.getvalue())
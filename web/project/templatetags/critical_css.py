@@ -0,0 +1,24 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+from ..critical_css import get_critical_css
+
+register = template.Library()
+ASYNC_LINK = '<link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'" />'
+
+
+@register.simple_tag(takes_context=True)
+def stylesheets(context, sheets):
+    """Links for the static sheets. With CRITICAL_CSS, the rules this template may use are inlined in a <style>,
+    and the sheets are loaded without blocking the first paint. Use: {% stylesheets site_sheets %}
+    """
+    urls = [(static(ea), ) for ea in sheets]
+    links = format_html_join('\n', '<link rel="stylesheet" href="{}" />', urls)
+    template_name = getattr(getattr(context, 'template', None), 'name', None)
+    if not settings.CRITICAL_CSS or not template_name:
+        return links
+    critical = get_critical_css(template_name, sheets)
+    return format_html('<style>{}</style>\n{}\n<noscript>{}</noscript>', mark_safe(critical),
+                       format_html_join('\n', ASYNC_LINK, urls), links)
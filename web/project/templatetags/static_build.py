@@ -0,0 +1,10 @@
+from django import template
+from ..static_build import bundle_names
+
+register = template.Library()
+
+
+@register.simple_tag
+def bundle(name):
+    """The static names for a bundle: itself once built, otherwise its files. Use: {% bundle 'css/site.css' as x %} """
+    return bundle_names(name)
@@ -0,0 +1,97 @@
+"""A stand-in SMTP server, keeping the messages it gets, for tests of sending email. It can also be run as its own
+process, printing each message: python -m project.tests.helper_smtp [port]
+"""
+import sys
+import time
+import threading
+import socketserver
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """One connection: replies to the SMTP commands smtplib sends, without TLS or authentication. """
+
+    def reply(self, line):
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply('220 localhost stand-in SMTP')
+        sender, recipients = None, []
+        for line in self.rfile:
+            command = line.decode().strip()
+            verb = command[:4].upper()
+            if verb in ('EHLO', 'HELO'):
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                sender, recipients = command[10:], []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(command[8:])
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = b''.join(iter(self.rfile.readline, b'.\r\n'))
+                with server.lock:
+                    fail = server.fail_count > 0
+                    server.fail_count -= fail
+                    if not fail:
+                        server.messages.append((sender, recipients, data))
+                if fail:
+                    self.reply('451 Try again later')
+                else:
+                    server.on_message(sender, recipients, data)
+                    self.reply('250 OK')
+            elif verb in ('RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Not implemented')
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    """Keeps (sender, recipients, data) of each message, and counts connections. The next fail_count messages
+    get a temporary failure (451) reply instead. Each reply is after delay seconds, as from a distant server.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=0):
+        super().__init__(('localhost', port), SMTPHandler)
+        self.lock = threading.Lock()
+        self.messages, self.connections, self.fail_count, self.delay = [], 0, 0, 0
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def on_message(self, sender, recipients, data):
+        pass
+
+    def start(self):
+        """Serves in a daemon thread. """
+        thread = threading.Thread(target=self.serve_forever, args=(0.05, ), daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class PrintingSMTPServer(SMTPServer):
+
+    def on_message(self, sender, recipients, data):
+        print('From %s to %s' % (sender, ', '.join(recipients)))
+        print(data.decode(errors='replace'))
+
+
+if __name__ == '__main__':
+    server = PrintingSMTPServer(int(sys.argv[1]) if len(sys.argv) > 1 else 1025)
+    print('SMTP stand-in on localhost port %d' % server.port)
+    server.serve_forever()
@@ -0,0 +1,119 @@
+import random
+import asyncio
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib import admin
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import path
+from ..lifespan import LifespanASGI
+from ..views import home_view, async_home_view, NamedView, AsyncNamedView, AsyncProfileView
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('', home_view, name='home'),
+    path('async', async_home_view, name='async_home'),
+    path('named', NamedView.as_view(), name='named_path'),
+    path('async/named', AsyncNamedView.as_view(), name='async_named'),
+    path('user/', AsyncProfileView.as_view(), name='profile_page'),
+]
+
+
+@override_settings(ROOT_URLCONF='project.tests.test_async_views', PAGE_CACHE_SECONDS=0)
+class AsyncViewsTests(TestCase):
+
+    def get(self, url, *headers):
+        """The response of the AsyncClient, with any (name, value) request headers. """
+        async def get():
+            return await self.async_client.get(url, headers=[(b'host', b'testserver'), *headers])
+        return async_to_sync(get)()
+
+    def test_async_views_are_coroutine_functions(self):
+        self.assertTrue(asyncio.iscoroutinefunction(async_home_view))
+        self.assertTrue(asyncio.iscoroutinefunction(AsyncNamedView.as_view()))
+        self.assertFalse(asyncio.iscoroutinefunction(NamedView.as_view()))
+
+    def test_same_pages(self):
+        """The async views give the same page as the sync views, rendered in the view. """
+        for sync_url, async_url in (('/', '/async'), ('/named', '/async/named')):
+            random.seed(0)  # For the {% lorem %} text.
+            response = self.get(async_url)
+            self.assertEqual(200, response.status_code)
+            self.assertFalse(hasattr(response, 'render'))
+            random.seed(0)
+            self.assertEqual(self.client.get(sync_url).content, response.content)
+
+    def test_method_not_allowed(self):
+        async def post():
+            return await self.async_client.post('/async/named')
+        self.assertEqual(405, async_to_sync(post)().status_code)
+
+    @override_settings(PAGE_CACHE_SECONDS=60)
+    def test_page_cache_with_session(self):
+        """With a logged in user, the session and user are loaded in a thread, so the page cache can vary on them. """
+        cache.clear()
+        user = get_user_model().objects.create_user('async_user', password='test')
+        self.async_client.force_login(user)
+        first, second = self.get('/async/named'), self.get('/async/named')
+        self.assertEqual(200, first.status_code)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertEqual(304, self.get('/async/named', (b'if-none-match', first['ETag'].encode())).status_code)
+
+
+class LifespanTests(TestCase):
+
+    def run_app(self, app, scope, messages):
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+        async_to_sync(app)(scope, receive, send)
+        return sent
+
+    def test_startup_and_shutdown(self):
+        """The startup function runs once, at lifespan startup, and not again for requests. """
+        calls, requests = [], []
+
+        async def app(scope, receive, send):
+            requests.append(scope)
+        lifespan = LifespanASGI(app, startup=lambda: calls.append(1))
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = self.run_app(lifespan, {'type': 'lifespan'}, messages)
+        self.assertEqual(['lifespan.startup.complete', 'lifespan.shutdown.complete'], [ea['type'] for ea in sent])
+        self.run_app(lifespan, {'type': 'http'}, [])
+        self.assertEqual([1], calls)
+        self.assertEqual(1, len(requests))
+
+    def test_startup_without_lifespan(self):
+        """Servers without lifespan events get the startup run before the first request. Failures are reported. """
+        calls = []
+
+        async def app(scope, receive, send):
+            self.assertEqual([1], calls)
+        self.run_app(LifespanASGI(app, startup=lambda: calls.append(1)), {'type': 'http'}, [])
+
+        def fail():
+            raise ValueError('broken')
+        sent = self.run_app(LifespanASGI(app, startup=fail), {'type': 'lifespan'}, [{'type': 'lifespan.startup'}])
+        self.assertEqual([{'type': 'lifespan.startup.failed', 'message': 'broken'}], sent)
+
+    def test_failed_startup_tried_again(self):
+        """Without lifespan events, a failed startup is logged, the request is handled, and the next one retries. """
+        calls, requests = [], []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise ValueError('broken')
+
+        async def app(scope, receive, send):
+            requests.append(scope)
+        lifespan = LifespanASGI(app, startup=flaky)
+        with self.assertLogs('project.lifespan', 'ERROR'):
+            self.run_app(lifespan, {'type': 'http'}, [])
+        self.run_app(lifespan, {'type': 'http'}, [])
+        self.run_app(lifespan, {'type': 'http'}, [])
+        self.assertEqual(([1, 1], 3), (calls, len(requests)))
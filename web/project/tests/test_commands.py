@@ -1,13 +1,28 @@
-from django.test import TestCase  # , TransactionTestCase, Client, RequestFactory,
+from django.test import TestCase, override_settings  # , TransactionTestCase, Client, RequestFactory,
 from django.core.management import call_command
-from django.urls import resolvers
+from django.core.management.base import CommandError
+from django.urls import resolvers, clear_url_caches, set_urlconf, path, include, reverse
 from .helper_general import APP_NAME
 from django.utils.module_loading import import_string
 from ..urls import urlpatterns
 from io import StringIO
+from tempfile import TemporaryDirectory
+from django.conf import settings
+from types import GeneratorType
+import importlib
 import json
+import os
 import re
-urllist = import_string('django_improve_form.management.commands.urllist.Command')
+import csv
+import sys
+urllist = import_string('project.management.commands.urllist.Command')
+get_url_inventory = import_string('project.management.commands.urllist.get_url_inventory')
+compile_sub_rules = import_string('project.management.commands.urllist.compile_sub_rules')
+single_pass_safe = import_string('project.management.commands.urllist.single_pass_safe')
+sample_path = import_string('project.management.commands.urllist.sample_path')
+count_tried = import_string('project.management.commands.urllist.count_tried')
+collect_inventory = import_string('project.management.commands.urllist_settings.collect_inventory')
+load_url_snapshot = import_string('project.management.commands.urllist.load_url_snapshot')
 
 
 class UrllistTests(TestCase):
@@ -100,6 +115,40 @@ class UrllistTests(TestCase):
         with self.assertRaises(ValueError):
             self.com.collect_urls(bad_input)
 
+    def test_collect_urls_is_lazy(self):
+        """The collect_urls method gives a generator of UrlRow tuples, with the same columns as all_columns. """
+        actual = self.com.collect_urls()
+        self.assertIsInstance(actual, GeneratorType)
+        self.assertListEqual(self.com.all_columns, list(next(actual)._fields))
+
+    def test_collect_urls_deep_nesting(self):
+        """Deeply nested includes should not hit the recursion limit. """
+        depth = sys.getrecursionlimit() * 2
+        urls = [path('leaf', lambda request: None, name='leaf')]
+        for _ in range(depth):
+            urls = [path('a/', include(urls))]
+        root = resolvers.URLResolver(resolvers.RegexPattern(r'^/'), urls)
+        actual = list(self.com.collect_urls(root))
+        self.assertEqual(1, len(actual))
+        self.assertEqual('/' + 'a/' * depth + 'leaf', actual[0].pattern)
+
+    def test_collect_urls_prunes_ignored_include(self):
+        """An included resolver with an ignored source is not expanded. """
+        class Unexpanded(resolvers.URLResolver):
+            @property
+            def url_patterns(self):
+                raise AssertionError("Ignored resolver was expanded. ")
+        kept = path('kept', lambda request: None, name='kept')
+        ignored = Unexpanded(resolvers.RoutePattern('skip/'), 'ignored_app.urls')
+        root = resolvers.URLResolver(resolvers.RegexPattern(r'^/'), [kept, ignored])
+        actual = [ea.name for ea in self.com.collect_urls(root, ignore=['ignored_app'])]
+        self.assertListEqual(['kept'], actual)
+
+    def test_collect_urls_filters_sources(self):
+        """Only rows from the requested sources are given by collect_urls. """
+        actual = {ea.source for ea in self.com.collect_urls(sources=[APP_NAME])}
+        self.assertSetEqual({APP_NAME}, actual)
+
     def test_process_sub_rules(self):
         """If sub_rules parameter has a value for get_url_data, these rules should be processed for the results. """
         opts = self.base_opts.copy()
@@ -117,6 +166,40 @@ class UrllistTests(TestCase):
         actual = self.com.get_url_data(opts['sources'], opts['ignore'], col_names, opts['sort'], sub_rules)
         self.assertListEqual(expected, actual)
 
+    def test_compiled_sub_rules_match_sequential(self):
+        """Compiled rules give the same results as applying each rule with re.sub in turn. """
+        rule_sets = [
+            self.com.initial_sub_rules,
+            [('^django', 'dj'), ('^dj', 'X')],  # chained: the second rule matches the output of the first.
+            [('dog', 'woof'), ('o', '0')],  # not anchored.
+            [('^(d)(j)', r'\2\1'), ('^cb', 'see')],  # groups and backrefs.
+            [*self.com.initial_sub_rules, ('^cb', 'contrib '), ('auth', 'AUTH')],
+            ]
+        values = ['django.contrib.auth', 'django_registration.views', 'djangox', 'xdjango', 'cb ', 'dog', '']
+        for rules in rule_sets:
+            apply_rules = compile_sub_rules([(*rule, ['col']) for rule in rules])['col']
+            for value in values:
+                expected = value
+                for regex, new_str in rules:
+                    expected = re.sub(regex, new_str, expected)
+                self.assertEqual(expected, apply_rules(value))
+
+    def test_single_pass_safe(self):
+        """The default rules are combined into one scan, but rules that might feed a later rule are not. """
+        self.assertTrue(single_pass_safe(self.com.initial_sub_rules))
+        self.assertFalse(single_pass_safe([('^django', 'dj'), ('^dj', 'X')]))
+        self.assertFalse(single_pass_safe([('^django', ''), ('^x', 'X')]))
+        self.assertFalse(single_pass_safe([('dog', 'woof')]))
+        self.assertFalse(single_pass_safe([('^a|b', 'c')]))
+
+    def test_compiled_sub_rules_share_column_sets(self):
+        """Columns with the same ordered rules share one compiled function. """
+        sub_rules = [('^a', 'b', ['source', 'name']), ('^c', 'd', ['pattern'])]
+        compiled = compile_sub_rules(sub_rules)
+        self.assertIs(compiled['source'], compiled['name'])
+        self.assertIsNot(compiled['source'], compiled['pattern'])
+        self.assertDictEqual({}, compile_sub_rules(None))
+
     def test_sort_get_url_data(self):
         """If sort parameter has a value for get_url_data, these rules should be processed for the results. """
         opts = self.base_opts.copy()
@@ -164,6 +247,80 @@ class UrllistTests(TestCase):
         for res, line in pairs:
             self.assertEqual(res, line)
 
+    def test_iter_url_data_matches_get_url_data(self):
+        """The iter_url_data generator gives the same rows as get_url_data, with or without sorting. """
+        opts = self.base_opts.copy()
+        opts['long'] = False
+        sub_rules = self.com.get_sub_rules(opts)
+        col_names = ['name', 'pattern', 'args']
+        for sort in (opts['sort'], None):
+            expected = self.com.get_url_data([], [], col_names, sort, sub_rules)
+            actual = self.com.iter_url_data([], [], col_names, sort, sub_rules)
+            self.assertIsInstance(actual, GeneratorType)
+            self.assertListEqual(expected, list(actual))
+
+    def test_handle_format_csv_and_tsv(self):
+        """The csv and tsv formats write a title row, then the same rows as the data option. """
+        opts = {'long': True, 'only': ['source', 'name', 'args']}
+        expected = [['source', 'name', 'args']] + json.loads(call_command('urllist', **opts, data=True))
+        for output_format, delimiter in (('csv', ','), ('tsv', '\t')):
+            captured_stdout = StringIO()
+            returned = call_command('urllist', **opts, format=output_format, stdout=captured_stdout)
+            actual = list(csv.reader(StringIO(captured_stdout.getvalue()), delimiter=delimiter))
+            self.assertEqual(0, returned)
+            self.assertListEqual(expected, actual)
+
+    def test_handle_format_ndjson(self):
+        """The ndjson format writes one json object per line, keyed by column name. """
+        opts = {'long': True, 'only': ['source', 'name']}
+        expected = [dict(zip(opts['only'], ea)) for ea in json.loads(call_command('urllist', **opts, data=True))]
+        captured_stdout = StringIO()
+        call_command('urllist', **opts, format='ndjson', stdout=captured_stdout)
+        actual = [json.loads(line) for line in captured_stdout.getvalue().splitlines()]
+        self.assertListEqual(expected, actual)
+
+    def test_sample_path(self):
+        """Sample paths are made for route converters and simple regex named groups. """
+        self.assertEqual('/user/1/sample/', sample_path('/user/<int:pk>/<slug>/'))
+        self.assertEqual('/admin/auth/', sample_path('/admin/^(?P<app_label>auth|sites)/$'))
+        self.assertEqual('/item/1.json', sample_path(r'/item/^(?P<pk>\d+)\.json$'))
+
+    def test_count_tried(self):
+        """The count of patterns checked grows with the position of the matching url. """
+        resolver = resolvers.get_resolver()
+        counts = [count_tried(resolver, reverse(name)) for name in ('home', 'named_path', 'profile_page')]
+        self.assertListEqual(sorted(counts), counts)
+        self.assertEqual(len(set(counts)), len(counts))
+        self.assertIsNone(count_tried(resolver, '/not/a/route/here/'))
+
+    def test_handle_bench(self):
+        """Each url that a sample path resolves to gets its tried count and resolve & reverse timings. """
+        opts = {'ignore': ['admin'], 'data': True, 'repeat': 3}
+        actual = json.loads(call_command('urllist', bench=True, long=True, **opts))
+        inventory = json.loads(call_command('urllist', only=['name'], sort=[], long=True, **opts))
+        self.assertListEqual([ea[0] for ea in inventory], [ea[0] for ea in actual])
+        for name, url_path, tried, *times in actual:
+            self.assertEqual(reverse(name), url_path)
+            self.assertGreater(tried, 0)
+            self.assertTrue(all(isinstance(ea, float) for ea in times))
+
+    def test_handle_bench_subs(self):
+        """The bench names get the same substitutions as the listing. """
+        opts = {'ignore': ['admin'], 'data': True, 'repeat': 1, 'add': [('_', '-')], 'cols': ['name']}
+        actual = json.loads(call_command('urllist', bench=True, **opts))
+        inventory = json.loads(call_command('urllist', only=['name'], sort=[], **opts))
+        self.assertListEqual([ea[0] for ea in inventory], [ea[0] for ea in actual])
+        self.assertIn('named-path', [ea[0] for ea in actual])
+
+    def test_handle_bench_table(self):
+        """Without the data option, the bench results are written as a table. """
+        captured_stdout = StringIO()
+        returned = call_command('urllist', APP_NAME, bench=True, repeat=2, stdout=captured_stdout)
+        output = captured_stdout.getvalue().splitlines()
+        self.assertEqual(0, returned)
+        self.assertListEqual(urllist.bench_columns, [ea.strip() for ea in output[0].split('|')])
+        self.assertEqual(2 + len([ea for ea in urlpatterns if isinstance(ea, resolvers.URLPattern)]), len(output))
+
     def test_data_to_string_not_data(self):
         """If input for data_to_string method evaluates to False, returns EMPTY_VALUE. """
         expected = self.com.EMPTY_VALUE
@@ -193,3 +350,165 @@ class UrllistTests(TestCase):
         expected = '\n'.join(expected)
         actual = self.com.data_to_string(url_data)
         self.assertEqual(expected, actual)
+
+
+class UrlInventoryTests(TestCase):
+    opts = {'ignore': ['admin'], 'only': ['source', 'name'], 'long': True}
+
+    def test_matches_call_command(self):
+        """The inventory rows should be the same as the json data returned by the urllist command. """
+        expected = json.loads(call_command('urllist', **self.opts, data=True))
+        actual = get_url_inventory(**self.opts)
+        self.assertListEqual(expected, [list(ea) for ea in actual])
+
+    def test_sources_match_call_command(self):
+        """Positional sources should filter the same as the urllist command. """
+        expected = json.loads(call_command('urllist', APP_NAME, **self.opts, data=True))
+        actual = get_url_inventory(APP_NAME, **self.opts)
+        self.assertListEqual(expected, [list(ea) for ea in actual])
+
+    def test_memoized(self):
+        """Repeated calls with the same options return the same cached result. """
+        first = get_url_inventory(**self.opts)
+        self.assertIs(first, get_url_inventory(**self.opts))
+        self.assertIsNot(first, get_url_inventory(**self.opts, sort=['source']))
+
+    def test_invalidated_on_url_caches_cleared(self):
+        """When the resolver cache is cleared (as when ROOT_URLCONF changes), the inventory is collected again. """
+        first = get_url_inventory(**self.opts)
+        clear_url_caches()
+        second = get_url_inventory(**self.opts)
+        self.assertIsNot(first, second)
+        self.assertEqual(first, second)
+
+    @override_settings(ROOT_URLCONF='django.contrib.auth.urls')
+    def test_follows_root_urlconf(self):
+        """A changed ROOT_URLCONF gives the inventory for the new urlconf. """
+        actual = get_url_inventory(only=['name'], long=True)
+        self.assertIn(('login', ), actual)
+        self.assertNotIn(('home', ), actual)
+
+    def test_follows_set_urlconf(self):
+        """A urlconf set for the current thread is used instead of ROOT_URLCONF. """
+        set_urlconf('django.contrib.auth.urls')
+        try:
+            actual = get_url_inventory(only=['name'], long=True)
+        finally:
+            set_urlconf(None)
+        self.assertIn(('login', ), actual)
+        self.assertIn(('home', ), get_url_inventory(only=['name'], long=True))
+
+
+class UrlSnapshotTests(TestCase):
+
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'urls.json')
+        call_command('urllist', snapshot=self.path, stdout=StringIO())
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def edit_snapshot(self, **changes):
+        with open(self.path) as f:
+            content = json.load(f)
+        content.update(changes)
+        with open(self.path, 'w') as f:
+            json.dump(content, f)
+        return content
+
+    def test_load_matches_walk(self):
+        """A current snapshot loads the same rows as walking the urls. """
+        expected = list(urllist().collect_urls())
+        actual = load_url_snapshot(self.path, settings.ROOT_URLCONF)
+        self.assertEqual(len(expected), len(actual))
+        for u, (data, chain) in zip(expected, actual):
+            self.assertEqual(u._replace(args=str(u.args) if u.args else {}), data)
+
+    def test_not_current(self):
+        """A snapshot for another urlconf, with a different key, or a missing file is not loaded. """
+        self.assertIsNone(load_url_snapshot(self.path, 'some.other.urls'))
+        self.assertIsNone(load_url_snapshot(self.path + '.missing', settings.ROOT_URLCONF))
+        self.edit_snapshot(key='changed')
+        self.assertIsNone(load_url_snapshot(self.path, settings.ROOT_URLCONF))
+
+    def test_changed_file_not_current(self):
+        """If a file the urls depend on has changed, the snapshot is not loaded. """
+        extra = os.path.join(self.temp_dir.name, 'urls_module.py')
+        with open(extra, 'w') as f:
+            f.write('urlpatterns = []')
+        content = self.edit_snapshot()
+        content['files'].append(extra)
+        content['key'] = import_string('project.management.commands.urllist.snapshot_key')(
+            settings.ROOT_URLCONF, content['files'])
+        self.edit_snapshot(**content)
+        self.assertIsNotNone(load_url_snapshot(self.path, settings.ROOT_URLCONF))
+        with open(extra, 'w') as f:
+            f.write('urlpatterns = [path("new", view)]')
+        self.assertIsNone(load_url_snapshot(self.path, settings.ROOT_URLCONF))
+
+    def test_changed_settings_not_current(self):
+        """If settings give the urlconf other patterns (as ASYNC_VIEWS gives it other views), it is not loaded. """
+        project_urls = importlib.import_module(APP_NAME + '.urls')
+
+        def reload_urls():
+            clear_url_caches()
+            importlib.reload(project_urls)
+        self.addCleanup(reload_urls)
+        for async_views in (True, False):
+            with override_settings(ASYNC_VIEWS=async_views, TRIE_URL_RESOLVER=False):
+                reload_urls()
+                call_command('urllist', snapshot=self.path, stdout=StringIO())
+                self.assertIsNotNone(load_url_snapshot(self.path, settings.ROOT_URLCONF))
+            with override_settings(ASYNC_VIEWS=not async_views, TRIE_URL_RESOLVER=False):
+                reload_urls()
+                self.assertIsNone(load_url_snapshot(self.path, settings.ROOT_URLCONF))
+        with override_settings(TRIE_URL_RESOLVER=True):
+            reload_urls()
+            self.assertIsNone(load_url_snapshot(self.path, settings.ROOT_URLCONF))
+
+    def test_collect_urls_uses_snapshot(self):
+        """With URL_SNAPSHOT set, the root urls come from the snapshot file instead of walking them. """
+        content = self.edit_snapshot()
+        content['rows'][0][1] = 'only_in_snapshot'
+        self.edit_snapshot(**content)
+        with override_settings(URL_SNAPSHOT=self.path):
+            names = [u.name for u in urllist().collect_urls()]
+            self.assertIn('only_in_snapshot', names)
+            self.assertIn(('only_in_snapshot', ), get_url_inventory(only=['name']))
+        self.assertNotIn('only_in_snapshot', [u.name for u in urllist().collect_urls()])
+
+    def test_output_same_with_snapshot(self):
+        """The urllist results are the same from a snapshot, including ignored and requested sources. """
+        for args, opts in (([], {'ignore': ['admin']}), ([APP_NAME], {}), ([], {'ignore': [APP_NAME]})):
+            expected = call_command('urllist', *args, **opts, data=True)
+            with override_settings(URL_SNAPSHOT=self.path):
+                actual = call_command('urllist', *args, **opts, data=True)
+            self.assertEqual(expected, actual)
+
+
+class UrllistSettingsTests(TestCase):
+    opts = {'sources': [], 'ignore': ['admin'], 'only': ['source', 'name'], 'not': [], 'sort': urllist.initial_sort,
+            'long': True, 'sub_cols': urllist.initial_sub_cols, 'add': [], 'cols': None, }
+
+    def test_collect_inventory(self):
+        """The inventory for a settings module is the same as urllist data for it. """
+        expected = json.loads(call_command('urllist', ignore=['admin'], only=['source', 'name'], long=True, data=True))
+        module, actual = collect_inventory(settings.SETTINGS_MODULE, self.opts)
+        self.assertEqual(settings.SETTINGS_MODULE, module)
+        self.assertListEqual(expected, actual)
+
+    def test_call_command_merges_settings_column(self):
+        """Each settings module is collected in its own process, and each row starts with its settings module. """
+        expected = json.loads(call_command('urllist', ignore=['admin'], only=['name'], long=True, data=True))
+        expected = [[settings.SETTINGS_MODULE, *row] for row in expected]
+        modules = [settings.SETTINGS_MODULE, settings.SETTINGS_MODULE]  # duplicates are only collected once.
+        actual = call_command('urllist_settings', modules=modules, ignore=['admin'], only=['name'], long=True,
+                              data=True)
+        self.assertListEqual(expected, json.loads(actual))
+
+    def test_unsupported_options(self):
+        """The urllist options that only work for the current settings are refused, not ignored. """
+        for opts in ({'bench': True}, {'repeat': 5}, {'snapshot': 'urls.json'}):
+            with self.subTest(**opts), self.assertRaises(CommandError):
+                call_command('urllist_settings', modules=[settings.SETTINGS_MODULE], **opts)
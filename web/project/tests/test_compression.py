@@ -0,0 +1,103 @@
+import gzip
+from unittest import mock
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import TestCase, RequestFactory, override_settings, modify_settings
+from ..compression import CompressionMiddleware, WhitespaceStripper, compressed_cache
+
+PAGE = '<html>\n  <body>\n    <p>  Some   text  </p>\n    <pre>  kept\n    as is  </pre>\n  </body>\n</html>\n' * 20
+
+
+class CompressionTests(TestCase):
+
+    def setUp(self):
+        compressed_cache.clear()
+        self.factory = RequestFactory()
+
+    def process(self, response, accept='gzip, deflate'):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_compressed(self):
+        response = self.process(HttpResponse(PAGE))
+        self.assertEqual('gzip', response['Content-Encoding'])
+        self.assertEqual(PAGE.encode(), gzip.decompress(response.content))
+        self.assertEqual(str(len(response.content)), response['Content-Length'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_skipped(self):
+        """Not for clients without gzip, small bodies, other types, already encoded, or no-transform responses. """
+        self.assertFalse(self.process(HttpResponse(PAGE), accept='gzip;q=0').has_header('Content-Encoding'))
+        self.assertFalse(self.process(HttpResponse('<p>tiny</p>')).has_header('Content-Encoding'))
+        self.assertFalse(self.process(HttpResponse(PAGE, content_type='image/png')).has_header('Content-Encoding'))
+        encoded = HttpResponse(gzip.compress(PAGE.encode()), content_type='text/css')
+        encoded['Content-Encoding'] = 'gzip'
+        self.assertEqual(encoded.content, self.process(encoded).content)
+        no_transform = HttpResponse(PAGE)
+        no_transform['Cache-Control'] = 'no-transform'
+        self.assertFalse(self.process(no_transform).has_header('Content-Encoding'))
+
+    def test_streaming(self):
+        """Each chunk is sent compressed as it comes, and together they decompress to the whole page. """
+        chunks = [PAGE[:300].encode(), PAGE[300:].encode()]
+        response = self.process(StreamingHttpResponse(iter(chunks)))
+        self.assertEqual('gzip', response['Content-Encoding'])
+        parts = list(response.streaming_content)
+        self.assertGreater(len(parts), 2)
+        self.assertEqual(PAGE.encode(), gzip.decompress(b''.join(parts)))
+
+    def test_strip_html(self):
+        """Whitespace is collapsed, except in <pre> (even when it continues into the next part of a stream). """
+        self.assertEqual('<p> Some text </p>\n<pre>  a\n  b</pre> ',
+                         WhitespaceStripper().strip('<p>  Some   text  </p>\n  <pre>  a\n  b</pre>   '))
+        stripper = WhitespaceStripper()
+        self.assertEqual('<b> x</b><pre>  a', stripper.strip('<b>   x</b><pre>  a'))
+        self.assertEqual('  b</pre> c', stripper.strip('  b</pre>   c'))
+        with override_settings(COMPRESS_STRIP_HTML=True):
+            content = gzip.decompress(self.process(HttpResponse(PAGE)).content).decode()
+        self.assertIn('<p> Some text </p>', content)
+        self.assertIn('<pre>  kept\n    as is  </pre>', content)
+
+    def test_strip_keeps_quoted_values(self):
+        """Whitespace in quoted attribute values is kept, also when the value continues into the next part. """
+        html = '<p   title="a   b" data-x=\'c  \n d\'>  it\'s   \'so\'   "quoted"  </p>'
+        expected = '<p title="a   b" data-x=\'c  \n d\'> it\'s \'so\' "quoted" </p>'
+        self.assertEqual(expected, WhitespaceStripper().strip(html))
+        for size in (1, 2, 5):
+            stripper = WhitespaceStripper()
+            parts = [stripper.feed(html[start:start + size]) for start in range(0, len(html), size)]
+            self.assertEqual(expected, ''.join(parts) + stripper.flush())
+
+    @override_settings(COMPRESS_STRIP_HTML=True)
+    def test_strip_split_stream(self):
+        """A character, a <pre> tag, or whitespace split between chunks of a stream is stripped as if whole. """
+        page = ('<p>caf\u00e9  \u2713</p>  <pre>keep this\n  ws</pre>   <p>  end</p>' * 20).encode()
+        expected = '<p>caf\u00e9 \u2713</p> <pre>keep this\n  ws</pre> <p> end</p>' * 20
+        for size in (1, 2, 3, 7):
+            chunks = [page[start:start + size] for start in range(0, len(page), size)]
+            response = self.process(StreamingHttpResponse(iter(chunks)))
+            self.assertEqual(expected, gzip.decompress(b''.join(response.streaming_content)).decode())
+        chunks = [b'<p>  a</p>  ', b'\xff  <p>  b</p>']  # Not utf-8: the rest is given as it is.
+        response = self.process(StreamingHttpResponse(iter(chunks)))
+        self.assertEqual(b'<p> a</p> \xff  <p>  b</p>', gzip.decompress(b''.join(response.streaming_content)))
+
+    def test_compressed_once_per_etag(self):
+        """With a strong ETag, the compressed body is kept, and the ETag is weak once compressed. """
+        def response():
+            result = HttpResponse(PAGE)
+            result['ETag'] = '"abc"'
+            return result
+        first = self.process(response())
+        with mock.patch('project.compression.compress') as compress:
+            second = self.process(response())
+            compress.assert_not_called()
+        self.assertEqual(first.content, second.content)
+        self.assertEqual('W/"abc"', second['ETag'])
+
+    @override_settings(PAGE_CACHE_SECONDS=300)
+    @modify_settings(MIDDLEWARE={'prepend': 'project.compression.CompressionMiddleware'})
+    def test_page_cache_not_modified(self):
+        """A page cache 304 still works with the weak ETag of the compressed page. """
+        first = self.client.get('/named', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual('gzip', first['Content-Encoding'])
+        second = self.client.get('/named', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(304, second.status_code)
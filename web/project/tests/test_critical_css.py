@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+from django.test import TestCase, override_settings
+from django.template.loader import render_to_string
+from ..critical_css import critical_rules, markup_names, template_sources, get_critical_css
+
+SHEETS = ['css/normalize.css', 'css/style.css']
+
+
+class CriticalCssTests(TestCase):
+
+    def test_markup_names(self):
+        """Tags, classes, ids, and attribute names from the markup, ignoring the template syntax. """
+        names = markup_names('<nav id="top"><ul class="{{ x }} site-nav"><li hidden>{% url "home" %}</li></ul></nav>')
+        self.assertEqual({'nav', 'ul', 'li'}, names.tags)
+        self.assertEqual({'site-nav'}, names.classes)
+        self.assertEqual({'top'}, names.ids)
+        self.assertEqual({'id', 'class', 'hidden'}, names.attrs)
+
+    def test_critical_rules(self):
+        """Only rules (and selectors) that may match are kept, within @media blocks, and @keyframes are dropped. """
+        names = markup_names('<nav class="site-nav"><a href="#">x</a></nav>')
+        css = ('a:hover,pre{color:red}.site-nav a{margin:0}nav>p{margin:0}[hidden]{display:none}'
+               '@media (min-width:9px){a::before{content:"}"}table{x:y}}@media print{pre{x:y}}@keyframes k{to{x:y}}')
+        expected = 'a:hover{color:red}.site-nav a{margin:0}@media (min-width:9px){a::before{content:"}"}}'
+        self.assertEqual(expected, critical_rules(css, names))
+
+    def test_template_sources(self):
+        """The template and the templates it extends. """
+        self.assertEqual({'generic/home.html', 'generic/base.html'}, set(template_sources('generic/home.html')))
+
+    def test_rendered_critical_css(self):
+        """With CRITICAL_CSS, the rules are inlined and the sheets load async, with a noscript fallback. """
+        self.assertIn('<link rel="stylesheet" href="/static/css/style.css" />', render_to_string('generic/home.html'))
+        with override_settings(CRITICAL_CSS=True):
+            html = render_to_string('generic/home.html')
+        self.assertIn('<style>', html)
+        self.assertIn('nav ul.site-nav{', html)
+        self.assertIn('<link rel="preload" href="/static/css/style.css" as="style"', html)
+        self.assertIn('<noscript><link rel="stylesheet" href="/static/css/normalize.css" />', html)
+
+    def test_extracted_again_when_css_changes(self):
+        """Memoized per template, until a source sheet changes. """
+        static_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, static_dir)
+        path = os.path.join(static_dir, 'css', 'page.css')
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write('header { margin: 0; }\ntable { margin: 0; }\n')
+        with override_settings(STATICFILES_DIRS=[static_dir]):
+            css = get_critical_css('generic/home.html', ['css/page.css'])
+            self.assertEqual('header{margin:0}', css)
+            self.assertIs(css, get_critical_css('generic/home.html', ['css/page.css']))
+            with open(path, 'w') as f:
+                f.write('footer { padding: 0; }\n')
+            os.utime(path, ns=(1, 1))
+            self.assertEqual('footer{padding:0}', get_critical_css('generic/home.html', ['css/page.css']))
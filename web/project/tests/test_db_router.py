@@ -0,0 +1,94 @@
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import contextvars
+from django.contrib.auth.models import Group
+from django.db import connections
+from django.http import HttpResponse
+from django.test import TestCase, RequestFactory, override_settings
+from ..db_router import ReplicaRouter, ReplicaPinMiddleware, PIN_COOKIE, is_pinned
+
+REPLICAS = ('test_replica_1', 'test_replica_2')
+
+
+@override_settings(DATABASE_REPLICAS={'test_replica_1': 1, 'test_replica_2': 3}, REPLICA_SELECTION='weight',
+                   REPLICA_CHECK_SECONDS=0)
+class ReplicaRouterTests(TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        for alias in REPLICAS:  # SQLite files standing in for replicas, each with a group named for it.
+            path = os.path.join(temp_dir, alias + '.sqlite3')
+            with sqlite3.connect(path) as conn:
+                conn.execute('CREATE TABLE auth_group (id integer PRIMARY KEY AUTOINCREMENT, name varchar(150))')
+                conn.execute('INSERT INTO auth_group (name) VALUES (?)', [alias])
+            conn.close()
+            connections.databases[alias] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': path}
+            self.addCleanup(connections.databases.pop, alias)
+            self.addCleanup(connections.__delitem__, alias)
+            self.addCleanup(connections[alias].close)
+        self.missing = os.path.join(temp_dir, 'missing', 'replica.sqlite3')
+        connections.databases['test_replica_down'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': self.missing}
+        self.addCleanup(connections.databases.pop, 'test_replica_down')
+        self.router = ReplicaRouter()
+
+    def reads(self, count=400):
+        """How many of the reads went to each database, each in an empty context (not pinned by earlier writes). """
+        counts = {}
+        for _ in range(count):
+            alias = contextvars.Context().run(self.router.db_for_read, Group)
+            counts[alias] = counts.get(alias, 0) + 1
+        return counts
+
+    def test_weighted(self):
+        random.seed(0)
+        counts = self.reads()
+        self.assertEqual(set(REPLICAS), set(counts))
+        self.assertGreater(counts['test_replica_2'], 2 * counts['test_replica_1'])
+
+    @override_settings(REPLICA_SELECTION='latency')
+    def test_least_latency(self):
+        latencies = {'test_replica_1': 0.002, 'test_replica_2': 0.02}
+        self.router.check = latencies.get
+        self.assertEqual({'test_replica_1': 20}, self.reads(20))
+
+    @override_settings(DATABASE_REPLICAS={'test_replica_down': 5, 'test_replica_1': 1})
+    def test_unhealthy_dropped(self):
+        """A replica failing its health check is not used, until it passes again. """
+        self.assertEqual({'test_replica_1': 20}, self.reads(20))
+        with override_settings(DATABASE_REPLICAS={'test_replica_down': 1}):
+            self.assertEqual({'default': 5}, self.reads(5))
+            os.makedirs(os.path.dirname(self.missing))
+            self.assertEqual({'test_replica_down': 5}, self.reads(5))
+        connections['test_replica_down'].close()
+
+    @override_settings(DATABASE_ROUTERS=['project.db_router.ReplicaRouter'])
+    def test_read_your_writes(self):
+        """The ORM reads from a replica, until a write, then from the primary. """
+        def queries():
+            names = [Group.objects.get().name]
+            Group.objects.create(name='primary')
+            names.append(Group.objects.get().name)
+            return names, is_pinned()
+        names, pinned = contextvars.Context().run(queries)
+        self.assertIn(names[0], REPLICAS)
+        self.assertEqual('primary', names[1])
+        self.assertTrue(pinned)
+
+    def test_pin_middleware(self):
+        """A request that writes sets the pin cookie, and a request with it reads from the primary. """
+        def view(request):
+            if request.method == 'POST':
+                self.router.db_for_write(Group)
+            return HttpResponse(self.router.db_for_read(Group))
+        middleware, factory = ReplicaPinMiddleware(view), RequestFactory()
+        response = middleware(factory.post('/'))
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertNotIn(PIN_COOKIE, middleware(factory.get('/')).cookies)
+        self.assertIn(middleware(factory.get('/')).content.decode(), REPLICAS)
+        request = factory.get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        self.assertEqual(b'default', middleware(request).content)
@@ -0,0 +1,65 @@
+from django.core import mail
+from django.test import SimpleTestCase, override_settings
+from ..mail_queue import mail_queue
+from .helper_smtp import SMTPServer
+
+
+class MailQueueTests(SimpleTestCase):
+
+    def setUp(self):
+        self.server = SMTPServer()
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        settings_override = override_settings(
+            EMAIL_BACKEND='project.mail_queue.EmailBackend', EMAIL_HOST='localhost', EMAIL_PORT=self.server.port,
+            EMAIL_USE_TLS=False, EMAIL_USE_SSL=False, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+            EMAIL_POOL_SIZE=1, EMAIL_RETRIES=2, EMAIL_RETRY_DELAY=0.01, EMAIL_IDLE_SECONDS=30,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(mail_queue.stop, 5)
+        mail_queue.sent, mail_queue.failed = 0, 0
+
+    def send(self, count, subject='Subject'):
+        for num in range(count):
+            self.assertEqual(1, mail.send_mail('%s %d' % (subject, num), 'Body', 'from@example.com',
+                                               ['to%d@example.com' % num]))
+        self.assertTrue(mail_queue.flush(5))
+
+    def test_sent_from_queue(self):
+        self.send(1)
+        self.assertEqual(1, len(self.server.messages))
+        sender, recipients, data = self.server.messages[0]
+        self.assertIn('from@example.com', sender)
+        self.assertIn('to0@example.com', recipients[0])
+        self.assertIn(b'Subject: Subject 0', data)
+
+    def test_one_connection(self):
+        """Messages queued over time are sent over the same persistent connection. """
+        self.send(10)
+        self.send(5, 'Later')
+        self.assertEqual(15, len(self.server.messages))
+        self.assertEqual(1, self.server.connections)
+        self.assertEqual(15, mail_queue.sent)
+
+    def test_retry(self):
+        self.server.fail_count = 2
+        self.send(3)
+        self.assertEqual(3, len(self.server.messages))
+        self.assertEqual(3, self.server.connections)  # A new one after each failure.
+        self.assertEqual((3, 0), (mail_queue.sent, mail_queue.failed))
+
+    def test_gives_up(self):
+        self.server.fail_count = 3
+        with self.assertLogs('project.mail_queue', 'ERROR') as logs:
+            self.send(2)
+        self.assertIn('to0@example.com', logs.output[0])
+        self.assertEqual(1, len(self.server.messages))
+        self.assertEqual((1, 1), (mail_queue.sent, mail_queue.failed))
+
+    def test_restart_after_stop(self):
+        self.send(1)
+        mail_queue.stop(5)
+        self.send(1)
+        self.assertEqual(2, len(self.server.messages))
+        self.assertEqual(2, self.server.connections)
@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.shortcuts import render
+from django.utils import translation
+from ..page_cache import cache_page_view, page_version, inventory_version
+from .helper_general import MockUser
+
+
+@override_settings(PAGE_CACHE_SECONDS=300)
+class PageCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.calls = []
+        self.factory = RequestFactory()
+
+        @cache_page_view('generic/base.html')
+        def counted_view(request):
+            self.calls.append(request)
+            return render(request, 'generic/base.html', {'page_title': 'Counted'})
+        self.view = counted_view
+
+    def get(self, path='/counted', user=None, **extra):
+        request = self.factory.get(path, **extra)
+        request.user = user or AnonymousUser()
+        return self.view(request)
+
+    def test_second_request_from_cache(self):
+        """The same page is only rendered once, and both responses have the same body and ETag. """
+        first, second = self.get(), self.get()
+        self.assertEqual(1, len(self.calls))
+        self.assertEqual(first.content, second.content)
+        self.assertTrue(first['ETag'])
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_not_modified(self):
+        """A request with If-None-Match of the current ETag gets a 304, for both function and class views. """
+        etag = self.get()['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(etag, response['ETag'])
+        c = Client()
+        for url in ('/', '/named', '/user/'):
+            page = c.get(url)
+            self.assertEqual(200, page.status_code)
+            self.assertEqual(304, c.get(url, HTTP_IF_NONE_MATCH=page['ETag']).status_code)
+            self.assertEqual(200, c.get(url, HTTP_IF_NONE_MATCH='"other"').status_code)
+
+    def test_varies_on_path_language_and_user(self):
+        """Different query, language, or user are each rendered, but anonymous visitors share a cached page. """
+        self.get()
+        self.get('/counted?page=2')
+        with translation.override('de'):
+            self.get()
+        self.get(user=MockUser(pk=1))
+        self.get()
+        self.assertEqual(4, len(self.calls))
+
+    def test_not_cached(self):
+        """Not cached for other methods, pending cookie messages, or when turned off. """
+        self.view(self.factory.post('/counted'))
+        self.view(self.factory.post('/counted'))
+        self.factory.cookies['messages'] = 'pending'
+        self.get()
+        self.get()
+        self.factory.cookies.clear()
+        with override_settings(PAGE_CACHE_SECONDS=0):
+            self.assertFalse(self.get().has_header('ETag'))
+            self.get()
+        self.assertEqual(6, len(self.calls))
+
+    @override_settings(ROOT_URLCONF='project.tests.test_resolvers')
+    def test_version_changes_with_inventory(self):
+        """A different url inventory gives a different page version. """
+        version = inventory_version()
+        with override_settings(ROOT_URLCONF='project.urls'):
+            self.assertNotEqual(version, inventory_version())
+        self.assertEqual(version, inventory_version())
+
+    def test_version_changes_with_template(self):
+        """An edited template gives a new page version, and the next request renders it. """
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        file_name = os.path.join(temp_dir, 'page.html')
+        with open(file_name, 'w') as f:
+            f.write('first')
+        templates = [{'BACKEND': 'django.template.backends.django.DjangoTemplates', 'DIRS': [temp_dir],
+                      'OPTIONS': {'debug': True}, }]
+        with override_settings(TEMPLATES=templates):
+            view = cache_page_view('page.html')(lambda request: render(request, 'page.html'))
+            request = self.factory.get('/page')
+            request.user = AnonymousUser()
+            version = page_version(['page.html'])
+            self.assertEqual(b'first', view(request).content)
+            with open(file_name, 'w') as f:
+                f.write('second version')
+            self.assertNotEqual(version, page_version(['page.html']))
+            self.assertEqual(b'second version', view(request).content)
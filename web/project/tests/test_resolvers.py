@@ -0,0 +1,168 @@
+from types import ModuleType
+from django.test import TestCase, RequestFactory, override_settings
+from django.conf import settings
+from django.template import engines
+from django.urls import resolvers, path, re_path, include, reverse, Resolver404, NoReverseMatch
+from django.urls import clear_url_caches, set_script_prefix
+from django.utils.module_loading import import_string
+from ..resolvers import PrefixTrie, TrieURLResolver, literal_prefix, trie_urlpatterns
+from ..resolvers import get_reverse_map, cached_reverse
+from .helper_general import APP_NAME
+urllist = import_string(APP_NAME + '.management.commands.urllist')
+
+
+def view(request, *args, **kwargs):
+    pass
+
+
+sample_patterns = [
+    path('same/', view, name='same_first'),
+    path('same/', view, name='same_second'),
+    re_path(r'^same/(\d+)/$', view, name='positional'),
+    path('item/<int:pk>/', view, name='item'),
+    path('<slug:slug>/', view, name='dynamic_first'),
+    path('items/', view, name='after_dynamic'),
+    path('nested/<int:group>/', include([
+        path('', view, name='nested_home'),
+        path('<str:part>/', view, {'extra': True}, name='nested_part'),
+        ])),
+    path('app/', include(([path('one/', view, name='one')], 'sample_app'), namespace='sample')),
+    re_path(r'^(?P<year>[0-9]{4})/$', view, name='year'),
+    ]
+
+
+class ResolverCompareMixin:
+    """Helpers to check the trie resolver gives the same result as the stock resolver. """
+
+    def assertSameMatch(self, path, stock, trie):
+        try:
+            expected = stock.resolve(path)
+        except Resolver404 as e:
+            with self.assertRaises(Resolver404) as cm:
+                trie.resolve(path)
+            expected, actual = e.args[0], cm.exception.args[0]
+            self.assertEqual(expected['path'], actual['path'])
+            self.assertEqual(len(expected.get('tried', [])), len(actual.get('tried', [])))
+            return None
+        actual = trie.resolve(path)
+        for attr in ('func', 'args', 'kwargs', 'url_name', 'app_names', 'namespaces', 'route', 'view_name'):
+            self.assertEqual(getattr(expected, attr), getattr(actual, attr), f"{path} {attr}")
+        return actual
+
+
+class TrieResolverTests(ResolverCompareMixin, TestCase):
+
+    def test_literal_prefix(self):
+        """Literal prefixes are found for routes and simple regex, otherwise the prefix is empty. """
+        self.assertEqual('item/', literal_prefix(resolvers.RoutePattern('item/<int:pk>/')))
+        self.assertEqual('named', literal_prefix(resolvers.RoutePattern('named')))
+        self.assertEqual('same/', literal_prefix(resolvers.RegexPattern(r'^same/(\d+)/$')))
+        self.assertEqual('', literal_prefix(resolvers.RegexPattern(r'(?i)^case/$')))
+        self.assertEqual('', literal_prefix(resolvers.RegexPattern(r'^a/(b)|^c/')))
+        self.assertEqual('', literal_prefix(resolvers.RoutePattern('<slug:slug>/')))
+
+    def test_prefix_trie_candidates(self):
+        """Candidates are all prefixes the text starts with, plus any empty prefix, in their original order. """
+        trie = PrefixTrie(['admin/', '', 'a', 'user/', 'admin/x', ''])
+        self.assertListEqual([1, 2, 5], trie.candidates('about'))
+        self.assertListEqual([0, 1, 2, 4, 5], trie.candidates('admin/xyz'))
+        self.assertListEqual([1, 5], trie.candidates(''))
+
+    def test_every_urllist_route(self):
+        """For every route urllist reports, the trie resolver matches the same as the stock resolver. """
+        stock = resolvers.get_resolver()
+        trie = TrieURLResolver(resolvers.RegexPattern(r'^/'), settings.ROOT_URLCONF)
+        rows = list(urllist.Command().collect_urls(stock))
+        self.assertTrue(rows)
+        for u in rows:
+            self.assertSameMatch(urllist.sample_path(u.pattern), stock, trie)
+
+    def test_sample_patterns(self):
+        """Duplicate, positional, dynamic first, nested, namespaced, and unmatched paths all resolve the same. """
+        stock = resolvers.URLResolver(resolvers.RegexPattern(r'^/'), sample_patterns)
+        trie = TrieURLResolver(resolvers.RegexPattern(r'^/'), sample_patterns)
+        paths = ['/same/', '/same/12/', '/item/3/', '/item/x/', '/items/', '/anything/', '/nested/4/',
+                 '/nested/4/part/', '/app/one/', '/2020/', '/1/', '/', '/no/such/path/', 'no_slash']
+        names = [self.assertSameMatch(p, stock, trie) for p in paths]
+        self.assertEqual('same_first', names[0].url_name)
+        self.assertEqual('dynamic_first', names[4].url_name)
+        self.assertIsInstance(trie.url_patterns[6], TrieURLResolver)
+
+    def test_trie_urlpatterns_urllist(self):
+        """urllist gives the same rows for the project urls with the trie, even when ignoring the project. """
+        project_urls = import_string(APP_NAME + '.urls')
+        trie_urls = ModuleType(project_urls.__name__)
+        trie_urls.urlpatterns = trie_urlpatterns(project_urls.urlpatterns)
+        stock = resolvers.URLResolver(resolvers.RegexPattern(r'^/'), project_urls)
+        trie = resolvers.URLResolver(resolvers.RegexPattern(r'^/'), trie_urls)
+        com = urllist.Command()
+        cols = ['source', 'name', 'pattern', 'lookup_str']
+        for ignore in ([], [APP_NAME], ['admin']):
+            expected = com.get_url_data(None, ignore, list(cols), urls=stock)
+            self.assertTrue(expected)
+            self.assertEqual(expected, com.get_url_data(None, ignore, list(cols), urls=trie), ignore)
+
+    @override_settings(ROOT_URLCONF=__name__)
+    def test_trie_urlpatterns_reverse(self):
+        """When used for a ROOT_URLCONF, reverse gives the same paths as the stock patterns. """
+        stock = resolvers.URLResolver(resolvers.RegexPattern(r'^/'), sample_patterns)
+        trie_root = resolvers.get_resolver()
+        self.assertIsInstance(trie_root.url_patterns[0], TrieURLResolver)
+        self.assertEqual('/item/5/', reverse('item', args=[5]))
+        self.assertEqual('/nested/4/', reverse('nested_home', kwargs={'group': 4}))
+        self.assertEqual('/app/one/', reverse('sample:one'))
+        self.assertSameMatch('/nested/4/part/', stock, trie_root)
+
+
+class ReverseMapTests(TestCase):
+
+    def tearDown(self):
+        set_script_prefix('/')
+
+    def test_reverse_map_matches_reverse(self):
+        """Every precomputed path is the same as reverse gives, including the project's named routes. """
+        reverse_map = get_reverse_map()
+        for name in ('home', 'named_path', 'profile_page', 'admin:index'):
+            self.assertIn(name, reverse_map)
+        for name, url in reverse_map.items():
+            self.assertEqual(reverse(name), '/' + url)
+
+    @override_settings(ROOT_URLCONF=__name__)
+    def test_cached_reverse_with_arguments(self):
+        """Names needing arguments, or not found, are given to reverse. """
+        self.assertNotIn('item', get_reverse_map())
+        self.assertEqual('/item/5/', cached_reverse('item', args=[5]))
+        self.assertEqual('/nested/4/', cached_reverse('nested_home', kwargs={'group': 4}))
+        self.assertEqual('/app/one/', cached_reverse('sample:one', current_app='sample'))
+        with self.assertRaises(NoReverseMatch):
+            cached_reverse('item')
+
+    def test_script_prefix(self):
+        """The current script prefix is used, not the one when the map was built. """
+        get_reverse_map()
+        set_script_prefix('/mounted/')
+        self.assertEqual(reverse('named_path'), cached_reverse('named_path'))
+        self.assertEqual('/mounted/named', cached_reverse('named_path'))
+
+    def test_invalidated_on_url_caches_cleared(self):
+        """When the resolver cache is cleared (as when ROOT_URLCONF changes), the map is built again. """
+        first = get_reverse_map()
+        self.assertIs(first, get_reverse_map())
+        clear_url_caches()
+        self.assertIsNot(first, get_reverse_map())
+        with override_settings(ROOT_URLCONF=__name__):
+            self.assertIn('same_first', get_reverse_map())
+
+    def test_template_tag_matches_builtin(self):
+        """The url tag from url_map renders the same as the built-in url tag. """
+        text = "{% url 'home' %}|{% url name %}|{% url 'admin:index' %}|{% url 'home' as home %}{{ home }}"
+        engine = engines['django']
+        request = RequestFactory().get('/')
+        context = {'name': 'named_path', 'request': request}
+        expected = engine.from_string(text).render(context)
+        actual = engine.from_string('{% load url_map %}' + text).render(context)
+        self.assertEqual(expected, actual)
+        self.assertEqual('/|/named|/admin/|/', actual)
+
+
+urlpatterns = trie_urlpatterns(sample_patterns)
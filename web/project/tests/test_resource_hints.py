@@ -0,0 +1,64 @@
+import asyncio
+from django.test import TestCase, Client, modify_settings
+from django.views.generic import TemplateView
+from ..resource_hints import critical_resources, get_view_hints, get_path_hints, EarlyHintsASGI
+from ..views import home_view, NamedView, ProfileView
+
+FONT = 'https://fonts.googleapis.com/css?family=Diplomata|Open+Sans&display=swap'
+
+
+async def asgi_app(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+
+
+class ResourceHintsTests(TestCase):
+
+    def test_critical_resources(self):
+        """Stylesheets and scripts in the head, and images in the first header, but not icons or later images. """
+        html = ('<html><head><link rel="shortcut icon" href="/i.ico"><link rel="stylesheet" href="/a.css">'
+                '<script src="/a.js"></script><link rel="stylesheet" href="/a.css"></head><body>'
+                '<img src="/before.png"><header><img src="/logo.svg"></header><header><img src="/x.png"></header>')
+        expected = [('/a.css', 'style'), ('/a.js', 'script'), ('/logo.svg', 'image')]
+        self.assertEqual(expected, critical_resources(html))
+
+    def test_view_hints(self):
+        """The base template resources for each view, including the css_sheets of its extra_context. """
+        base = ['</static/css/normalize.css>; rel=preload; as=style', '</static/css/style.css>; rel=preload; as=style',
+                '<%s>; rel=preload; as=style' % FONT, '</static/assets/logo.svg>; rel=preload; as=image']
+        for view in (home_view, NamedView.as_view(), ProfileView.as_view()):
+            hints = get_view_hints(view)
+            self.assertEqual(set(base), set(hints) - {'</static/css/home.css>; rel=preload; as=style'})
+        self.assertIn('</static/css/home.css>; rel=preload; as=style', get_view_hints(NamedView.as_view()))
+        self.assertNotIn('</static/css/home.css>; rel=preload; as=style', get_view_hints(ProfileView.as_view()))
+        self.assertEqual((), get_path_hints('/no/such/path/'))
+
+    def test_view_hints_per_as_view(self):
+        """Each as_view of the same class has the hints of its own template_name and extra_context. """
+        home_css = '</static/css/home.css>; rel=preload; as=style'
+        context = {'css_sheets': ['css/home.css']}
+        with_sheet = TemplateView.as_view(template_name='generic/base.html', extra_context=context)
+        without_sheet = TemplateView.as_view(template_name='generic/base.html')
+        self.assertIn(home_css, get_view_hints(with_sheet))
+        self.assertNotIn(home_css, get_view_hints(without_sheet))
+        self.assertEqual((), get_view_hints(TemplateView.as_view()))
+
+    @modify_settings(MIDDLEWARE={'prepend': 'project.resource_hints.ResourceHintsMiddleware'})
+    def test_link_header(self):
+        """HTML pages of views with hints get a Link header of them, others do not. """
+        response = Client().get('/named')
+        self.assertEqual(', '.join(get_view_hints(NamedView.as_view())), response['Link'])
+        self.assertFalse(Client().get('/admin/jsi18n/').has_header('Link'))
+
+    def test_early_hints(self):
+        """With the server early hint extension, the hints are sent before the response. """
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+        scope = {'type': 'http', 'method': 'GET', 'path': '/user/', 'extensions': {'http.response.early_hint': {}}}
+        asyncio.run(EarlyHintsASGI(asgi_app)(scope, None, send))
+        self.assertEqual('http.response.early_hint', messages[0]['type'])
+        self.assertEqual([ea.encode() for ea in get_path_hints('/user/')], messages[0]['links'])
+        messages.clear()
+        asyncio.run(EarlyHintsASGI(asgi_app)({**scope, 'extensions': {}}, None, send))
+        self.assertEqual(['http.response.start'], [ea['type'] for ea in messages])
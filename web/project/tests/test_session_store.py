@@ -0,0 +1,71 @@
+import shutil
+import tempfile
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from ..session_store import SessionStore
+
+
+@override_settings(SESSION_REFRESH_SECONDS=300)
+class SessionStoreTests(TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        settings_override = override_settings(SESSION_CACHE_ALIAS='sessions', CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'sessions': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': temp_dir},
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        session = SessionStore()
+        session['name'] = 'value'
+        session.save()
+        self.key = session.session_key
+
+    def stored(self):
+        return Session.objects.get(session_key=self.key)
+
+    def test_read_from_cache(self):
+        session = SessionStore(self.key)
+        with self.assertNumQueries(0):
+            self.assertEqual('value', session['name'])
+        self.assertEqual({'name': 'value'}, self.stored().get_decoded())
+
+    def test_read_from_database_once(self):
+        caches['sessions'].clear()
+        with self.assertNumQueries(1):
+            self.assertEqual('value', SessionStore(self.key)['name'])
+        with self.assertNumQueries(0):
+            self.assertEqual('value', SessionStore(self.key)['name'])
+
+    def test_modified_written_through(self):
+        session = SessionStore(self.key)
+        session['name'] = 'changed'
+        session.save()
+        self.assertEqual({'name': 'changed'}, self.stored().get_decoded())
+        with self.assertNumQueries(0):
+            self.assertEqual('changed', SessionStore(self.key)['name'])
+
+    def test_unmodified_not_saved(self):
+        session = SessionStore(self.key)
+        session['name'] = 'value'  # Marked modified, with the same data.
+        with self.assertNumQueries(0):
+            session.save()
+
+    def test_expiry_refresh_debounced(self):
+        """Saving an unmodified session only writes its expiry date, once it moves SESSION_REFRESH_SECONDS. """
+        expire_date = self.stored().expire_date
+        with self.assertNumQueries(0):
+            SessionStore(self.key).save()
+        with override_settings(SESSION_REFRESH_SECONDS=0), self.assertNumQueries(1):
+            SessionStore(self.key).save()
+        self.assertGreater(self.stored().expire_date, expire_date)
+        with self.assertNumQueries(0):
+            self.assertEqual('value', SessionStore(self.key)['name'])
+
+    def test_local_cache_refused(self):
+        """A cache in the memory of one process would keep a session another process deleted. """
+        with override_settings(SESSION_CACHE_ALIAS='default'), self.assertRaises(ImproperlyConfigured):
+            SessionStore(self.key)
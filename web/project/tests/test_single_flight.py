@@ -0,0 +1,109 @@
+import time
+import asyncio
+import threading
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import TestCase, RequestFactory, modify_settings
+from ..single_flight import SingleFlight, SingleFlightMiddleware, single_flight_response, async_single_flight_response
+from .helper_general import MockUser
+
+
+class SingleFlightTests(TestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.flight = SingleFlight(timeout=5)
+        self.calls, self.release = [], threading.Event()
+
+    def request(self, user=None, path='/page'):
+        request = self.factory.get(path)
+        request.user = user or AnonymousUser()
+        return request
+
+    def slow_view(self, request):
+        self.calls.append(request)
+        self.release.wait(5)
+        response = HttpResponse('page %d' % len(self.calls))
+        response['X-Test'] = 'yes'
+        return response
+
+    def in_threads(self, requests, get_response):
+        """Responses (or exceptions) for the requests, each in a thread, released once they have all started. """
+        results = [None] * len(requests)
+
+        def run(i):
+            try:
+                results[i] = single_flight_response(requests[i], 'test', get_response, self.flight)
+            except Exception as e:
+                results[i] = e
+        threads = [threading.Thread(target=run, args=(i, )) for i in range(len(requests))]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_threads_share_one_response(self):
+        """Concurrent identical requests get a copy of the one response, with its headers. """
+        responses = self.in_threads([self.request() for _ in range(5)], self.slow_view)
+        self.assertEqual(1, len(self.calls))
+        self.assertEqual(5, len({id(ea) for ea in responses}))
+        for response in responses:
+            self.assertEqual(b'page 1', response.content)
+            self.assertEqual('yes', response['X-Test'])
+        self.assertEqual({}, self.flight.calls)
+
+    def test_different_users_not_shared(self):
+        requests = [self.request(), self.request(MockUser(pk=1)), self.request(path='/other')]
+        self.in_threads(requests, self.slow_view)
+        self.assertEqual(3, len(self.calls))
+
+    def test_not_shareable(self):
+        """A response setting a cookie is not shared: each waiting request gets its own. """
+        def cookie_view(request):
+            response = self.slow_view(request)
+            response.set_cookie('private', 'value')
+            return response
+        self.in_threads([self.request() for _ in range(3)], cookie_view)
+        self.assertEqual(3, len(self.calls))
+
+    def test_exception_shared(self):
+        def failing_view(request):
+            self.slow_view(request)
+            raise ValueError('broken')
+        results = self.in_threads([self.request() for _ in range(3)], failing_view)
+        self.assertEqual(1, len(self.calls))
+        self.assertTrue(all(isinstance(ea, ValueError) for ea in results))
+
+    def test_async_tasks_share_one_response(self):
+        async def view(request):
+            self.calls.append(request)
+            await asyncio.sleep(0.05)
+            return HttpResponse('async page')
+
+        async def burst():
+            return await asyncio.gather(*(async_single_flight_response(self.request(), 'test', view, self.flight)
+                                          for _ in range(5)))
+        responses = async_to_sync(burst)()
+        self.assertEqual(1, len(self.calls))
+        self.assertEqual({b'async page'}, {ea.content for ea in responses})
+        self.assertEqual({}, self.flight.calls)
+
+    @modify_settings(MIDDLEWARE={'append': 'project.single_flight.SingleFlightMiddleware'})
+    def test_middleware(self):
+        self.assertEqual(200, self.client.get('/named').status_code)
+        self.assertEqual(405, self.client.post('/named').status_code)
+
+        async def get():
+            return await self.async_client.get('/named')
+        self.assertEqual(200, async_to_sync(get)().status_code)
+
+    def test_middleware_async_mode(self):
+        """The middleware is seen as a coroutine function, by the middleware above it, only around an async one. """
+        async def get_response(request):
+            return HttpResponse()
+        self.assertTrue(asyncio.iscoroutinefunction(SingleFlightMiddleware(get_response)))
+        self.assertFalse(asyncio.iscoroutinefunction(SingleFlightMiddleware(lambda request: HttpResponse())))
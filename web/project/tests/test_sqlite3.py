@@ -0,0 +1,50 @@
+import os
+import shutil
+import tempfile
+from django.conf import settings
+from django.db import connections
+from django.test import SimpleTestCase
+
+
+class SqliteProfileTests(SimpleTestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def connect(self, profile):
+        """A cursor of a new database alias for a SQLite file with the profile pragmas. """
+        alias = 'test_profile_' + profile
+        connections.databases[alias] = {'ENGINE': 'project.sqlite3', 'PRAGMAS': settings.SQLITE_PROFILES[profile],
+                                        'NAME': os.path.join(self.temp_dir, profile + '.sqlite3')}
+        connection = connections[alias]
+        self.addCleanup(connections.databases.pop, alias)
+        self.addCleanup(connections.__delitem__, alias)
+        self.addCleanup(connection.close)
+        return connection.cursor()
+
+    def pragma(self, cursor, name):
+        cursor.execute('PRAGMA %s' % name)
+        return cursor.fetchone()[0]
+
+    def test_fast_profile(self):
+        """Each pragma of the profile is set on the new connection. """
+        cursor = self.connect('fast')
+        self.assertEqual('wal', self.pragma(cursor, 'journal_mode'))
+        self.assertEqual(1, self.pragma(cursor, 'synchronous'))  # NORMAL
+        self.assertEqual(5000, self.pragma(cursor, 'busy_timeout'))
+        self.assertEqual(-64000, self.pragma(cursor, 'cache_size'))
+        self.assertEqual(2, self.pragma(cursor, 'temp_store'))  # MEMORY
+        self.assertEqual(1, self.pragma(cursor, 'foreign_keys'))  # Still set by the Django backend.
+
+    def test_default_profile(self):
+        cursor = self.connect('default')
+        self.assertEqual('delete', self.pragma(cursor, 'journal_mode'))
+        self.assertEqual(2, self.pragma(cursor, 'synchronous'))  # FULL
+
+    def test_queries(self):
+        cursor = self.connect('fast')
+        cursor.execute('CREATE TABLE example (id INTEGER PRIMARY KEY, value TEXT)')
+        cursor.executemany('INSERT INTO example (value) VALUES (%s)', [['a'], ['b']])
+        cursor.execute('SELECT COUNT(*) FROM example')
+        self.assertEqual(2, cursor.fetchone()[0])
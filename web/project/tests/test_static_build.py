@@ -0,0 +1,66 @@
+import os
+import gzip
+import shutil
+import tempfile
+from io import StringIO
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.template import engines
+from ..static_build import minify_css, minify_svg, build_static, get_static_manifest, BuiltStaticStorage
+
+
+class StaticBuildTests(TestCase):
+
+    def setUp(self):
+        self.build_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.build_dir)
+
+    def read(self, hashed, suffix=''):
+        with open(os.path.join(self.build_dir, *hashed.split('/')) + suffix, 'rb') as f:
+            return f.read()
+
+    def test_minify_css(self):
+        """Comments and extra whitespace are removed, but not from strings or where it is needed. """
+        text = "/* note */\nnav  li::before ,\n a > b {\n  content: ' |  /* x */ ';\n  margin: 0 auto;\n}\n"
+        self.assertEqual("nav li::before,a>b{content:' |  /* x */ ';margin:0 auto}", minify_css(text))
+        self.assertEqual('a :hover{width:calc(1px + 2%)}', minify_css('a :hover {width: calc(1px + 2%);}'))
+        self.assertEqual('a::after{content:"a;}  b"}', minify_css('a::after { content: "a;}  b" ; }'))
+
+    def test_minify_svg(self):
+        """Comments, whitespace between tags, and repeated whitespace are removed. """
+        text = '<svg a="1">\n  <!-- c -->\n  <path d="M1 2\n   L3 4"/>\n</svg>\n'
+        self.assertEqual('<svg a="1"><path d="M1 2 L3 4"/></svg>', minify_svg(text))
+
+    def test_build(self):
+        """Each file and bundle has a content-hashed name in the manifest, and a matching .gz if that is smaller. """
+        manifest = build_static(self.build_dir)
+        paths = manifest['paths']
+        for name in ('css/normalize.css', 'css/style.css', 'css/site.css', 'assets/logo.svg', 'assets/favicon.ico'):
+            self.assertIn(name, paths)
+            self.assertRegex(paths[name], r'\.[0-9a-f]{12}\.')
+        site = self.read(paths['css/site.css'])
+        self.assertEqual(self.read(paths['css/normalize.css']) + b'\n' + self.read(paths['css/style.css']), site)
+        self.assertEqual(site, gzip.decompress(self.read(paths['css/site.css'], '.gz')))
+        self.assertEqual(manifest, get_static_manifest(self.build_dir))
+        self.assertEqual(paths, build_static(self.build_dir)['paths'])
+
+    def test_static_urls_from_manifest(self):
+        """With a build, {% static %} gives the hashed names, and the bundle is linked instead of its files. """
+        template = engines['django'].from_string(
+            "{% load static static_build %}{% bundle 'css/site.css' as sheets %}"
+            "{% for sheet in sheets %}{% static sheet %}|{% endfor %}{% static 'admin/css/base.css' %}")
+        with override_settings(STATIC_BUILD_DIR=self.build_dir,
+                               STATICFILES_STORAGE='project.static_build.BuiltStaticStorage'):
+            self.assertEqual('/static/css/normalize.css|/static/css/style.css|/static/admin/css/base.css',
+                             template.render({}))
+            paths = build_static(self.build_dir)['paths']
+            self.assertEqual('/static/%s|/static/admin/css/base.css' % paths['css/site.css'], template.render({}))
+            self.assertEqual('/static/' + paths['assets/logo.svg'], static('assets/logo.svg'))
+            storage = BuiltStaticStorage()
+            self.assertIs(storage.url('css/site.css'), storage.url('css/site.css'))
+
+    def test_build_static_command(self):
+        out = StringIO()
+        call_command('build_static', output=self.build_dir, stdout=out)
+        self.assertIn('css/site.css -> css/site.', out.getvalue())
@@ -0,0 +1,128 @@
+import os
+import gzip
+import shutil
+import asyncio
+import tempfile
+from wsgiref.util import FileWrapper
+from django.test import SimpleTestCase
+from ..static_serve import StaticIndex, StaticFilesWSGI, StaticFilesASGI, parse_range, accepts_gzip
+
+CONTENT = b'body { color: black; }\n' * 100
+
+
+def app(environ, start_response):
+    start_response('404 Not Found', [])
+    return [b'from app']
+
+
+async def asgi_app(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 404, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b'from app'})
+
+
+class StaticServeTests(SimpleTestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        files = []
+        for name, content in (('css/a.css', CONTENT), ('css/a.css.gz', gzip.compress(CONTENT)), ('b.svg', b'<svg/>')):
+            path = os.path.join(temp_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(content)
+            files.append((name, path))
+        self.index = StaticIndex(files, prefix='/static/', max_age=60)
+        self.etag = self.index.get('/static/css/a.css').etag
+
+    def wsgi(self, path, method='GET', **headers):
+        environ = {'REQUEST_METHOD': method, 'PATH_INFO': path, 'wsgi.file_wrapper': FileWrapper}
+        environ.update({'HTTP_' + k.upper(): v for k, v in headers.items()})
+        started = []
+        body = StaticFilesWSGI(app, self.index)(environ, lambda status, headers: started.extend((status, headers)))
+        content = b''.join(body)
+        if hasattr(body, 'close'):
+            body.close()
+        return started[0], dict(started[1]), content
+
+    def asgi(self, path, method='GET', **headers):
+        scope = {'type': 'http', 'method': method, 'path': path,
+                 'headers': [(k.replace('_', '-').lower().encode(), v.encode()) for k, v in headers.items()]}
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+        asyncio.run(StaticFilesASGI(asgi_app, self.index)(scope, None, send))
+        headers = {k.decode(): v.decode() for k, v in messages[0]['headers']}
+        return messages[0]['status'], headers, b''.join(ea['body'] for ea in messages[1:])
+
+    def test_parse_range(self):
+        self.assertEqual((0, 10), parse_range('bytes=0-9', 100))
+        self.assertEqual((90, 10), parse_range('bytes=90-', 100))
+        self.assertEqual((95, 5), parse_range('bytes=-5', 100))
+        self.assertEqual((50, 50), parse_range('bytes=50-500', 100))
+        self.assertIs(False, parse_range('bytes=100-', 100))
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 100))
+        self.assertIsNone(parse_range('lines=0-1', 100))
+        self.assertIsNone(parse_range('bytes=5-1', 100))
+
+    def test_direct_gz_request(self):
+        """A .gz file asked for by name is sent with its Content-Encoding, so it is not read as plain css. """
+        status, headers, content = self.wsgi('/static/css/a.css.gz', accept_encoding='gzip')
+        self.assertEqual(('200 OK', CONTENT), (status, gzip.decompress(content)))
+        self.assertEqual(('text/css', 'gzip'), (headers['Content-Type'], headers['Content-Encoding']))
+        self.assertNotIn('Vary', headers)
+        status, headers, content = self.wsgi('/static/css/a.css', accept_encoding='identity')
+        self.assertNotIn('Content-Encoding', headers)
+
+    def test_accepts_gzip(self):
+        self.assertTrue(accepts_gzip('gzip, deflate, br'))
+        self.assertTrue(accepts_gzip('*'))
+        self.assertFalse(accepts_gzip('gzip;q=0, deflate'))
+        self.assertFalse(accepts_gzip(''))
+
+    def test_wsgi_full_and_gzip(self):
+        """Whole files go to the file wrapper, and the .gz variant is sent to clients that accept it. """
+        status, headers, content = self.wsgi('/static/css/a.css')
+        self.assertEqual(('200 OK', CONTENT, 'text/css'), (status, content, headers['Content-Type']))
+        self.assertEqual('Accept-Encoding', headers['Vary'])
+        self.assertEqual('public, max-age=60', headers['Cache-Control'])
+        status, headers, content = self.wsgi('/static/css/a.css', accept_encoding='gzip')
+        self.assertEqual(('gzip', 'text/css'), (headers['Content-Encoding'], headers['Content-Type']))
+        self.assertEqual(CONTENT, gzip.decompress(content))
+        self.assertEqual(str(len(content)), headers['Content-Length'])
+
+    def test_wsgi_conditional_and_range(self):
+        """If-None-Match gives a 304, and a Range the partial content, or a 416 if not satisfiable. """
+        status, headers, content = self.wsgi('/static/css/a.css', if_none_match=self.etag)
+        self.assertEqual(('304 Not Modified', b''), (status, content))
+        status, headers, content = self.wsgi('/static/css/a.css', range='bytes=5-9', accept_encoding='gzip')
+        self.assertEqual(('206 Partial Content', CONTENT[5:10]), (status, content))
+        self.assertEqual('bytes 5-9/%d' % len(CONTENT), headers['Content-Range'])
+        self.assertNotIn('Content-Encoding', headers)
+        status, headers, content = self.wsgi('/static/css/a.css', range='bytes=5-9', if_range='"other"')
+        self.assertEqual(('200 OK', CONTENT), (status, content))
+        self.assertEqual('416 Requested Range Not Satisfiable', self.wsgi('/static/b.svg', range='bytes=99-')[0])
+        self.assertEqual(('200 OK', b''), self.wsgi('/static/b.svg', method='HEAD')[::2])
+
+    def test_other_requests_to_app(self):
+        """Paths not in the index, and other methods, go to the application. """
+        self.assertEqual(b'from app', self.wsgi('/static/missing.css')[2])
+        self.assertEqual(b'from app', self.wsgi('/static/b.svg', method='POST')[2])
+        self.assertEqual(b'from app', self.asgi('/other/')[2])
+
+    def test_asgi(self):
+        """Under ASGI the bodies come from the memory mapped files, with the same headers and ranges. """
+        status, headers, content = self.asgi('/static/css/a.css')
+        self.assertEqual((200, CONTENT), (status, content))
+        self.assertEqual(self.etag, headers['etag'])
+        status, headers, content = self.asgi('/static/css/a.css', range='bytes=-3')
+        self.assertEqual((206, CONTENT[-3:]), (status, content))
+        self.assertEqual(CONTENT, gzip.decompress(self.asgi('/static/css/a.css', accept_encoding='gzip')[2]))
+        self.assertEqual(304, self.asgi('/static/css/a.css', if_none_match=self.etag)[0])
+
+    def test_index_from_settings(self):
+        """Without a STATIC_ROOT, the index has the files of the staticfiles finders. """
+        index = StaticIndex.from_settings()
+        for name in ('css/style.css', 'assets/logo.svg', 'admin/css/base.css'):
+            self.assertIn('/static/' + name, index.files)
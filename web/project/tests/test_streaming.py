@@ -0,0 +1,64 @@
+import random
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from ..streaming import stream_template
+
+
+class StreamingTemplateTests(TestCase):
+    """The base template has {% lorem %} paragraphs, so random is seeded before each render compared. """
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get('/named')
+
+    def test_same_as_render(self):
+        """The chunks join to the same text as render, for a template and for one that extends it. """
+        context = {'css_sheets': ['css/home.css'], 'all_urls': [('project  - - home', 'home')]}
+        for name in ('generic/base.html', 'generic/home.html'):
+            template = get_template(name)
+            random.seed(name)
+            chunks = list(stream_template(template, context, self.request))
+            self.assertGreater(len(chunks), 2)
+            random.seed(name)
+            self.assertEqual(template.render(context, self.request), ''.join(chunks))
+
+    def test_head_and_nav_before_content(self):
+        """The head, with the stylesheets, and then the header nav are sent before the main content renders. """
+        chunks = list(stream_template(get_template('generic/base.html'), {}, self.request))
+        self.assertIn('style.css', chunks[0])
+        self.assertNotIn('<main>', chunks[0])
+        main = next(i for i, chunk in enumerate(chunks) if '<main>' in chunk)
+        self.assertIn('<nav', ''.join(chunks[:main]))
+
+    @override_settings(STREAMING_TEMPLATES=True, PAGE_CACHE_SECONDS=0)
+    def test_streaming_views(self):
+        """With the middleware stack, the views stream the same content as when not streaming. """
+        c = Client()
+        for url in ('/named', '/user/'):
+            random.seed(url)
+            response = c.get(url)
+            self.assertTrue(response.streaming)
+            self.assertFalse(response.has_header('Content-Length'))
+            self.assertTrue(response.has_header('X-Frame-Options'))
+            content = b''.join(response.streaming_content)
+            random.seed(url)
+            with override_settings(STREAMING_TEMPLATES=False):
+                self.assertEqual(c.get(url).content, content)
+
+    @override_settings(STREAMING_TEMPLATES=True, PAGE_CACHE_SECONDS=300)
+    def test_streamed_page_cached(self):
+        """A streamed page is in the page cache once sent, then served with an ETag. """
+        c = Client()
+        first = c.get('/named')
+        self.assertTrue(first.streaming)
+        content = b''.join(first.streaming_content)
+        second = c.get('/named')
+        self.assertFalse(second.streaming)
+        self.assertEqual(content, second.content)
+        self.assertEqual(304, c.get('/named', HTTP_IF_NONE_MATCH=second['ETag']).status_code)
+
+    @override_settings(STREAMING_TEMPLATES=True, PAGE_CACHE_SECONDS=0, DEBUG=True)
+    def test_not_streamed_with_debug(self):
+        """With DEBUG, the page is a normal response, so errors can show the debug page. """
+        self.assertFalse(Client().get('/named').streaming)
@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.test import TestCase
+from django.core.management import call_command
+from django.template import engines, Engine, Context, Template
+from ..template_cache import iter_template_names, warm_templates
+
+
+class TemplateCacheTests(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.template_dir = os.path.join(self.temp_dir, 'templates')
+        self.cache_dir = os.path.join(self.temp_dir, 'compiled')
+        self.write('base.html', '<title>{% block title %}Base{% endblock %}</title>')
+        self.write('page.html', '{% extends "base.html" %}{% block title %}{% if a and not b %}{{ a|upper }}'
+                                '{% else %}none{% endif %}{% endblock %}')
+
+    def write(self, name, text):
+        os.makedirs(self.template_dir, exist_ok=True)
+        with open(os.path.join(self.template_dir, name), 'w') as f:
+            f.write(text)
+
+    def make_engine(self):
+        loaders = [('project.template_cache.Loader', ['django.template.loaders.filesystem.Loader'], self.cache_dir)]
+        return Engine(dirs=[self.template_dir], loaders=loaders)
+
+    def test_template_names(self):
+        """Templates are found in both the project DIRS and the installed app directories, once each. """
+        names = list(iter_template_names(engines['django'].engine))
+        for name in ('generic/base.html', 'generic/home.html', 'admin/base.html'):
+            self.assertIn(name, names)
+        self.assertEqual(len(names), len(set(names)))
+
+    def test_warm_templates_fills_cached_loader(self):
+        """After warm_templates, every template is in the cached loader, and none had errors. """
+        engine = engines['django'].engine
+        loader = engine.template_loaders[0]
+        loader.reset()
+        results = warm_templates('django')
+        self.assertTrue(results)
+        self.assertEqual([], [ea for ea in results if ea[2] is not None])
+        self.assertIn('generic/home.html', loader.get_template_cache)
+
+    def test_compiled_on_disk(self):
+        """A new engine loads the compiled templates from disk, without compiling, and renders the same. """
+        context = Context({'a': 'text', 'b': False})
+        expected = self.make_engine().get_template('page.html').render(context)
+        self.assertEqual('<title>TEXT</title>', expected)
+        self.assertEqual(2, len(os.listdir(self.cache_dir)))
+        with mock.patch.object(Template, 'compile_nodelist', side_effect=AssertionError('compiled')):
+            self.assertEqual(expected, self.make_engine().get_template('page.html').render(context))
+
+    def test_changed_template_compiled_again(self):
+        """A template with a different modified time or size is compiled again. """
+        self.make_engine().get_template('page.html').render(Context({}))
+        self.write('base.html', '<title>{% block title %}{% endblock %} - Site</title>')
+        actual = self.make_engine().get_template('page.html').render(Context({}))
+        self.assertEqual('<title>none - Site</title>', actual)
+        self.assertEqual(3, len(os.listdir(self.cache_dir)))
+
+    def test_warm_templates_command(self):
+        """The command reports how many templates were compiled. """
+        out = StringIO()
+        call_command('warm_templates', stdout=out)
+        self.assertIn('Compiled', out.getvalue())
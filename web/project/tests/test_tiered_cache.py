@@ -0,0 +1,84 @@
+import shutil
+import tempfile
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from ..tiered_cache import TieredCache, stamp_key
+
+
+class TieredCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        settings_override = override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'shared': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': temp_dir},
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.cache = self.tiered('test_tiered')
+
+    def tiered(self, name, **options):
+        """A TieredCache over the shared file cache, as in another process if given a different name. """
+        options = {'MAX_ENTRIES': 3, 'STAMP_SECONDS': 0, **options}
+        cache = TieredCache(name, {'OPTIONS': options})
+        cache.clear()
+        cache.reset_stats()
+        return cache
+
+    def test_writes_both_tiers(self):
+        self.cache.set('key', {'value': 1})
+        stamp, value = caches['shared'].get('key')
+        self.assertEqual({'value': 1}, value)
+        self.assertEqual(stamp, caches['shared'].get(stamp_key('key')))
+        self.assertEqual({'value': 1}, self.cache.get('key'))
+        self.assertEqual({'hits': 1, 'misses': 0, 'evictions': 0, 'stale': 0}, self.cache.stats()['local'])
+        self.assertEqual(0, self.cache.stats()['shared']['hits'])
+
+    def test_shared_hit_fills_local(self):
+        """A value set by another process is read from the shared tier once, then from the local tier. """
+        other = self.tiered('test_tiered_other')
+        other.set('key', 'value')
+        self.assertEqual('value', self.cache.get('key'))
+        self.assertEqual('value', self.cache.get('key'))
+        self.assertIsNone(self.cache.get('missing'))
+        stats = self.cache.stats()
+        self.assertEqual({'hits': 1, 'misses': 2, 'evictions': 0, 'stale': 0}, stats['local'])
+        self.assertEqual({'hits': 1, 'misses': 1, 'evictions': 0}, stats['shared'])
+
+    def test_invalidation_by_stamp(self):
+        other = self.tiered('test_tiered_other')
+        self.cache.set('key', 'old')
+        self.assertEqual('old', other.get('key'))
+        self.cache.set('key', 'new')
+        self.assertEqual('new', other.get('key'))
+        self.assertEqual(1, other.stats()['local']['stale'])
+        self.cache.delete('key')
+        self.assertIsNone(other.get('key'))
+
+    def test_stamp_checked_after_stamp_seconds(self):
+        """Within STAMP_SECONDS a local entry is used without reading the shared tier. """
+        other = self.tiered('test_tiered_other', STAMP_SECONDS=60)
+        self.cache.set('key', 'old')
+        self.assertEqual('old', other.get('key'))
+        self.cache.set('key', 'new')
+        self.assertEqual('old', other.get('key'))
+
+    def test_local_evictions(self):
+        for num in range(5):
+            self.cache.set('key%d' % num, num)
+        self.assertEqual(2, self.cache.stats()['local']['evictions'])
+        self.assertEqual(0, self.cache.get('key0'))  # Still in the shared tier.
+        self.assertEqual(1, self.cache.stats()['shared']['hits'])
+
+    def test_add_touch_delete(self):
+        self.assertTrue(self.cache.add('key', 'first'))
+        self.assertFalse(self.cache.add('key', 'second'))
+        self.assertEqual('first', self.cache.get('key'))
+        self.assertTrue(self.cache.touch('key', 0))
+        self.assertIsNone(self.cache.get('key'))
+        self.assertFalse(self.cache.touch('key'))
+        self.cache.set('key', 'value')
+        self.assertTrue(self.cache.delete('key'))
+        self.assertIsNone(self.cache.get('key'))
+        self.assertIsNone(caches['shared'].get(stamp_key('key')))
@@ -0,0 +1,157 @@
+import time
+import pickle
+import uuid
+from collections import OrderedDict, namedtuple
+from threading import Lock
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+LocalEntry = namedtuple('LocalEntry', ['pickled', 'stamp', 'expires', 'checked'])
+STAT_NAMES = {'local': ('hits', 'misses', 'evictions', 'stale'), 'shared': ('hits', 'misses', 'evictions')}
+# Global in-process tiers, keyed by cache name, shared by the cache instance of each thread (as with LocMemCache).
+_locals = {}
+_locks = {}
+_stats = {}
+
+
+def stamp_key(key):
+    """The shared key of the version stamp of an entry, small to read when checking that the entry is current. """
+    return '%s:stamp' % key
+
+
+class TieredCache(BaseCache):
+    """A bounded in-process LRU tier in front of a shared tier (another CACHES alias, such as a file or db cache).
+    Writes go to both tiers, with a new version stamp for the entry. A local entry is used as it is for up to
+    STAMP_SECONDS, then only if its stamp in the shared tier is the same, so a change made by another process is
+    seen within that time. Local entries are kept for at most LOCAL_TIMEOUT, and MAX_ENTRIES of them.
+    OPTIONS: SHARED (alias, default 'shared'), MAX_ENTRIES, LOCAL_TIMEOUT (60), STAMP_SECONDS (1).
+    """
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = options.get('SHARED', 'shared')
+        self.local_timeout = options.get('LOCAL_TIMEOUT', 60)
+        self.stamp_seconds = options.get('STAMP_SECONDS', 1)
+        self._local = _locals.setdefault(name, OrderedDict())
+        self._lock = _locks.setdefault(name, Lock())
+        self._stats = _stats.setdefault(name, {tier: dict.fromkeys(names, 0) for tier, names in STAT_NAMES.items()})
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def count(self, tier, name):
+        with self._lock:
+            self._stats[tier][name] += 1
+
+    def stats(self):
+        """Counts of hits, misses, and evictions (and stale local entries) of each tier, since start or reset. """
+        with self._lock:
+            return {tier: dict(counts) for tier, counts in self._stats.items()}
+
+    def reset_stats(self):
+        with self._lock:
+            for counts in self._stats.values():
+                counts.update(dict.fromkeys(counts, 0))
+
+    def _set_local(self, local_key, value, stamp, timeout=DEFAULT_TIMEOUT):
+        now = time.time()
+        expires = self.get_backend_timeout(timeout)
+        expires = now + self.local_timeout if expires is None else min(expires, now + self.local_timeout)
+        with self._lock:
+            if expires <= now:
+                self._local.pop(local_key, None)
+                return
+            self._local[local_key] = LocalEntry(pickle.dumps(value, self.pickle_protocol), stamp, expires, now)
+            self._local.move_to_end(local_key)
+            while len(self._local) > self._max_entries:
+                self._local.popitem(last=False)
+                self._stats['local']['evictions'] += 1
+
+    def _get_local(self, local_key, now):
+        with self._lock:
+            entry = self._local.get(local_key)
+            if entry is not None and entry.expires <= now:
+                del self._local[local_key]
+                self._stats['local']['evictions'] += 1
+                entry = None
+            if entry is not None:
+                self._local.move_to_end(local_key)
+            return entry
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_key(key, version=version)
+        self.validate_key(local_key)
+        now = time.time()
+        entry, current = self._get_local(local_key, now), None
+        if entry is not None:
+            if now - entry.checked < self.stamp_seconds:
+                self.count('local', 'hits')
+                return pickle.loads(entry.pickled)
+            current = self.shared.get(stamp_key(key), version=version)
+            if current == entry.stamp:
+                with self._lock:
+                    if local_key in self._local:
+                        self._local[local_key] = entry._replace(checked=now)
+                    self._stats['local']['hits'] += 1
+                return pickle.loads(entry.pickled)
+            with self._lock:
+                self._local.pop(local_key, None)
+                self._stats['local']['stale'] += 1
+        else:
+            self.count('local', 'misses')
+        found = self.shared.get(key, version=version)
+        if found is None:
+            self.count('shared', 'misses')
+            if current is not None:
+                self.count('shared', 'evictions')  # Its stamp is there, so the entry was culled, not deleted.
+            return default
+        self.count('shared', 'hits')
+        stamp, value = found
+        self._set_local(local_key, value, stamp)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_key(key, version=version)
+        self.validate_key(local_key)
+        stamp = uuid.uuid4().hex
+        self.shared.set_many({key: (stamp, value), stamp_key(key): stamp}, timeout, version=version)
+        self._set_local(local_key, value, stamp, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_key(key, version=version)
+        self.validate_key(local_key)
+        stamp = uuid.uuid4().hex
+        if not self.shared.add(key, (stamp, value), timeout, version=version):
+            return False
+        self.shared.set(stamp_key(key), stamp, timeout, version=version)
+        self._set_local(local_key, value, stamp, timeout)
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_key(key, version=version)
+        self.validate_key(local_key)
+        if not self.shared.touch(key, timeout, version=version):
+            return False
+        self.shared.touch(stamp_key(key), timeout, version=version)
+        with self._lock:
+            entry = self._local.get(local_key)
+        if entry is not None:
+            self._set_local(local_key, pickle.loads(entry.pickled), entry.stamp, timeout)
+        return True
+
+    def delete(self, key, version=None):
+        local_key = self.make_key(key, version=version)
+        self.validate_key(local_key)
+        with self._lock:
+            self._local.pop(local_key, None)
+        self.shared.delete(stamp_key(key), version=version)
+        return self.shared.delete(key, version=version)
+
+    def clear(self):
+        """Empties both tiers. The whole shared cache is cleared, so it should not be used for anything else. """
+        with self._lock:
+            self._local.clear()
+        self.shared.clear()
@@ -1,6 +1,13 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
-from .views import home_view, NamedView, ProfileView
+from .resolvers import trie_urlpatterns
+from . import views
+
+if settings.ASYNC_VIEWS:  # Native async views, for ASGI. See project.async_views
+    home_view, NamedView, ProfileView = views.async_home_view, views.AsyncNamedView, views.AsyncProfileView
+else:
+    home_view, NamedView, ProfileView = views.home_view, views.NamedView, views.ProfileView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -10,3 +17,5 @@ urlpatterns = [
     path("improved/", include("django_improve_form.urls")),
     # path("APPNAME/", include("APPNAME.urls")),
 ]
+if settings.TRIE_URL_RESOLVER:
+    urlpatterns = trie_urlpatterns(urlpatterns)
@@ -1,22 +1,47 @@
-from django.core.management import call_command
 from django.shortcuts import render
 from django.views.generic import TemplateView
-import json
+from .async_views import AsyncTemplateMixin, load_request_state
+from .management.commands.urllist import get_url_inventory
+from .page_cache import cache_page_view, CachedPageMixin
+from .resource_hints import preload_template
+from .single_flight import single_flight
+from .streaming import StreamingTemplateMixin
 
 
+def home_context():
+    urls = get_url_inventory(ignore=['admin'], only=['source', 'name'], long=True)
+    urls = [(ea[0] + '  - - ' + ea[1], ea[1], ) for ea in urls]
+    return {'all_urls': urls}
+
+
+@preload_template('generic/home.html')
+@cache_page_view('generic/home.html', 'generic/base.html')
+@single_flight
 def home_view(request):
-    urls = call_command('urllist', ignore=['admin'], only=['source', 'name'], long=True, data=True)
-    urls = [(ea[0] + '  - - ' + ea[1], ea[1], ) for ea in json.loads(urls)]
-    print(urls)
-    context = {'all_urls': urls}
-    return render(request, 'generic/home.html', context=context)
+    return render(request, 'generic/home.html', context=home_context())
+
+
+@preload_template('generic/home.html')
+@cache_page_view('generic/home.html', 'generic/base.html')
+@single_flight
+async def async_home_view(request):
+    await load_request_state(request)
+    return render(request, 'generic/home.html', context=home_context())
 
 
-class NamedView(TemplateView):
+class NamedView(CachedPageMixin, StreamingTemplateMixin, TemplateView):
     template_name = "generic/base.html"
     extra_context = {'css_sheets': ['css/home.css'], }
 
 
-class ProfileView(TemplateView):
+class ProfileView(CachedPageMixin, StreamingTemplateMixin, TemplateView):
     template_name = "generic/base.html"
     extra_context = {'page_title': 'Placeholder Profile Page', 'article_1__title': 'Profile Page Placeholder'}
+
+
+class AsyncNamedView(AsyncTemplateMixin, NamedView):
+    pass
+
+
+class AsyncProfileView(AsyncTemplateMixin, ProfileView):
+    pass
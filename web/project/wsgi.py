@@ -9,8 +9,12 @@ https://docs.djangoproject.com/en/3.0/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
 
 application = get_wsgi_application()
+if settings.STATIC_SERVE_INDEX:
+    from .static_serve import StaticFilesWSGI
+    application = StaticFilesWSGI(application)